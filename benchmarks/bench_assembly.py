@@ -0,0 +1,55 @@
+"""Compare repeated pd.concat accumulation with FrameCollector as the symbol count grows.
+
+Run with:
+    python benchmarks/bench_assembly.py [rows_per_symbol]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from Rmoney_bhavcopy.assembly import FrameCollector
+from Rmoney_bhavcopy.queries import UDIFF_COLUMNS
+
+
+def make_frame(rows, seed):
+    """Build a 34-column UDiFF shaped frame with ``rows`` rows."""
+    rng = np.random.default_rng(seed)
+    data = {column: rng.random(rows) for column in UDIFF_COLUMNS}
+    data["TckrSymb"] = np.full(rows, f"SYM{seed}", dtype=object)
+    return pd.DataFrame(data)
+
+
+def quadratic(frames):
+    all_data = pd.DataFrame()
+    for frame in frames:
+        all_data = pd.concat([all_data, frame], ignore_index=True)
+    return all_data
+
+
+def collected(frames):
+    all_data = FrameCollector()
+    for frame in frames:
+        all_data.append(frame)
+    return all_data.result()
+
+
+def timed(func, frames):
+    started = time.perf_counter()
+    func(frames)
+    return time.perf_counter() - started
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{'symbols':>8} {'concat loop (s)':>16} {'collector (s)':>14} {'speedup':>8}")
+    for symbols in (25, 50, 100, 200, 400):
+        frames = [make_frame(rows, seed) for seed in range(symbols)]
+        before = timed(quadratic, frames)
+        after = timed(collected, frames)
+        print(f"{symbols:>8} {before:>16.3f} {after:>14.3f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Time ``continuous.ContinuousFutures`` against stitching each underlying's contracts in a Python loop
+over ``XpryDt``, and one incremental day.
+
+The F&O frame is synthetic: ``symbols`` underlyings over ``days`` trading days, each listing the
+futures of the three nearest month-ends.
+
+Run with:
+    python benchmarks/bench_continuous.py [days] [symbols]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from Rmoney_bhavcopy.continuous import ContinuousFutures, continuous_futures
+
+
+def monthly_expiries(start, months):
+    """Last Thursday of each of ``months`` months from ``start``."""
+    ends = pd.date_range(start, periods=months, freq="ME")
+    return ends - pd.to_timedelta((ends.weekday - 3) % 7, unit="D")
+
+
+def make_fo_frame(days, symbols, seed=0):
+    """Build a futures-only F&O frame with random-walk prices carrying a small premium per month."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2016-01-01", periods=days)
+    expiries = monthly_expiries(dates[0], days // 20 + 4).to_numpy()
+    # The three nearest expiries on or after each date
+    first = np.searchsorted(expiries, dates.to_numpy())
+    contract = (first[:, None] + np.arange(3)).ravel()
+    spot = 10_000 * np.exp(np.cumsum(rng.normal(0, 0.01, (symbols, days)), axis=1))
+    date_index = np.repeat(np.arange(days), 3)
+    tenor = (expiries[contract] - dates.to_numpy()[date_index]) / np.timedelta64(365, "D")
+    close = spot[:, date_index] * np.exp(0.07 * tenor)
+    return pd.DataFrame({
+        "TradDt": np.tile(dates.to_numpy()[date_index], symbols),
+        "TckrSymb": np.repeat([f"SYM{i:04d}" for i in range(symbols)], len(date_index)),
+        "FinInstrmTp": "STF",
+        "XpryDt": np.tile(expiries[contract], symbols),
+        "ClsPric": close.ravel().round(2),
+        "OpnIntrst": rng.integers(1_000, 1_000_000, close.size).astype("float64"),
+    })
+
+
+def loop_reference(data):
+    """The per-underlying, per-expiry loop this replaces: hold each month until it expires, ratio-adjusted."""
+    parts = []
+    for symbol, rows in data.groupby("TckrSymb"):
+        factor, pieces, previous = 1.0, [], None
+        for expiry in sorted(rows["XpryDt"].unique()):
+            held = rows[(rows["XpryDt"] == expiry) & (rows["TradDt"] <= expiry)]
+            if previous is not None:
+                held = held[held["TradDt"] > previous]
+                last_day = rows[(rows["TradDt"] == previous)]
+                old = last_day.loc[last_day["XpryDt"] == previous, "ClsPric"]
+                new = last_day.loc[last_day["XpryDt"] == expiry, "ClsPric"]
+                if len(old) and len(new):
+                    ratio = new.iloc[0] / old.iloc[0]
+                    pieces = [piece.assign(AdjClsPric=piece["AdjClsPric"] * ratio) for piece in pieces]
+            pieces.append(held.assign(AdjClsPric=held["ClsPric"]))
+            previous = expiry
+        parts.extend(pieces)
+    return pd.concat(parts, ignore_index=True).sort_values(["TckrSymb", "TradDt"], ignore_index=True)
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 1250
+    symbols = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    data = make_fo_frame(days, symbols)
+    history, last_day = data[data["TradDt"] < data["TradDt"].max()], data[data["TradDt"] == data["TradDt"].max()]
+
+    reference, loop_seconds = timed(lambda: loop_reference(data))
+    series, numpy_seconds = timed(lambda: continuous_futures(data))
+    assert np.allclose(reference["AdjClsPric"], series["AdjClsPric"])
+
+    futures = ContinuousFutures()
+    futures.update(history)
+    _, update_seconds = timed(lambda: futures.update(last_day))
+
+    print(f"rows:                       {len(data):>12,}")
+    print(f"loop over expiries (s):     {loop_seconds:>12.3f}")
+    print(f"continuous_futures (s):     {numpy_seconds:>12.3f}")
+    print(f"update, one new day (s):    {update_seconds:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
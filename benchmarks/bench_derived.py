@@ -0,0 +1,76 @@
+"""Time ``derived.DerivedSeries`` against a pandas groupby/rolling implementation, and one incremental day.
+
+The CM frame is synthetic: ``symbols`` EQ stocks over ``days`` trading days.
+
+Run with:
+    python benchmarks/bench_derived.py [days] [symbols]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from Rmoney_bhavcopy.derived import DerivedSeries, derive
+
+
+def make_cm_frame(days, symbols, seed=0):
+    """Build a CM frame with random-walk closes and consistent previous closes."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2016-01-01", periods=days)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (days, symbols)), axis=0))
+    prev = np.vstack([np.full(symbols, np.nan), close[:-1]])
+    volume = rng.integers(1_000, 1_000_000, (days, symbols)).astype("float64")
+    return pd.DataFrame({
+        "TradDt": np.repeat(dates.to_numpy(), symbols),
+        "TckrSymb": np.tile([f"SYM{i:04d}" for i in range(symbols)], days),
+        "SctySrs": "EQ",
+        "OpnPric": (prev * (1 + rng.normal(0, 0.01, (days, symbols)))).ravel(),
+        "ClsPric": close.ravel(),
+        "PrvsClsgPric": prev.ravel(),
+        "TtlTradgVol": volume.ravel(),
+        "TtlTrfVal": (volume * close).ravel(),
+    })
+
+
+def pandas_reference(data, window=20):
+    """The per-group pandas version of the same derivations."""
+    data = data.sort_values(["TckrSymb", "SctySrs", "TradDt"], ignore_index=True)
+    groups = data.groupby(["TckrSymb", "SctySrs"])
+    data["Rtrn"] = data["ClsPric"] / data["PrvsClsgPric"] - 1
+    data["LogRtrn"] = np.log1p(data["Rtrn"])
+    data["Vwap"] = data["TtlTrfVal"] / data["TtlTradgVol"]
+    data["Gap"] = data["OpnPric"] / data["PrvsClsgPric"] - 1
+    data[f"Vol{window}"] = groups["LogRtrn"].transform(lambda x: x.rolling(window).std()) * np.sqrt(252)
+    data[f"Adv{window}"] = groups["TtlTradgVol"].transform(lambda x: x.rolling(window).mean())
+    return data
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    symbols = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    data = make_cm_frame(days, symbols)
+    history, last_day = data[data["TradDt"] < data["TradDt"].max()], data[data["TradDt"] == data["TradDt"].max()]
+
+    reference, pandas_seconds = timed(lambda: pandas_reference(data))
+    derived, numpy_seconds = timed(lambda: derive(data))
+    assert np.allclose(reference["Vol20"], derived["Vol20"], equal_nan=True)
+
+    series = DerivedSeries()
+    series.update(history)
+    _, update_seconds = timed(lambda: series.update(last_day))
+
+    print(f"rows:                      {len(data):>12,}")
+    print(f"pandas groupby/rolling (s): {pandas_seconds:>11.3f}")
+    print(f"derive, full history (s):   {numpy_seconds:>11.3f}")
+    print(f"update, one new day (s):    {update_seconds:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
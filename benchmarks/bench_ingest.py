@@ -0,0 +1,109 @@
+"""Backfill synthetic daily bhavcopy files with ``ingest`` and compare with row-by-row INSERTs.
+
+Writes one file per trade date and table (legacy files before the UDiFF cutover, UDiFF files
+after it, F&O files zipped as NSE publishes them) from ``synthetic.generate``, then times
+``ingest`` with one and with several workers. The bhavcopy tables of the target database are
+dropped and recreated. Run with:
+    python benchmarks/bench_ingest.py --host localhost --database bhav_bench [--days 60] [--workers 8]
+"""
+import argparse
+import tempfile
+import time
+import zipfile
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+import synthetic
+from Rmoney_bhavcopy import config
+from Rmoney_bhavcopy.Bhavcopy_Reteriver import establish_connection
+from Rmoney_bhavcopy.ingest import DATE_FORMATS, date_column, ingest
+from Rmoney_bhavcopy.queries import COLUMN_TYPES
+
+FILE_NAMES = {
+    "bhavcopies_cm": "cm{day:%d%b%Y}bhav.csv",
+    "bhavcopies_udiff": "BhavCopy_NSE_CM_0_0_0_{day:%Y%m%d}_F_0000.csv",
+    "FO_bhavCopies_CM": "fo{day:%d%b%Y}bhav.csv",
+    "FO_Bhavcopies_UDiFF": "BhavCopy_NSE_FO_0_0_0_{day:%Y%m%d}_F_0000.csv",
+    "Indices_bhavCopies": "ind_close_all_{day:%d%m%Y}.csv",
+}
+
+
+def write_files(tables, directory):
+    """Write every table as daily files in NSE's format; return the number of rows written."""
+    rows = 0
+    for table_name, frame in tables.items():
+        frame = frame.copy()
+        for column in frame.columns:
+            if COLUMN_TYPES[column] == "date":
+                frame[column] = pd.to_datetime(frame[column]).dt.strftime(DATE_FORMATS[table_name]).str.upper()
+        trade_date = date_column(table_name)
+        for value, day in frame.groupby(trade_date, sort=False):
+            path = Path(directory) / FILE_NAMES[table_name].format(day=pd.to_datetime(value, format=DATE_FORMATS[table_name]))
+            day.to_csv(path, index=False)
+            if table_name.startswith("FO_"):
+                with zipfile.ZipFile(f"{path}.zip", "w", zipfile.ZIP_DEFLATED) as archive:
+                    archive.write(path, path.name)
+                path.unlink()
+            rows += len(day)
+    return rows
+
+
+def insert_rows(table_name, frame):
+    """The row-by-row INSERT loading this replaces."""
+    columns = ", ".join(synthetic.column_sql(column, table_name == "Indices_bhavCopies") for column in frame.columns)
+    values = ", ".join(["%s"] * len(frame.columns))
+    conn = establish_connection()
+    try:
+        cur = conn.cursor()
+        cur.executemany(f"INSERT INTO {table_name} ({columns}) VALUES ({values})", frame.astype(object).where(frame.notna(), None).values.tolist())
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    for name, key in [("host", "hostname"), ("port", "port"), ("database", "database"), ("user", "username"), ("password", "pwd")]:
+        parser.add_argument(f"--{name}", dest=key)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2024, 6, 3))
+    parser.add_argument("--days", type=int, default=60, help="trade dates to backfill")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    config.conf.update({key: value for key, value in vars(args).items() if key in config.conf and value is not None})
+
+    end = synthetic.trading_days(args.start, args.start + pd.Timedelta(days=args.days * 2))[args.days - 1]
+    tables = synthetic.generate(args.start, end, cm_symbols=2000, fo_symbols=3, indices=100)
+    with tempfile.TemporaryDirectory() as directory:
+        rows = write_files(tables, directory)
+        timings = {}
+        for workers in (1, args.workers):
+            conn = establish_connection()
+            synthetic.create_tables(conn)
+            conn.close()
+            report, timings[workers] = timed(lambda: ingest(directory, max_workers=workers))
+            assert not report.attrs["errors"], report.attrs["errors"]
+        files = len(report)
+        # Loading the same files again replaces their trade dates
+        _, reloaded = timed(lambda: ingest(directory, max_workers=args.workers))
+
+    sample = tables["FO_Bhavcopies_UDiFF"].head(20_000)
+    _, inserted = timed(lambda: insert_rows("FO_Bhavcopies_UDiFF", sample))
+
+    print(f"files:                      {files:>10}")
+    print(f"rows:                       {rows:>10}")
+    for workers, seconds in timings.items():
+        print(f"ingest, {workers:>2} workers (s):     {seconds:>10.2f}   {rows / seconds:>10.0f} rows/s")
+    print(f"reload, {args.workers:>2} workers (s):     {reloaded:>10.2f}")
+    print(f"row-by-row INSERT (rows/s): {len(sample) / inserted:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Time ``options.implied_volatility`` and ``options.option_chain`` on a synthetic day of option contracts.
+
+Prices are generated with Black-Scholes from known volatilities, so the benchmark also reports
+how closely the batched solver recovers them.
+
+Run with:
+    python benchmarks/bench_options.py [contracts]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from Rmoney_bhavcopy.options import black_scholes, greeks, implied_volatility, max_pain, option_chain, put_call_ratio
+
+
+def make_chain(contracts, seed=0):
+    """One trade date of CE/PE rows over a few expiries and a strike ladder around 20000."""
+    rng = np.random.default_rng(seed)
+    spot = 20000.0
+    expiries = pd.Timestamp("2024-01-02") + pd.to_timedelta(rng.choice([2, 9, 16, 23, 30, 58, 86], contracts), unit="D")
+    strike = np.round(spot * np.exp(rng.normal(0, 0.08, contracts)) / 50) * 50
+    is_call = rng.random(contracts) < 0.5
+    t = (expiries - pd.Timestamp("2024-01-02")).days.to_numpy() / 365.0
+    sigma = rng.uniform(0.08, 0.6, contracts)
+    return pd.DataFrame({
+        "TradDt": pd.Timestamp("2024-01-02"),
+        "TckrSymb": "NIFTY",
+        "FinInstrmTp": "IDO",
+        "XpryDt": expiries,
+        "StrkPric": strike,
+        "OptnTp": np.where(is_call, "CE", "PE"),
+        "SttlmPric": black_scholes(spot, strike, t, 0.07, sigma, is_call),
+        "OpnIntrst": rng.integers(0, 100_000, contracts).astype("float64"),
+        "UndrlygPric": spot,
+    }), sigma
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    contracts = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    data, sigma = make_chain(contracts)
+
+    chain, chain_seconds = timed(lambda: option_chain(data, rate=0.07))
+    _, pcr_seconds = timed(lambda: put_call_ratio(chain))
+    _, pain_seconds = timed(lambda: max_pain(chain))
+    solved, iv_seconds = timed(lambda: implied_volatility(
+        chain["SttlmPric"], chain["Spot"], chain["StrkPric"], chain["TmToXpry"], 0.07, chain["OptnTp"] == "CE",
+    ))
+    usable = greeks(chain["Spot"], chain["StrkPric"], chain["TmToXpry"], 0.07, sigma, chain["OptnTp"] == "CE")["Vega"] > 0.01
+    error = np.nanmax(np.abs(solved - sigma)[usable])
+
+    print(f"contracts:                    {contracts:>10,}")
+    print(f"implied_volatility (s):       {iv_seconds:>10.3f}")
+    print(f"option_chain, IV + Greeks (s): {chain_seconds:>9.3f}")
+    print(f"put_call_ratio (s):           {pcr_seconds:>10.3f}")
+    print(f"max_pain (s):                 {pain_seconds:>10.3f}")
+    print(f"solved:                       {np.isfinite(solved).mean():>10.2%}")
+    print(f"max IV error (vega > 0.01):   {error:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Compare ``pivot_table`` with ``panel.to_panel`` for building date x symbol close-price panels.
+
+The long frame holds normalized CM rows (datetime64 dates, category symbols, float64 prices) for
+``symbols`` stocks over ``days`` trading days.
+
+Run with:
+    python benchmarks/bench_panel.py [days] [symbols]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from Rmoney_bhavcopy.panel import PANEL_AXES, to_panel
+
+
+def make_long_frame(days, symbols, seed=0):
+    """Build a shuffled long CM frame with every symbol traded on every day."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2016-01-01", periods=days)
+    names = [f"SYM{i:04d}" for i in range(symbols)]
+    data = pd.DataFrame({
+        "TradDt": np.repeat(dates.to_numpy(), symbols),
+        "TckrSymb": pd.Categorical(np.tile(names, days)),
+    })
+    for field in PANEL_AXES["CM"]["fields"]:
+        data[field] = rng.random(len(data)) * 5000
+    return data.sample(frac=1, random_state=seed, ignore_index=True)
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    symbols = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    data = make_long_frame(days, symbols)
+    fields = PANEL_AXES["CM"]["fields"]
+
+    pivoted, pivot_seconds = timed(
+        lambda: {field: data.pivot_table(index="TradDt", columns="TckrSymb", values=field, observed=True) for field in fields}
+    )
+    panel, panel_seconds = timed(lambda: to_panel(data, fields))
+    assert np.allclose(pivoted["ClsPric"].to_numpy(), panel["ClsPric"])
+
+    print(f"rows:                {len(data):>12,}")
+    print(f"panel shape:         {str(panel.shape):>12}")
+    print(f"pivot_table (s):     {pivot_seconds:>12.3f}")
+    print(f"to_panel (s):        {panel_seconds:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Break a ``get_FO_bhavcopy`` call down by stage and measure what profiling costs.
+
+The same call is timed without profiling and inside ``profile()``, then the per-stage summary is
+printed. Connection details come from ``config.py``. Run with:
+    python benchmarks/bench_profiling.py BANKNIFTY 2023-01-01 2023-03-31 [repeats]
+"""
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from Rmoney_bhavcopy import get_FO_bhavcopy, profile
+from Rmoney_bhavcopy.profiling import stage
+
+
+def best_of(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    symbol = sys.argv[1] if len(sys.argv) > 1 else "BANKNIFTY"
+    start = datetime.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else datetime(2023, 1, 1)
+    end = datetime.fromisoformat(sys.argv[3]) if len(sys.argv) > 3 else datetime(2023, 3, 31)
+    repeats = int(sys.argv[4]) if len(sys.argv) > 4 else 3
+
+    call = lambda: get_FO_bhavcopy(start, end, [symbol])
+    plain = best_of(call, repeats)
+
+    reports = []
+
+    def profiled():
+        with profile() as report:
+            call()
+        reports.append(report)
+    with_profile = best_of(profiled, repeats)
+
+    def disabled_stages():
+        for _ in range(100_000):
+            with stage("execute"):
+                pass
+    per_stage = best_of(disabled_stages, repeats) / 100_000
+
+    print(f"without profiling (s):      {plain:>10.3f}")
+    print(f"with profiling (s):         {with_profile:>10.3f}")
+    print(f"disabled stage (ns):        {per_stage * 1e9:>10.0f}")
+    with pd.option_context("display.width", 120):
+        print(reports[-1].summary())
+
+
+if __name__ == "__main__":
+    main()
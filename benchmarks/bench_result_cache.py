@@ -0,0 +1,44 @@
+"""Time a dashboard-like loop of repeated and narrowed ``get_FO_bhavcopy`` calls with and without a ``ResultCache``.
+
+Connection details come from ``config.py``. Run with:
+    python benchmarks/bench_result_cache.py BANKNIFTY 2023-01-01 2023-03-31 [calls]
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+
+from Rmoney_bhavcopy import ResultCache, get_FO_bhavcopy
+
+
+def dashboard(start, end, symbol, calls, result_cache=None):
+    """The full range once, then ``calls`` refreshes of the full range and of sliding one-week windows."""
+    get_FO_bhavcopy(start, end, [symbol], transport="copy", result_cache=result_cache)
+    for i in range(calls):
+        get_FO_bhavcopy(start, end, [symbol], transport="copy", result_cache=result_cache)
+        week = start + timedelta(days=7 * (i % max((end - start).days // 7, 1)))
+        get_FO_bhavcopy(week, min(week + timedelta(days=6), end), [symbol], transport="copy", result_cache=result_cache)
+
+
+def main():
+    symbol = sys.argv[1] if len(sys.argv) > 1 else "BANKNIFTY"
+    start = datetime.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else datetime(2023, 1, 1)
+    end = datetime.fromisoformat(sys.argv[3]) if len(sys.argv) > 3 else datetime(2023, 3, 31)
+    calls = int(sys.argv[4]) if len(sys.argv) > 4 else 10
+
+    started = time.perf_counter()
+    dashboard(start, end, symbol, calls)
+    uncached = time.perf_counter() - started
+
+    results = ResultCache()
+    started = time.perf_counter()
+    dashboard(start, end, symbol, calls, results)
+    cached = time.perf_counter() - started
+
+    print(f"getter calls:               {1 + 2 * calls:>10}")
+    print(f"without result cache (s):   {uncached:>10.3f}")
+    print(f"with result cache (s):      {cached:>10.3f}")
+    print(f"cache stats:                {results.stats()}")
+
+
+if __name__ == "__main__":
+    main()
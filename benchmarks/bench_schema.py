@@ -0,0 +1,68 @@
+"""Measure the memory saved by ``schema.normalize`` and its cost on a psycopg2-shaped F&O frame.
+
+The frame holds what a cursor fetch returns: ``Decimal`` prices, ``datetime.date`` dates and
+Python strings in object columns.
+
+Run with:
+    python benchmarks/bench_schema.py [rows]
+"""
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+from Rmoney_bhavcopy.queries import COLUMN_TYPES, UDIFF_COLUMNS
+from Rmoney_bhavcopy.schema import normalize
+
+
+def make_raw_frame(rows, seed=0):
+    """Build a 34-column UDiFF frame with the Python objects psycopg2 returns."""
+    rng = np.random.default_rng(seed)
+    days = [date(2020, 1, 1) + timedelta(days=int(d)) for d in rng.integers(0, 1500, rows)]
+    data = {}
+    for column in UDIFF_COLUMNS:
+        kind = COLUMN_TYPES[column]
+        if kind == "numeric":
+            data[column] = [Decimal(f"{value:.2f}") for value in rng.random(rows) * 50000]
+        elif kind == "int":
+            data[column] = [Decimal(int(value)) for value in rng.integers(0, 10**7, rows)]
+        elif kind == "date":
+            data[column] = days
+        else:
+            data[column] = [None] * rows
+    data["TckrSymb"] = list(rng.choice(["NIFTY", "BANKNIFTY", "FINNIFTY"], rows))
+    data["FinInstrmTp"] = list(rng.choice(["IDO", "IDF"], rows))
+    data["OptnTp"] = list(rng.choice(["CE", "PE"], rows))
+    return pd.DataFrame(data, dtype=object)
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    raw = make_raw_frame(rows)
+    data, seconds = timed(lambda: normalize(raw))
+
+    def workload(frame):
+        return frame.groupby("TckrSymb", observed=True)["ClsPric"].agg(["mean", "max"]), (frame["ClsPric"] * frame["OpnIntrst"]).sum()
+
+    _, raw_seconds = timed(lambda: workload(raw))
+    _, data_seconds = timed(lambda: workload(data))
+
+    print(f"rows:                  {rows:>12,}")
+    print(f"memory before (MiB):   {raw.memory_usage(deep=True).sum() / 2**20:>12.1f}")
+    print(f"memory after (MiB):    {data.memory_usage(deep=True).sum() / 2**20:>12.1f}")
+    print(f"normalize (s):         {seconds:>12.3f}")
+    print(f"groupby+product raw:   {raw_seconds:>12.3f}")
+    print(f"groupby+product after: {data_seconds:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Time ``clients`` notebooks running the same getter calls directly against the database and
+through one ``QueryServer``.
+
+Directly, every notebook opens its own connection and runs every query. Through the server, the
+notebooks share its pool and result cache, and identical calls in flight at the same time run once.
+Run against a database loaded by ``bench_suite.py --load`` (synthetic symbols) with:
+    python benchmarks/bench_server.py --host localhost --database bhav_bench [--clients 8] [--rounds 3]
+"""
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import synthetic
+from Rmoney_bhavcopy import config
+from Rmoney_bhavcopy.Bhavcopy_Reteriver import get_CM_bhavcopy, get_FO_bhavcopy
+from Rmoney_bhavcopy.client import BhavcopyClient
+from Rmoney_bhavcopy.server import QueryServer, RemoteClient
+
+CALLS = [
+    lambda client: get_FO_bhavcopy(datetime(2024, 6, 1), datetime(2024, 6, 30), synthetic.fo_symbol_names(1), batched=True, client=client),
+    lambda client: get_CM_bhavcopy(datetime(2024, 1, 1), datetime(2024, 12, 31), synthetic.cm_symbol_names(50), ["EQ"], batched=True, client=client),
+]
+
+
+def notebook(client, rounds):
+    rows = 0
+    for _ in range(rounds):
+        for call in CALLS:
+            rows += len(call(client))
+    return rows
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def run(clients, rounds, make_client):
+    made = [make_client() for _ in range(clients)]
+    try:
+        with ThreadPoolExecutor(clients) as executor:
+            return sum(executor.map(lambda client: notebook(client, rounds), made))
+    finally:
+        for client in made:
+            client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    for name, key in [("host", "hostname"), ("port", "port"), ("database", "database"), ("user", "username"), ("password", "pwd")]:
+        parser.add_argument(f"--{name}", dest=key)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    config.conf.update({key: value for key, value in vars(args).items() if key in config.conf and value is not None})
+    logging.disable(logging.INFO)
+
+    direct_rows, direct = timed(lambda: run(args.clients, args.rounds, lambda: BhavcopyClient(maxconn=1)))
+    with QueryServer(port=0, maxconn=4) as server:
+        served_rows, served = timed(lambda: run(args.clients, args.rounds, lambda: RemoteClient(server.url)))
+        stats = server.stats()
+    assert direct_rows == served_rows
+
+    print(f"rows per run:                 {direct_rows:>10}")
+    print(f"direct, {args.clients:>2} connections (s):  {direct:>10.2f}")
+    print(f"through the server (s):       {served:>10.2f}")
+    print(f"server requests:              {stats['requests']:>10}  coalesced {stats['coalesced']}, cache hits {stats['result_cache']['hits']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Build a stock + front-month future + ATM options + index frame with ``get_market_snapshot``
+and with three getter calls joined by pandas merges.
+
+Connection details come from ``config.py``. Run with:
+    python benchmarks/bench_snapshot.py 2024-01-01 2024-06-30 RELIANCE TCS INFY
+"""
+import sys
+import time
+from datetime import datetime
+
+from Rmoney_bhavcopy import get_CM_bhavcopy, get_FO_bhavcopy, get_indices_bhavcopy, get_market_snapshot
+
+INDEX = "Nifty 50"
+
+
+def merged(start, end, symbols):
+    """The three calls and merges this replaces."""
+    cm = get_CM_bhavcopy(start, end, symbols, ['EQ'])[["TradDt", "TckrSymb", "ClsPric"]]
+    fo = get_FO_bhavcopy(start, end, symbols)
+    futures = fo[fo["FinInstrmTp"].astype(str).isin(["IDF", "STF", "FUTIDX", "FUTSTK"])]
+    front = futures.sort_values("XpryDt").groupby(["TradDt", "TckrSymb"], observed=True).first().reset_index()
+    options = fo[fo["OptnTp"].astype(str).isin(["CE", "PE"])]
+    options = options[options["XpryDt"] == options.groupby(["TradDt", "TckrSymb"], observed=True)["XpryDt"].transform("min")]
+    spot = options["UndrlygPric"].fillna(options[["TradDt", "TckrSymb"]].merge(front, how="left")["ClsPric"].set_axis(options.index))
+    options = options.assign(distance=(options["StrkPric"] - spot).abs()).sort_values(["distance", "StrkPric"])
+    atm = options.groupby(["TradDt", "TckrSymb", "OptnTp"], observed=True).first().reset_index()
+    calls = atm[atm["OptnTp"] == "CE"][["TradDt", "TckrSymb", "ClsPric"]].rename(columns={"ClsPric": "CE_ClsPric"})
+    puts = atm[atm["OptnTp"] == "PE"][["TradDt", "TckrSymb", "ClsPric"]].rename(columns={"ClsPric": "PE_ClsPric"})
+    index = get_indices_bhavcopy(start, end, [INDEX])[["Index Date", "Closing Index Value"]]
+    result = cm.merge(front[["TradDt", "TckrSymb", "ClsPric"]].rename(columns={"ClsPric": "FUT_ClsPric"}), how="outer", on=["TradDt", "TckrSymb"])
+    result = result.merge(calls, how="left").merge(puts, how="left")
+    return result.merge(index.rename(columns={"Index Date": "TradDt", "Closing Index Value": INDEX}), how="left")
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    start = datetime.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else datetime(2024, 1, 1)
+    end = datetime.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else datetime(2024, 6, 30)
+    symbols = sys.argv[3:] or ["RELIANCE", "TCS", "INFY"]
+
+    joined, merge_seconds = timed(lambda: merged(start, end, symbols))
+    snapshot, snapshot_seconds = timed(lambda: get_market_snapshot(start, end, symbols, indices=[INDEX], future_fields=["ClsPric"], option_fields=["ClsPric"]))
+
+    print(f"rows (merges / snapshot):   {len(joined):>10} / {len(snapshot)}")
+    print(f"three calls + merges (s):   {merge_seconds:>10.3f}")
+    print(f"get_market_snapshot (s):    {snapshot_seconds:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
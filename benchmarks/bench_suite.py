@@ -0,0 +1,172 @@
+"""Time the public getters on a synthetic dataset and write the results to a JSON file.
+
+``--load`` generates the synthetic tables (see ``synthetic.py``) and loads them into the database
+given on the command line, which must exist and must not hold real data: the bhavcopy tables are
+dropped and recreated. Every getter is then timed for each symbol count, date span (trading days
+ending at ``--end``) and mode; the best and median of ``--repeats`` runs are kept. ``--compare``
+prints the ratio of every case to an earlier results file.
+
+Run with:
+    createdb bhav_bench
+    python benchmarks/bench_suite.py --host localhost --database bhav_bench --load --output results.json
+    python benchmarks/bench_suite.py --host localhost --database bhav_bench --output new.json --compare results.json
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+import synthetic
+from Rmoney_bhavcopy import config, get_CM_bhavcopy, get_FO_bhavcopy, get_indices_bhavcopy
+from Rmoney_bhavcopy.Bhavcopy_Reteriver import establish_connection
+
+# Keyword arguments of each mode; None entries do not apply to the segment
+MODES = {
+    "default": {},
+    "batched": {"batched": True},
+    "copy": {"transport": "copy"},
+    "workers": {"max_workers": 4},
+    "columns": {
+        "CM": {"columns": ["TradDt", "TckrSymb", "OpnPric", "HghPric", "LwPric", "ClsPric", "TtlTradgVol"]},
+        "FO": {"columns": ["TradDt", "TckrSymb", "XpryDt", "StrkPric", "OptnTp", "ClsPric", "OpnIntrst"]},
+        "Indices": {"columns": ["Index Date", "Index Name", "Closing Index Value"]},
+    },
+    "arrow": {"backend": "arrow"},
+    "chain": {"FO": {"nearest_expiries": 2, "atm_strikes": 5}},
+}
+SEGMENTS = {
+    "CM": {"getter": get_CM_bhavcopy, "names": synthetic.cm_symbol_names, "kwargs": {"series": ["EQ"]}},
+    "FO": {"getter": get_FO_bhavcopy, "names": synthetic.fo_symbol_names, "kwargs": {}},
+    "Indices": {"getter": get_indices_bhavcopy, "names": synthetic.index_names, "kwargs": {}},
+}
+
+
+def mode_kwargs(mode, segment):
+    kwargs = MODES[mode]
+    if kwargs and set(kwargs) <= set(SEGMENTS):
+        return kwargs.get(segment)
+    return kwargs
+
+
+def cases(args):
+    """Every (segment, symbols, days, mode) combination to time."""
+    symbol_counts = {"CM": args.cm_counts, "FO": args.fo_counts, "Indices": args.indices_counts}
+    available = {"CM": args.cm_symbols, "FO": args.fo_symbols, "Indices": args.indices}
+    for segment in SEGMENTS:
+        for count in symbol_counts[segment]:
+            if count > available[segment]:
+                continue
+            for days in args.spans:
+                for mode in args.modes:
+                    if mode_kwargs(mode, segment) is not None:
+                        yield segment, count, days, mode
+
+
+def run_case(segment, count, days, mode, args):
+    spec = SEGMENTS[segment]
+    trading = synthetic.trading_days(args.start, args.end)
+    start = datetime.combine(trading[-min(days, len(trading))], datetime.min.time())
+    end = datetime.combine(args.end, datetime.min.time())
+    kwargs = {**spec["kwargs"], **mode_kwargs(mode, segment)}
+    call = lambda: spec["getter"](start, end, spec["names"](count), **kwargs)
+    timings = []
+    for _ in range(args.repeats):
+        started = time.perf_counter()
+        result = call()
+        timings.append(time.perf_counter() - started)
+    return {
+        "segment": segment, "symbols": count, "days": days, "mode": mode, "rows": len(result),
+        "best": min(timings), "median": statistics.median(timings), "seconds": timings,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versions = {"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__}
+    for module in ("pyarrow", "polars", "psycopg2"):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            pass
+    return {"commit": commit, "machine": platform.machine(), "processor": platform.processor(), "versions": versions}
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as file:
+        baseline = {tuple(case[key] for key in ("segment", "symbols", "days", "mode")): case for case in json.load(file)["results"]}
+    print(f"\n{'segment':<8}{'symbols':>8}{'days':>6}  {'mode':<9}{'before (s)':>12}{'after (s)':>12}{'ratio':>8}")
+    for case in results:
+        before = baseline.get((case["segment"], case["symbols"], case["days"], case["mode"]))
+        if before is not None:
+            print(f"{case['segment']:<8}{case['symbols']:>8}{case['days']:>6}  {case['mode']:<9}"
+                  f"{before['best']:>12.4f}{case['best']:>12.4f}{case['best'] / before['best']:>8.2f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    connection = parser.add_argument_group("database (defaults from config.py)")
+    for name, key in [("host", "hostname"), ("port", "port"), ("database", "database"), ("user", "username"), ("password", "pwd")]:
+        connection.add_argument(f"--{name}", dest=key)
+    data = parser.add_argument_group("synthetic data")
+    data.add_argument("--load", action="store_true", help="generate the tables and load them, replacing the bhavcopy tables")
+    data.add_argument("--start", type=date.fromisoformat, default=date(2024, 1, 1))
+    data.add_argument("--end", type=date.fromisoformat, default=date(2024, 12, 31))
+    data.add_argument("--cm-symbols", type=int, default=100)
+    data.add_argument("--fo-symbols", type=int, default=3)
+    data.add_argument("--indices", type=int, default=5)
+    data.add_argument("--strikes", type=int, default=20, help="strikes on either side of the money")
+    data.add_argument("--seed", type=int, default=0)
+    suite = parser.add_argument_group("cases")
+    suite.add_argument("--cm-counts", type=int, nargs="+", default=[1, 10, 100])
+    suite.add_argument("--fo-counts", type=int, nargs="+", default=[1, 3])
+    suite.add_argument("--indices-counts", type=int, nargs="+", default=[1, 5])
+    suite.add_argument("--spans", type=int, nargs="+", default=[5, 21, 250], help="trading days ending at --end")
+    suite.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    suite.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    config.conf.update({key: value for key, value in vars(args).items() if key in config.conf and value is not None})
+    logging.disable(logging.INFO)
+
+    dataset = {key: getattr(args, key) for key in ("start", "end", "cm_symbols", "fo_symbols", "indices", "strikes", "seed")}
+    if args.load:
+        started = time.perf_counter()
+        tables = synthetic.generate(args.start, args.end, args.cm_symbols, args.fo_symbols, args.indices, args.strikes, seed=args.seed)
+        conn = establish_connection()
+        try:
+            dataset["rows"] = synthetic.load(conn, tables)
+        finally:
+            conn.close()
+        print(f"loaded {sum(dataset['rows'].values())} rows in {time.perf_counter() - started:.1f}s: {dataset['rows']}")
+
+    results = []
+    for segment, count, days, mode in cases(args):
+        case = run_case(segment, count, days, mode, args)
+        results.append(case)
+        print(f"{segment:<8}{count:>5} symbols {days:>4} days  {mode:<8}{case['rows']:>10} rows {case['best']:>9.4f}s")
+
+    report = {"created": datetime.now().isoformat(timespec="seconds"), "environment": environment(), "dataset": dataset, "results": results}
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2, default=str)
+    print(f"wrote {len(results)} cases to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
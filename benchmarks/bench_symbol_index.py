@@ -0,0 +1,41 @@
+"""Answer "which expiries of a symbol traded in a range" from a ``SymbolIndex`` and from fetched rows.
+
+Also times the full index build and an incremental refresh. Connection details come from
+``config.py``. Run with:
+    python benchmarks/bench_symbol_index.py BANKNIFTY 2023-03-01 2023-03-31
+"""
+import sys
+import time
+from datetime import datetime
+
+from Rmoney_bhavcopy import SymbolIndex, get_FO_bhavcopy
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    symbol = sys.argv[1] if len(sys.argv) > 1 else "BANKNIFTY"
+    start = datetime.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else datetime(2023, 3, 1)
+    end = datetime.fromisoformat(sys.argv[3]) if len(sys.argv) > 3 else datetime(2023, 3, 31)
+
+    index = SymbolIndex()
+    _, build_seconds = timed(index.refresh)
+    _, refresh_seconds = timed(index.refresh)
+    from_index, index_seconds = timed(lambda: index.expiries(symbol, start, end))
+    rows, rows_seconds = timed(lambda: get_FO_bhavcopy(start, end, [symbol], columns=["XpryDt"], transport="copy"))
+    from_rows = sorted({value.date() for value in rows["XpryDt"].dropna()})
+    assert from_index == from_rows
+
+    print(f"expiries:                   {len(from_index):>10}")
+    print(f"full index build (s):       {build_seconds:>10.3f}")
+    print(f"incremental refresh (s):    {refresh_seconds:>10.3f}")
+    print(f"lookup from index (s):      {index_seconds:>10.4f}")
+    print(f"lookup from rows (s):       {rows_seconds:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
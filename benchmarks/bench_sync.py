@@ -0,0 +1,56 @@
+"""Time a nightly ``DeltaSync.sync`` against re-pulling the full history of the same symbols.
+
+The first sync hands over the whole history and stores the watermarks; the nightly sync then
+fetches only the last ``lookback_days`` and returns the new day. Both are compared with a full
+re-pull in rows, bytes and time. Run against a database loaded by ``bench_suite.py --load``
+(synthetic symbols) with:
+    python benchmarks/bench_sync.py --host localhost --database bhav_bench [--symbols 200]
+"""
+import argparse
+import logging
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import synthetic
+from Rmoney_bhavcopy import config
+from Rmoney_bhavcopy.Bhavcopy_Reteriver import get_CM_bhavcopy
+from Rmoney_bhavcopy.sync import DeltaSync
+
+START, LAST_NIGHT, TONIGHT = datetime(2024, 1, 1), datetime(2024, 12, 30), datetime(2024, 12, 31)
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    for name, key in [("host", "hostname"), ("port", "port"), ("database", "database"), ("user", "username"), ("password", "pwd")]:
+        parser.add_argument(f"--{name}", dest=key)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--lookback-days", type=int, default=7)
+    args = parser.parse_args()
+    config.conf.update({key: value for key, value in vars(args).items() if key in config.conf and value is not None})
+    logging.disable(logging.INFO)
+    symbols = synthetic.cm_symbol_names(args.symbols)
+
+    full, full_seconds = timed(lambda: get_CM_bhavcopy(START, TONIGHT, symbols, ["EQ"], batched=True))
+    with tempfile.TemporaryDirectory() as directory:
+        state = DeltaSync(Path(directory) / "state.json", lookback_days=args.lookback_days)
+        first, first_seconds = timed(lambda: state.sync("CM", symbols, ["EQ"], end_date=LAST_NIGHT, start_date=START))
+        delta, delta_seconds = timed(lambda: state.sync("CM", symbols, ["EQ"], end_date=TONIGHT, parquet_dir=directory))
+        parquet_bytes = sum(path.stat().st_size for path in Path(directory).rglob("*.parquet"))
+    assert len(first) + len(delta) == len(full) and not delta.attrs["corrections"]
+
+    print(f"full re-pull:        {len(full):>10} rows {full.memory_usage(deep=True).sum():>12} bytes {full_seconds:>8.2f} s")
+    print(f"first sync:          {len(first):>10} rows {first.memory_usage(deep=True).sum():>12} bytes {first_seconds:>8.2f} s")
+    print(f"nightly sync:        {len(delta):>10} rows {delta.memory_usage(deep=True).sum():>12} bytes {delta_seconds:>8.2f} s")
+    print(f"nightly Parquet part: {parquet_bytes:>9} bytes")
+
+
+if __name__ == "__main__":
+    main()
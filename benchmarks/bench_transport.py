@@ -0,0 +1,46 @@
+"""Compare the "cursor" and "copy" transports of the fetch functions against a live database.
+
+Each transport is timed with the pandas backend and, when pyarrow is installed, the arrow backend.
+
+Connection details come from ``config.py``. Run with:
+    python benchmarks/bench_transport.py BANKNIFTY 2023-01-01 2023-12-31
+"""
+import sys
+import time
+from datetime import datetime
+
+from Rmoney_bhavcopy.Bhavcopy_Reteriver import TRANSPORTS, establish_connection, fetch_data_FO
+
+try:
+    import pyarrow  # noqa: F401
+    BACKENDS = ("pandas", "arrow")
+except ImportError:
+    BACKENDS = ("pandas",)
+
+
+def main():
+    symbol = sys.argv[1] if len(sys.argv) > 1 else "BANKNIFTY"
+    start = datetime.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else datetime(2023, 1, 1)
+    end = datetime.fromisoformat(sys.argv[3]) if len(sys.argv) > 3 else datetime(2023, 12, 31)
+    repeat = 3
+
+    conn = establish_connection()
+    try:
+        print(f"{'table':<22} {'transport':<10} {'backend':<8} {'rows':>10} {'best (s)':>10} {'rows/s':>12}")
+        for table in ("FO_bhavCopies_CM", "FO_Bhavcopies_UDiFF"):
+            for transport in TRANSPORTS:
+                for backend in BACKENDS:
+                    timings = []
+                    for _ in range(repeat):
+                        started = time.perf_counter()
+                        data = fetch_data_FO(conn, start, end, symbol, table, transport, backend=backend)
+                        timings.append(time.perf_counter() - started)
+                        conn.rollback()
+                    best = min(timings)
+                    print(f"{table:<22} {transport:<10} {backend:<8} {len(data):>10} {best:>10.3f} {len(data) / best:>12,.0f}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""Synthetic bhavcopy data with the exact table schemas of ``queries.TABLES``, for benchmarks.
+
+``generate`` builds seeded, realistic-looking data for every table: random-walk equity prices in
+the CM tables, full index option chains (weekly and monthly expiries, a band of strikes around the
+money priced with Black-Scholes on a volatility smile, plus the monthly futures) in the F&O tables
+and index levels in ``Indices_bhavCopies``. Trade dates before ``udiff_start`` go to the legacy
+tables in their own format (instrument codes such as ``OPTIDX``, futures with strike 0 and
+option type ``XX``), later dates to the UDiFF tables, as in the production database.
+
+``load`` (re)creates the tables in the database named by ``config.py`` and copies the data in with
+``COPY FROM STDIN``.
+
+Examples:
+    tables = generate(date(2024,1,1), date(2024,12,31), cm_symbols=100, fo_symbols=3)
+    counts = load(establish_connection(), tables)
+"""
+import io
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from Rmoney_bhavcopy.options import black_scholes
+from Rmoney_bhavcopy.queries import (
+    COLUMN_MAPPING_CM, COLUMN_MAPPING_FO, COLUMN_TYPES, INSTRUMENT_TYPES, SQL_TYPES, TABLES, quote_ident,
+)
+
+# First trade date published in the UDiFF format
+UDIFF_START = date(2024, 7, 8)
+THURSDAY = 3
+
+
+def trading_days(start, end):
+    """Weekdays from ``start`` to ``end``, both included."""
+    return [day.date() for day in pd.bdate_range(start, end)]
+
+
+def cm_symbol_names(count):
+    return [f"SYN{i:04d}" for i in range(1, count + 1)]
+
+
+def fo_symbol_names(count):
+    return [f"SYNIDX{i:02d}" for i in range(1, count + 1)]
+
+
+def index_names(count):
+    return [f"Synthetic {i}" for i in range(1, count + 1)]
+
+
+def random_walk(rng, start, steps, volatility):
+    """Prices starting at ``start`` (one per row of the result) with daily log returns of ``volatility``."""
+    returns = rng.normal(0.0, volatility, size=(len(start), steps))
+    return np.asarray(start)[:, None] * np.exp(np.cumsum(returns, axis=1))
+
+
+def _ohlc(rng, close, previous):
+    """Open, high, low around each close and the previous close."""
+    opened = previous * (1 + rng.normal(0.0, 0.004, close.shape))
+    spread = np.abs(rng.normal(0.0, 0.008, close.shape)) * close
+    return opened, np.maximum(opened, close) + spread, np.minimum(opened, close) - spread
+
+
+def monthly_expiry(year, month):
+    """Last Thursday of the month."""
+    last = (date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1))
+    return last - timedelta(days=(last.weekday() - THURSDAY) % 7)
+
+
+def expiries(day, weekly=4, monthly=3):
+    """Expiries trading on ``day``: the next ``weekly`` Thursdays and the next ``monthly`` month-ends.
+
+    Returns:
+        tuple: (option expiries, future expiries), each sorted.
+    """
+    first = day + timedelta(days=(THURSDAY - day.weekday()) % 7)
+    weeklies = [first + timedelta(weeks=k) for k in range(weekly)]
+    monthlies = []
+    year, month = day.year, day.month
+    while len(monthlies) < monthly:
+        expiry = monthly_expiry(year, month)
+        if expiry >= day:
+            monthlies.append(expiry)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return sorted(set(weeklies) | set(monthlies)), monthlies
+
+
+def generate_cm(days, symbols, rng, series=("EQ",)):
+    """One row per symbol, series and trade date in the UDiFF CM format."""
+    close = random_walk(rng, rng.uniform(50, 5000, len(symbols)), len(days), 0.018).round(2)
+    previous = np.concatenate([close[:, :1], close[:, :-1]], axis=1)
+    opened, high, low = _ohlc(rng, close, previous)
+    volume = rng.integers(1_000, 5_000_000, close.shape)
+    frame = pd.DataFrame({
+        "TradDt": np.tile(days, len(symbols)),
+        "TckrSymb": np.repeat(symbols, len(days)),
+        "ISIN": np.repeat([f"INE{i:06d}01{i % 10}" for i in range(len(symbols))], len(days)),
+        "FinInstrmId": np.repeat(np.arange(1, len(symbols) + 1), len(days)),
+        "OpnPric": opened.ravel().round(2), "HghPric": high.ravel().round(2), "LwPric": low.ravel().round(2),
+        "ClsPric": close.ravel(), "LastPric": close.ravel(), "PrvsClsgPric": previous.ravel(),
+        "TtlTradgVol": volume.ravel(), "TtlTrfVal": (volume * close).ravel().round(2),
+        "TtlNbOfTxsExctd": (volume // rng.integers(20, 200, close.shape)).ravel() + 1,
+    })
+    frames = [frame.assign(SctySrs=name) for name in series]
+    frame = pd.concat(frames, ignore_index=True)
+    return frame.assign(
+        BizDt=frame["TradDt"], Sgmt="CM", Src="NSE", FinInstrmTp="STK", FinInstrmNm=frame["TckrSymb"] + " LTD",
+        SsnId="F1", NewBrdLotQty=1,
+    )
+
+
+def generate_fo(days, symbols, rng, strikes=20, weekly=4, monthly=3, rate=0.07):
+    """Full option chains and futures of index ``symbols`` in the UDiFF F&O format.
+
+    Every trade date lists, for each symbol, the futures of the ``monthly`` nearest month-ends and
+    calls and puts at the at-the-money strike and ``strikes`` strikes on either side of it for every
+    option expiry.
+    """
+    spots = random_walk(rng, rng.uniform(15_000, 50_000, len(symbols)), len(days), 0.011)
+    rows = []
+    for s, symbol in enumerate(symbols):
+        step = 50.0 if spots[s, 0] < 30_000 else 100.0
+        for d, day in enumerate(days):
+            spot = spots[s, d]
+            option_expiries, future_expiries = expiries(day, weekly, monthly)
+            atm = round(spot / step) * step
+            ladder = atm + step * np.arange(-strikes, strikes + 1)
+            contracts = len(ladder) * 2
+            for expiry in option_expiries:
+                rows.append((day, symbol, spot, "IDO", expiry, np.tile(ladder, 2), np.repeat(["CE", "PE"], len(ladder)), contracts))
+            for expiry in future_expiries:
+                rows.append((day, symbol, spot, "IDF", expiry, np.array([np.nan]), np.array([None]), 1))
+
+    counts = np.array([row[-1] for row in rows])
+    repeat = lambda position: np.repeat([row[position] for row in rows], counts)
+    frame = pd.DataFrame({
+        "TradDt": repeat(0), "TckrSymb": repeat(1), "UndrlygPric": repeat(2).round(2), "FinInstrmTp": repeat(3),
+        "XpryDt": repeat(4),
+        "StrkPric": np.concatenate([row[5] for row in rows]), "OptnTp": np.concatenate([row[6] for row in rows]),
+    })
+    spot = frame["UndrlygPric"].to_numpy()
+    t = (pd.to_datetime(frame["XpryDt"]) - pd.to_datetime(frame["TradDt"])).dt.days.to_numpy() / 365.0
+    strike = frame["StrkPric"].to_numpy()
+    is_future = frame["FinInstrmTp"].to_numpy() == "IDF"
+    moneyness = np.log(np.where(is_future, spot, strike) / spot)
+    volatility = 0.13 + 0.9 * moneyness ** 2 + rng.normal(0.0, 0.005, len(frame))
+    option = black_scholes(spot, strike, np.maximum(t, 0.5 / 365), rate, volatility, frame["OptnTp"].to_numpy() == "CE")
+    close = np.where(is_future, spot * np.exp(rate * t), np.maximum(option, 0.05))
+    close = np.round(close / 0.05) * 0.05
+    opened, high, low = _ohlc(rng, close, close * (1 + rng.normal(0.0, 0.05, len(frame))))
+    volume = rng.integers(0, 200_000, len(frame)) * (np.abs(moneyness) < 0.05)
+    interest = rng.integers(0, 2_000_000, len(frame))
+    lot = 15
+    return frame.assign(
+        BizDt=frame["TradDt"], Sgmt="FO", Src="NSE", FinInstrmId=np.arange(1, len(frame) + 1), ISIN=None, SctySrs=None,
+        FininstrmActlXpryDt=frame["XpryDt"],
+        FinInstrmNm=frame["TckrSymb"] + pd.to_datetime(frame["XpryDt"]).dt.strftime("%y%b").str.upper()
+        + frame["StrkPric"].fillna(0).astype("int64").astype(str).where(~is_future, "FUT") + frame["OptnTp"].fillna(""),
+        OpnPric=np.maximum(opened, 0.05).round(2), HghPric=np.maximum(high, 0.05).round(2), LwPric=np.maximum(low, 0.05).round(2),
+        ClsPric=close.round(2), LastPric=close.round(2), PrvsClsgPric=close.round(2), SttlmPric=close.round(2),
+        OpnIntrst=interest, ChngInOpnIntrst=(interest * rng.normal(0.0, 0.1, len(frame))).astype("int64"),
+        TtlTradgVol=volume * lot, TtlTrfVal=(volume * lot * close).round(2), TtlNbOfTxsExctd=volume // 5,
+        SsnId="F1", NewBrdLotQty=lot,
+    )
+
+
+def generate_indices(days, names, rng):
+    """One row per index and trade date in the ``Indices_bhavCopies`` format."""
+    close = random_walk(rng, rng.uniform(5_000, 50_000, len(names)), len(days), 0.01)
+    previous = np.concatenate([close[:, :1], close[:, :-1]], axis=1)
+    opened, high, low = _ohlc(rng, close, previous)
+    return pd.DataFrame({
+        "Index Name": np.repeat(names, len(days)), "Index Date": np.tile(days, len(names)),
+        "Open Index Value": opened.ravel().round(2), "High Index Value": high.ravel().round(2),
+        "Low Index Value": low.ravel().round(2), "Closing Index Value": close.ravel().round(2),
+        "Points Change": (close - previous).ravel().round(2),
+        "Change(%)": ((close / previous - 1) * 100).ravel().round(2),
+        "Volume": rng.integers(10_000_000, 500_000_000, close.size),
+        "Turnover (Rs. Cr.)": rng.uniform(5_000, 50_000, close.size).round(2),
+        "P/E": rng.uniform(15, 30, close.size).round(2), "P/B": rng.uniform(2, 6, close.size).round(2),
+        "Div Yield": rng.uniform(0.5, 2.0, close.size).round(2),
+    })
+
+
+def to_legacy(frame, segment):
+    """Rename UDiFF rows to the legacy table's columns and codes."""
+    mapping = {"CM": COLUMN_MAPPING_CM, "FO": COLUMN_MAPPING_FO}[segment]
+    legacy = frame.rename(columns={udiff: name for name, udiff in mapping.items()})
+    if segment == "FO":
+        reverse = {udiff: name for name, udiff in INSTRUMENT_TYPES.items()}
+        legacy["INSTRUMENT"] = legacy["INSTRUMENT"].map(reverse)
+        is_future = legacy["INSTRUMENT"].str.startswith("FUT")
+        legacy["STRIKE_PR"] = legacy["STRIKE_PR"].fillna(0.0)
+        legacy["OPTION_TYP"] = legacy["OPTION_TYP"].where(~is_future, "XX")
+        legacy["VAL_INLAKH"] = (legacy["VAL_INLAKH"] / 1e5).round(2)
+        legacy["CONTRACTS"] = legacy["CONTRACTS"] // frame["NewBrdLotQty"]
+    return legacy
+
+
+def generate(start, end, cm_symbols=100, fo_symbols=3, indices=5, strikes=20, udiff_start=UDIFF_START, seed=0):
+    """Generate every table for the trade dates from ``start`` to ``end``.
+
+    Parameters:
+        start, end (date): Date range; weekdays are trade dates.
+        cm_symbols, fo_symbols, indices (int): Number of equities, index derivative underlyings and indices.
+        strikes (int): Strikes on either side of the money in every option chain.
+        udiff_start (date): First trade date stored in the UDiFF tables.
+        seed (int): Seed of the random generator; the same arguments give the same data.
+
+    Returns:
+        dict: Table name -> DataFrame with the table's columns in order.
+    """
+    rng = np.random.default_rng(seed)
+    days = trading_days(start, end)
+    cm = generate_cm(days, cm_symbol_names(cm_symbols), rng)
+    fo = generate_fo(days, fo_symbol_names(fo_symbols), rng, strikes)
+    tables = {"Indices_bhavCopies": generate_indices(days, index_names(indices), rng)}
+    for segment, frame, udiff_table, legacy_table in [
+        ("CM", cm, "bhavcopies_udiff", "bhavcopies_cm"),
+        ("FO", fo, "FO_Bhavcopies_UDiFF", "FO_bhavCopies_CM"),
+    ]:
+        udiff = frame["TradDt"] >= udiff_start
+        tables[udiff_table] = frame[udiff].reset_index(drop=True)
+        tables[legacy_table] = to_legacy(frame[~udiff].reset_index(drop=True), segment)
+    return {name: table.reindex(columns=TABLES[name]["columns"]) for name, table in tables.items()}
+
+
+def column_sql(column, quoted=False):
+    """Column name as written in DDL and COPY statements, which take no ``%s`` parameters."""
+    return quote_ident(column, quoted).replace("%%", "%")
+
+
+def create_tables(conn, tables=TABLES):
+    """Drop and create ``tables`` with the columns and types of ``queries.TABLES``, indexed on symbol and date."""
+    cur = conn.cursor()
+    for name in tables:
+        spec = TABLES[name]
+        quoted = spec.get("quoted", False)
+        columns = ", ".join(f"{column_sql(column, quoted)} {SQL_TYPES[COLUMN_TYPES[column]]}" for column in spec["columns"])
+        cur.execute(f"DROP TABLE IF EXISTS {name}")
+        cur.execute(f"CREATE TABLE {name} ({columns})")
+        cur.execute(f"CREATE INDEX ON {name} ({column_sql(spec['symbol'], quoted)}, {column_sql(spec['date'], quoted)})")
+    conn.commit()
+
+
+def load(conn, tables):
+    """Create the tables and copy the generated rows in. Returns the number of rows per table."""
+    create_tables(conn, tables)
+    cur = conn.cursor()
+    for name, frame in tables.items():
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False, date_format="%Y-%m-%d", float_format="%.4f")
+        buffer.seek(0)
+        columns = ", ".join(column_sql(column, TABLES[name].get("quoted", False)) for column in frame.columns)
+        cur.copy_expert(f"COPY {name} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        cur.execute(f"ANALYZE {name}")
+    conn.commit()
+    return {name: len(frame) for name, frame in tables.items()}
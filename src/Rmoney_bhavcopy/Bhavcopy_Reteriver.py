@@ -1,47 +1,28 @@
 import pandas as pd
+import io
 import json
 import psycopg2
 from dateutil.parser import parse
 from datetime import datetime
 import logging
+import uuid
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 # import config
 from . import config
+from .assembly import FrameCollector
+from . import backends
+from .backends import require_backend, to_backend
+from .schema import normalize as normalize_dtypes
+from .panel import OUTPUTS, PANEL_AXES, PanelError, panel_fields, to_panel
+from .result_cache import freeze
+from .profiling import stage, symbol_scope
+from .queries import build_query, build_union_query, fo_filters, resolve_columns, ROW_KEYS, UDIFF_COLUMNS, INDICES_COLUMNS
+# Configuration Mapping for headers, shared with the SQL builders
+from .queries import COLUMN_MAPPING_CM, COLUMN_MAPPING_FO
 from typing import List,Optional
 
-# Configuration Mapping for headers
-COLUMN_MAPPING_CM = {
-    "SYMBOL": "TckrSymb",
-    "SERIES": "SctySrs",
-    "OPEN": "OpnPric",
-    "HIGH": "HghPric",
-    "LOW": "LwPric",
-    "CLOSE": "ClsPric",
-    "LAST": "LastPric",
-    "PREVCLOSE": "PrvsClsgPric",
-    "TOTTRDQTY": "TtlTradgVol",
-    "TOTTRDVAL": "TtlTrfVal",
-    "TIMESTAMP": "TradDt",
-    "TOTALTRADES": "TtlNbOfTxsExctd",
-    "ISIN": "ISIN"
-}
-COLUMN_MAPPING_FO = {
-    "INSTRUMENT": "FinInstrmTp",
-    "SYMBOL": "TckrSymb",
-    "EXPIRY_DT": "XpryDt",
-    "STRIKE_PR": "StrkPric",
-    "OPTION_TYP": "OptnTp",
-    "OPEN": "OpnPric",
-    "HIGH": "HghPric",
-    "LOW": "LwPric",
-    "CLOSE": "ClsPric",
-    "SETTLE_PR": "SttlmPric",
-    "CONTRACTS": "TtlTradgVol",
-    "VAL_INLAKH": "TtlTrfVal",
-    "OPEN_INT": "OpnIntrst",
-    "CHG_IN_OI": "ChngInOpnIntrst",
-    "TIMESTAMP": "TradDt"
-    
-}
+TRANSPORTS = ("cursor", "copy")
 
 # Initialize logging
 logging.basicConfig(level=logging.INFO)
@@ -54,113 +35,89 @@ def get_config_data():
 def establish_connection():
     """Establish a database connection."""
     config_data = get_config_data()
-    return psycopg2.connect(
-        host=config_data['hostname'],
-        database=config_data['database'],
-        user=config_data['username'],
-        password=config_data['pwd'],
-        port=config_data['port']
-    )
-
-def fetch_data_CM(conn, startdate, enddate, symbol, series, table_name):
-    """Fetch data from the specified table based on parameters."""
-    cur = conn.cursor()
-    
-    if table_name == "bhavcopies_cm":
-        query = """
-            SELECT * FROM bhavcopies_cm
-            WHERE timestamp >= %s AND timestamp <= %s
-            AND symbol = %s AND series = %s
-        """
-        columns = [
-            "SYMBOL", "SERIES", "OPEN", "HIGH", "LOW", "CLOSE", "LAST",
-            "PREVCLOSE", "TOTTRDQTY", "TOTTRDVAL", "TIMESTAMP", "TOTALTRADES", "ISIN"
-        ]
-    elif table_name == "bhavcopies_udiff":
-        query = """
-            SELECT * FROM bhavcopies_udiff
-            WHERE TradDt >= %s AND TradDt <= %s
-            AND TckrSymb = %s AND SctySrs = %s
-        """
-        columns = [
-            "TradDt", "BizDt", "Sgmt", "Src", "FinInstrmTp", "FinInstrmId", "ISIN",
-            "TckrSymb", "SctySrs", "XpryDt", "FininstrmActlXpryDt", "StrkPric", "OptnTp",
-            "FinInstrmNm", "OpnPric", "HghPric", "LwPric", "ClsPric", "LastPric",
-            "PrvsClsgPric", "UndrlygPric", "SttlmPric", "OpnIntrst", "ChngInOpnIntrst",
-            "TtlTradgVol", "TtlTrfVal", "TtlNbOfTxsExctd", "SsnId", "NewBrdLotQty",
-            "Rmks", "Rsvd1", "Rsvd2", "Rsvd3", "Rsvd4"
-        ]
-    else:
-        raise ValueError("Invalid table name provided.")
-
-    cur.execute(query, (startdate, enddate, symbol, series))
-    result = cur.fetchall()
-    return pd.DataFrame(result, columns=columns)
-
-def fetch_data_FO(conn, startdate, enddate, symbol, table_name):
-    """Fetch data from the specified table based on provided parameters."""
-    cur = conn.cursor()
-
-    if table_name == "FO_bhavCopies_CM":
-        query = """
-            SELECT * FROM  FO_bhavCopies_CM
-            WHERE TIMESTAMP >= %s AND TIMESTAMP <= %s
-            AND SYMBOL = %s
-        """
-        columns = [
-            "INSTRUMENT", "SYMBOL", "EXPIRY_DT", "STRIKE_PR", "OPTION_TYP", "OPEN", "HIGH", 
-        "LOW", "CLOSE", "SETTLE_PR", "CONTRACTS", "VAL_INLAKH", "OPEN_INT", "CHG_IN_OI", "TIMESTAMP"
-        ]
-       
-    elif table_name == "FO_Bhavcopies_UDiFF":
-        query = """
-            SELECT * FROM FO_Bhavcopies_UDiFF 
-            WHERE TradDt >= %s AND TradDt <= %s 
-            AND TckrSymb = %s 
-        """
-        columns = [
-            "TradDt", "BizDt", "Sgmt", "Src", "FinInstrmTp", "FinInstrmId", "ISIN",
-            "TckrSymb", "SctySrs", "XpryDt", "FininstrmActlXpryDt", "StrkPric", "OptnTp",
-            "FinInstrmNm", "OpnPric", "HghPric", "LwPric", "ClsPric", "LastPric",
-            "PrvsClsgPric", "UndrlygPric", "SttlmPric", "OpnIntrst", "ChngInOpnIntrst",
-            "TtlTradgVol", "TtlTrfVal", "TtlNbOfTxsExctd", "SsnId", "NewBrdLotQty",
-            "Rmks", "Rsvd1", "Rsvd2", "Rsvd3", "Rsvd4"
-        ]
-    else:
-        raise ValueError("Invalid table name provided.")
-
-    cur.execute(query, (startdate, enddate, symbol))
-    
-    result = cur.fetchall()
-
-    return pd.DataFrame(result, columns=columns)
-
-def fetch_data_Indices(conn, startdate, enddate, symbol, table_name):
-    """Fetch data from the specified table based on provided parameters."""
-
+    with stage("connect"):
+        return psycopg2.connect(
+            host=config_data['hostname'],
+            database=config_data['database'],
+            user=config_data['username'],
+            password=config_data['pwd'],
+            port=config_data['port']
+        )
+
+def run_query(conn, query, params, columns, transport="cursor", backend="pandas"):
+    """Run ``query`` and return its rows as a DataFrame with ``columns``.
+
+    ``transport`` selects how rows leave the database: "cursor" fetches Python tuples with
+    ``fetchall()``; "copy" streams the result as CSV through ``COPY ... TO STDOUT`` and parses it
+    with pandas' C reader using the dtypes from ``COLUMN_TYPES``, which is much faster for large pulls.
+    With ``backend="arrow"`` (also used for "polars") the rows are built into a ``pyarrow.Table`` instead.
+    """
     cur = conn.cursor()
+    if transport == "cursor":
+        if backend != "pandas":
+            backends.float_numerics(cur)
+        with stage("execute"):
+            cur.execute(query, params)
+        with stage("fetch") as timing:
+            result = cur.fetchall()
+            timing.rows = len(result)
+        with stage("build") as timing:
+            frame = backends.from_rows(result, columns, arrow_backend(backend))
+            timing.measure(frame)
+        return frame
+    if transport == "copy":
+        return copy_query(cur, query, params, columns, backend)
+    raise ValueError(f"Invalid transport: {transport}. Expected one of {TRANSPORTS}.")
+
+def copy_query(cur, query, params, columns, backend="pandas"):
+    """Fetch ``query`` with ``COPY ... TO STDOUT`` in CSV format into memory and parse it."""
+    sql = cur.mogrify(query, params).decode("utf-8")
+    buffer = io.BytesIO()
+    with stage("copy") as timing:
+        cur.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv)", buffer)
+        timing.bytes = buffer.tell()
+    if buffer.tell() == 0:
+        return backends.empty(columns, arrow_backend(backend))
+    buffer.seek(0)
+    with stage("parse") as timing:
+        frame = backends.from_csv(buffer, columns, arrow_backend(backend))
+        timing.measure(frame)
+    return frame
+
+def arrow_backend(backend):
+    """Polars results are built as Arrow tables and wrapped at the end; other backends build themselves."""
+    return "arrow" if backend == "polars" else backend
+
+def fetch_data_CM(conn, startdate, enddate, symbol, series, table_name, transport="cursor", columns=None, backend="pandas"):
+    """Fetch data from the specified table based on parameters.
+
+    ``symbol`` and ``series`` may be lists to fetch many symbols/series in a single query.
+    ``columns`` limits the result to some of the table's own columns.
+    """
+    query, params, columns = build_query(table_name, "CM", startdate, enddate, symbol, series, columns)
+    with symbol_scope(symbol):
+        return run_query(conn, query, params, columns, transport, backend)
 
-    if table_name == "Indices_bhavCopies":
-        query = """
-            SELECT * FROM Indices_bhavCopies
-            WHERE "Index Date" >= %s AND "Index Date" <= %s
-            AND "Index Name" = %s
-
-"""
+def fetch_data_FO(conn, startdate, enddate, symbol, table_name, transport="cursor", columns=None, filters=None, backend="pandas"):
+    """Fetch data from the specified table based on provided parameters.
 
-        column = [
-            "Index Name", "Index Date", "Open Index Value", "High Index Value", "Low Index Value", 
-            "Closing Index Value", "Points Change", "Change(%)", "Volume", "Turnover (Rs. Cr.)", 
-            "P/E", "P/B", "Div Yield"
-        ]
-    else:
-        raise ValueError("Invalid table name provided.")
-    
-    cur.execute(query,(startdate,enddate,symbol))
+    ``symbol`` may be a list to fetch many symbols in a single query.
+    ``columns`` limits the result to some of the table's own columns and ``filters`` (from
+    ``fo_filters``) to some contracts.
+    """
+    query, params, columns = build_query(table_name, "FO", startdate, enddate, symbol, columns=columns, filters=filters)
+    with symbol_scope(symbol):
+        return run_query(conn, query, params, columns, transport, backend)
 
-    result = cur.fetchall()
+def fetch_data_Indices(conn, startdate, enddate, symbol, table_name, transport="cursor", columns=None, backend="pandas"):
+    """Fetch data from the specified table based on provided parameters.
 
-    return pd.DataFrame(result, columns=column)
+    ``symbol`` may be a list to fetch many indices in a single query.
+    ``columns`` limits the result to some of the table's columns.
+    """
+    query, params, columns = build_query(table_name, "Indices", startdate, enddate, symbol, columns=columns)
+    with symbol_scope(symbol):
+        return run_query(conn, query, params, columns, transport, backend)
 
 def map_columns_CM(dataframe, mapping, source_table):
     """Map DataFrame columns to a unified format."""
@@ -175,6 +132,29 @@ def map_columns_FO(dataframe, mapping, source_table):
 
     return dataframe
 
+def resolve_client(client=None):
+    """Return ``client``, or the shared default client when it is None."""
+    if client is None:
+        from .client import get_default_client
+        client = get_default_client()
+    return client
+
+def remote_client(client=None):
+    """Return ``client``, or the shared default client, when it is a ``server.RemoteClient``; otherwise None."""
+    from .server import RemoteClient
+    client = resolve_client(client)
+    return client if isinstance(client, RemoteClient) else None
+
+def pool_client(client=None, caller="This function"):
+    """Return ``client``, or the shared default client, for code borrowing connections from its pool.
+
+    A ``server.RemoteClient`` has no connection pool, so it raises a ``TypeError``.
+    """
+    client = resolve_client(client)
+    if remote_client(client) is not None:
+        raise TypeError(f"{caller} needs a database connection pool and cannot run through a RemoteClient; pass a BhavcopyClient as client=.")
+    return client
+
 def parse_date(date_str):
     """Parse input date to 'YYYY-MM-DD' format."""
     try:
@@ -183,7 +163,129 @@ def parse_date(date_str):
     except Exception as e:
         raise ValueError(f"Invalid date format: {date_str}. Error: {e}")
 
-def get_CM_bhavcopy(start_date:Optional[datetime.date]=datetime(2016,1,1), end_date:Optional[datetime.date]=datetime.now(), symbols :Optional[List[str]]=None, series:Optional[List[str]]=None):
+def sort_rows(dataframe, segment):
+    """Order unified rows by trade date, symbol and contract (``ROW_KEYS``)."""
+    with stage("sort") as timing:
+        timing.rows = len(dataframe)
+        return backends.sort(dataframe, ROW_KEYS[segment])
+
+def project(dataframe, columns):
+    """Keep only ``columns`` of ``dataframe``; None keeps every column."""
+    return backends.select(dataframe, columns)
+
+def with_columns(columns, *required):
+    """Extend a projection with the ``required`` columns needed before projecting; None stays None."""
+    if columns is None:
+        return None
+    return columns + [column for column in required if column not in columns]
+
+def load_CM(conn, startdate, enddate, symbols, series, transport="cursor", columns=None, backend="pandas"):
+    """Fetch both CM tables for the given symbols and series in the UDiFF format with one UNION ALL query.
+
+    ``columns`` projects the result; the ``ROW_KEYS`` are fetched as well so rows sort the same way.
+    """
+    query, params, fetched = build_union_query("CM", startdate, enddate, symbols, series, with_columns(columns, *ROW_KEYS["CM"]))
+    with symbol_scope(symbols):
+        return project(sort_rows(run_query(conn, query, params, fetched, transport, backend), "CM"), columns)
+
+def load_FO(conn, startdate, enddate, symbols, transport="cursor", columns=None, filters=None, backend="pandas"):
+    """Fetch both FO tables for the given symbols in the UDiFF format with one UNION ALL query.
+
+    ``columns`` projects the result; the ``ROW_KEYS`` are fetched as well so rows sort the same way.
+    ``filters`` (from ``fo_filters``) are applied to both tables in the WHERE clause.
+    """
+    query, params, fetched = build_union_query("FO", startdate, enddate, symbols, columns=with_columns(columns, *ROW_KEYS["FO"]), filters=filters)
+    with symbol_scope(symbols):
+        return project(sort_rows(run_query(conn, query, params, fetched, transport, backend), "FO"), columns)
+
+def normalize_result(dataframe, normalize=True):
+    """Convert a getter result to the compact dtypes of ``schema.normalize`` unless ``normalize`` is False.
+
+    Arrow tables are already typed; only their low-cardinality text columns are dictionary-encoded.
+    """
+    if not normalize:
+        return dataframe
+    if backends.is_arrow(dataframe):
+        return backends.normalize_arrow(dataframe)
+    return normalize_dtypes(dataframe)
+
+def finish_result(dataframe, normalize=True, output="frame", segment=None, fields=None, symbols=None, backend="pandas"):
+    """Normalize a getter result and return it as ``backend``, or for ``output="panel"`` as a ``Panel`` of ``fields``."""
+    with stage("normalize") as timing:
+        dataframe = normalize_result(dataframe, normalize)
+        if normalize:
+            timing.measure(dataframe)
+    with stage("convert"):
+        if output != "panel":
+            return to_backend(dataframe, backend)
+        axes = PANEL_AXES[segment]
+        return to_panel(dataframe, fields, axes["date"], axes["symbol"], symbols)
+
+def panel_columns(segment, columns, output, backend="pandas"):
+    """Return the fields pivoted for ``output="panel"`` and the columns to fetch for them."""
+    if output not in OUTPUTS:
+        raise ValueError(f"Invalid output {output!r}; expected one of {list(OUTPUTS)}")
+    if output != "panel":
+        return None, columns
+    if backend != "pandas":
+        raise ValueError("output='panel' is only available with backend='pandas'")
+    fields = panel_fields(segment, columns)
+    if not fields:
+        raise ValueError("output='panel' needs at least one numeric column")
+    axes = PANEL_AXES[segment]
+    return fields, with_columns(fields, axes["date"], axes["symbol"])
+
+def order_by_symbols(dataframe, column, symbols):
+    """Order rows by the position of their symbol in ``symbols``, keeping the order within each symbol."""
+    return backends.order_by_symbols(dataframe, column, symbols)
+
+def run_parallel(client, tasks, max_workers):
+    """Run ``tasks`` on a thread pool, each task borrowing its own pooled connection.
+
+    Each task is a callable taking a connection. Results come back in task order; a task that
+    raised yields its exception in place of a result.
+    """
+    def run(task):
+        with client.connection() as conn:
+            return task(conn)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Each task runs in a copy of the caller's context so an active ``profile`` sees its stages
+        futures = [executor.submit(contextvars.copy_context().run, run, task) for task in tasks]
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+    return results
+
+def collect_parallel(symbols, results, per_symbol, combine):
+    """Combine ``per_symbol`` consecutive task results for each symbol, collecting failures.
+
+    Returns:
+        DataFrame: the combined frames in ``symbols`` order, with ``attrs["errors"]`` mapping each
+        failed symbol to its error message.
+    """
+    all_data = FrameCollector()
+    errors = {}
+    for i, symbol in enumerate(symbols):
+        parts = results[i * per_symbol:(i + 1) * per_symbol]
+        failed = next((part for part in parts if isinstance(part, Exception)), None)
+        if failed is not None:
+            logger.error(f"Error processing symbol {symbol}: {failed}")
+            errors[symbol] = str(failed)
+            continue
+        all_data.append(combine(*parts))
+    return backends.with_errors(all_data.result(), errors)
+
+def failed_call(symbols, error):
+    """Errors of a call that failed as a whole: every requested symbol, or "*" when none was given."""
+    if isinstance(symbols, list) and symbols:
+        return {str(symbol): str(error) for symbol in symbols}
+    return {"*": str(error)}
+
+def get_CM_bhavcopy(start_date:Optional[datetime.date]=datetime(2016,1,1), end_date:Optional[datetime.date]=datetime.now(), symbols :Optional[List[str]]=None, series:Optional[List[str]]=None, batched:bool=False, client=None, cache=None, transport:str="cursor", max_workers:int=1, columns:Optional[List[str]]=None, normalize:bool=True, output:str="frame", backend:str="pandas", index=None, result_cache=None):
     """
     Get the BhavCopy data for multiple symbols over a specified date range, ensuring consistent column mapping across different data sources.
         This function retrieves historical data from 2016-01-01 to yesterday's date
@@ -192,6 +294,18 @@ Parameters:
     enddate (str): The ending date for the data retrieval in 'YYYY-MM-DD' format.
     symbols (list): A list of financial symbols (e.g., stock tickers) for which data is to be fetched.
     series (str): The type of data series to retrieve (e.g., 'EQ', 'GB','GS','SG').
+    batched (bool): Fetch all symbols and series with one query per source table instead of one query per symbol and series.
+    client (BhavcopyClient): Client whose connection pool is used. Defaults to the shared default client. With a ``RemoteClient`` the call is answered by its query server; cache, index and result_cache are then left to the server.
+    cache (BhavcopyCache): Local Parquet cache to read from; only dates it does not hold are fetched from the database.
+    transport (str): "cursor" (default) fetches rows as Python objects; "copy" uses COPY ... TO STDOUT for high-volume pulls and returns float64/datetime64 columns.
+    max_workers (int): Run the per-symbol queries on this many threads, each with its own pooled connection. Symbols that fail are listed in ``result.attrs["errors"]``. Ignored with batched or cache.
+    columns (list): Return only these UDiFF columns (e.g. ['TradDt', 'TckrSymb', 'ClsPric']); only they are read and sent by the database. Defaults to all columns.
+    normalize (bool): Convert the result to compact dtypes (float64 prices, Int64 volumes and OI, datetime64 dates, category symbols/series/types). Defaults to True; pass False for the raw psycopg2 values.
+    output (str): "frame" (default) returns the long DataFrame; "panel" returns a ``Panel`` of date x symbol float64 arrays, one per field (OpnPric, HghPric, LwPric, ClsPric and TtlTradgVol, or the numeric ``columns`` requested), on a shared trading-date axis with symbols in the requested order.
+    backend (str): "pandas" (default) returns a DataFrame; "arrow" a ``pyarrow.Table`` and "polars" a ``polars.DataFrame``, both built column by column from the fetched rows without going through pandas. With "arrow", failed symbols are in the ``errors`` schema metadata. Results read from a cache are converted.
+    index (SymbolIndex): Validate symbols against this index before querying: unknown symbols raise a ValueError naming the closest known ones, and symbols the index shows without rows in the date range are not queried.
+        When this segment of the index was never built or is older than its ``max_age``, it is refreshed first inside this call; the first build runs a GROUP BY over the segment's whole source tables, so call ``index.refresh()`` beforehand to keep that out of the getter.
+    result_cache (ResultCache): Keep results in this in-memory cache; identical calls, and calls for a date range inside a cached one, are answered without querying the database.
 
 Examples:
     Example 1: Fetching CM bhavcopy Data for Specific Stocks
@@ -250,6 +364,27 @@ Examples:
             raise ValueError(f"Expected datetime, but got {type(end_date).__name__}")
     if start_date > end_date:
         raise ValueError("startdate must be earlier than enddate.")
+    if columns is not None:
+        columns = resolve_columns(columns, UDIFF_COLUMNS)
+    require_backend(backend)
+    fields, columns = panel_columns("CM", columns, output, backend)
+    remote = remote_client(client)
+    if remote is not None:
+        symbols = [symbol.upper() for symbol in symbols] if symbols else symbols
+        params = dict(start_date=start_date, end_date=end_date, symbols=symbols, series=series, batched=batched,
+                      transport=transport, max_workers=max_workers, columns=columns)
+        return finish_result(remote.fetch("CM", params, backend), normalize, output, "CM", fields, symbols, backend)
+    if index is not None and symbols:
+        symbols = index.check("CM", [symbol.upper() for symbol in symbols], start_date, end_date, series if isinstance(series, list) else None, client)
+        if not symbols:
+            return finish_result(pd.DataFrame(columns=columns or UDIFF_COLUMNS), normalize, output, "CM", fields, symbols, backend)
+    if result_cache is not None and symbols and isinstance(symbols, list) and isinstance(series, list):
+        symbols = [symbol.upper() for symbol in symbols]
+        fetched = with_columns(columns, "TradDt", "TckrSymb")
+        key = freeze([sorted(series), normalize, transport, arrow_backend(backend)])
+        combined_data = result_cache.fetch("CM", key, symbols, fetched, start_date, end_date, lambda: get_CM_bhavcopy(
+            start_date, end_date, symbols, series, batched, client, cache, transport, max_workers, fetched, normalize, backend=arrow_backend(backend)))
+        return finish_result(project(combined_data, columns), False, output, "CM", fields, symbols, backend)
         
         
         # Validate date range
@@ -271,52 +406,93 @@ Examples:
         if not series or not isinstance(series, list) or not all(isinstance(s, str) for s in series):
             raise ValueError("Series must be a non-empty list of strings.")
 
-        conn = establish_connection()
-        logger.info("Database connection established.")
-        
-        all_data = pd.DataFrame()
+        client = resolve_client(client)
+
+        if max_workers > 1 and not batched and cache is None:
+            symbols = list(dict.fromkeys(symbols))
+            logger.info(f"Fetching data for {len(symbols)} symbols on {max_workers} threads")
+            tasks = [
+                lambda conn, symbol=symbol: load_CM(conn, start_date, end_date, symbol, series, transport, columns, backend)
+                for symbol in symbols
+            ]
+            results = run_parallel(client, tasks, max_workers)
+            return finish_result(collect_parallel(symbols, results, 1, lambda combined_data: combined_data), normalize, output, "CM", fields, symbols, backend)
+
+        conn = client.getconn()
+        logger.info("Database connection acquired.")
+
+        if cache is not None:
+            keys = [(symbol, s) for symbol in dict.fromkeys(symbols) for s in series]
+            cached_data = cache.fetch(
+                "CM", keys, start_date, end_date,
+                lambda group, lo, hi: load_CM(conn, lo, hi, sorted({k[0] for k in group}), sorted({k[1] for k in group}), transport),
+                columns=UDIFF_COLUMNS,
+            )
+            return finish_result(project(cached_data, columns), normalize, output, "CM", fields, symbols, backend)
+
+        if batched:
+            symbols = list(dict.fromkeys(symbols))
+            logger.info(f"Fetching data for {len(symbols)} symbols in batched mode")
+            combined_data = load_CM(conn, start_date, end_date, symbols, series, transport, with_columns(columns, "TckrSymb"), backend)
+            return finish_result(project(order_by_symbols(combined_data, "TckrSymb", symbols), columns), normalize, output, "CM", fields, symbols, backend)
+
+        all_data = FrameCollector()
+        errors = {}
         for symbol in symbols:
             try:
                 logger.info(f"Fetching data for symbol: {symbol}")
                 
-                # Fetch data from both tables for each series
-                cm_data = pd.DataFrame()
-                udiff_data = pd.DataFrame()
-                
-                for s in series:
-                    cm_data_temp = fetch_data_CM(conn, start_date, end_date, symbol, s, "bhavcopies_cm")
-                    udiff_data_temp = fetch_data_CM(conn, start_date, end_date, symbol, s, "bhavcopies_udiff")
-                    
-                    cm_data = pd.concat([cm_data, cm_data_temp], ignore_index=True)
-                    udiff_data = pd.concat([udiff_data, udiff_data_temp], ignore_index=True)
-                
-                # Map and merge data
-                cm_data_mapped = map_columns_CM(cm_data, COLUMN_MAPPING_CM, "bhavcopies_cm")
-                combined_data = pd.merge(udiff_data, cm_data_mapped, how="outer")
+                # Fetch both tables for every series, already mapped and merged by the database
+                combined_data = load_CM(conn, start_date, end_date, symbol, series, transport, columns, backend)
                 
-                # Append to the cumulative DataFrame
-                all_data = pd.concat([all_data, combined_data], ignore_index=True)
+                # Collect for a single concatenation at the end
+                all_data.append(combined_data)
 
             except Exception as e:
                 logger.error(f"Error processing symbol {symbol}: {e}")
+                errors[symbol] = str(e)
+                # A failed query aborts the transaction; end it so the next symbol can be queried
+                conn.rollback()
 
-        return all_data
+        return finish_result(backends.with_errors(all_data.result(), errors), normalize, output, "CM", fields, symbols, backend)
 
+    except PanelError:
+        # The rows were fetched but do not fit a panel: not a failure to report per symbol
+        raise
     except Exception as e:
         logger.error(f"Error: {e}")
-        return pd.DataFrame()
+        return finish_result(backends.with_errors(pd.DataFrame(), failed_call(symbols, e)), normalize, output, "CM", fields, symbols, backend)
     finally:
         if conn:
-            conn.close()
-            logger.info("Database connection closed.")
+            client.putconn(conn)
+            logger.info("Database connection released.")
 
-def get_FO_bhavcopy(start_date:Optional[datetime.date]=datetime(2016,1,1), end_date:Optional[datetime.date]=datetime.now(), symbols :Optional[List[str]]=None):
+def get_FO_bhavcopy(start_date:Optional[datetime.date]=datetime(2016,1,1), end_date:Optional[datetime.date]=datetime.now(), symbols :Optional[List[str]]=None, batched:bool=False, client=None, cache=None, transport:str="cursor", max_workers:int=1, columns:Optional[List[str]]=None,
+                    instruments:Optional[List[str]]=None, option_types:Optional[List[str]]=None, expiries:Optional[List[datetime.date]]=None, nearest_expiries:Optional[int]=None, strike_range:Optional[tuple]=None, atm_strikes:Optional[int]=None, normalize:bool=True, backend:str="pandas", index=None, result_cache=None):
     """Get the BhavCopy data for multiple symbols over a specified date range, ensuring consistent column mapping across different data sources.
         This function retrieves historical data from 2016-01-01 to yesterday's date
 Parameters:
     startdate (datetime): The starting date for the data retrieval in 'YYYY,MM,DD' format.
     enddate (datetime): The ending date for the data retrieval in 'YYYY,MM,DD' format.
     symbols (list): A list of financial symbols (e.g., BANKNIFTY tickers) for which data is to be fetched.
+    batched (bool): Fetch all symbols with one query per source table instead of one query per symbol.
+    client (BhavcopyClient): Client whose connection pool is used. Defaults to the shared default client. With a ``RemoteClient`` the call is answered by its query server; cache, index and result_cache are then left to the server.
+    cache (BhavcopyCache): Local Parquet cache to read from; only dates it does not hold are fetched from the database.
+    transport (str): "cursor" (default) fetches rows as Python objects; "copy" uses COPY ... TO STDOUT for high-volume pulls and returns float64/datetime64 columns.
+    max_workers (int): Run the per-symbol queries on this many threads, each with its own pooled connection. Symbols that fail are listed in ``result.attrs["errors"]``. Ignored with batched or cache.
+    columns (list): Return only these UDiFF columns (e.g. ['TradDt', 'TckrSymb', 'ClsPric']); only they are read and sent by the database. Defaults to all columns.
+    instruments (list): Keep only these instrument types, in either format (e.g. ['OPTIDX'] or ['IDO']).
+    option_types (list): Keep only these option types (e.g. ['CE']).
+    expiries (list): Keep only contracts expiring on these dates.
+    nearest_expiries (int): Keep only the N nearest expiries of each symbol on each trade date.
+    strike_range (tuple): (low, high) strike bounds, either may be None. Keeps option rows only.
+    atm_strikes (int): Keep the at-the-money strike and k strikes on either side of it for each trade date and expiry. Keeps option rows only.
+        The contract filters run in the database on both source tables. The cache is not used when any of them is set.
+    normalize (bool): Convert the result to compact dtypes (float64 prices, Int64 volumes and OI, datetime64 dates, category symbols/series/types). Defaults to True; pass False for the raw psycopg2 values.
+    backend (str): "pandas" (default) returns a DataFrame; "arrow" a ``pyarrow.Table`` and "polars" a ``polars.DataFrame``, both built column by column from the fetched rows without going through pandas. With "arrow", failed symbols are in the ``errors`` schema metadata. Results read from a cache are converted.
+    index (SymbolIndex): Validate symbols against this index before querying: unknown symbols raise a ValueError naming the closest known ones, and symbols the index shows without rows in the date range are not queried.
+        When this segment of the index was never built or is older than its ``max_age``, it is refreshed first inside this call; the first build runs a GROUP BY over the segment's whole source tables, so call ``index.refresh()`` beforehand to keep that out of the getter.
+    result_cache (ResultCache): Keep results in this in-memory cache; identical calls, and calls for a date range inside a cached one, are answered without querying the database.
     
 
 Examples:
@@ -355,7 +531,8 @@ Examples:
 
 """ 
     conn = None
-    all_data = pd.DataFrame()  # Initialize an empty DataFrame for all symbols
+    all_data = FrameCollector()  # Collect per-symbol frames, concatenated once at the end
+    errors = {}
 
     # Raise an error if startdate or enddate is not datetime
     if not isinstance(start_date, datetime):
@@ -367,45 +544,107 @@ Examples:
      # Convert symbols to upper case for consistency
     if symbols:
         symbols = [symbol.upper() for symbol in symbols]
+    if columns is not None:
+        columns = resolve_columns(columns, UDIFF_COLUMNS)
+    filters = fo_filters(instruments, option_types, expiries, nearest_expiries, strike_range, atm_strikes)
+    require_backend(backend)
+    remote = remote_client(client)
+    if remote is not None:
+        params = dict(start_date=start_date, end_date=end_date, symbols=symbols, batched=batched, transport=transport,
+                      max_workers=max_workers, columns=columns, instruments=instruments, option_types=option_types,
+                      expiries=expiries, nearest_expiries=nearest_expiries, strike_range=strike_range, atm_strikes=atm_strikes)
+        return finish_result(remote.fetch("FO", params, backend), normalize, backend=backend)
+    if index is not None and symbols:
+        symbols = index.check("FO", symbols, start_date, end_date, client=client)
+        if not symbols:
+            return finish_result(pd.DataFrame(columns=columns or UDIFF_COLUMNS), normalize, backend=backend)
+    if result_cache is not None and symbols and isinstance(symbols, list):
+        fetched = with_columns(columns, "TradDt", "TckrSymb")
+        key = freeze([filters, normalize, transport, arrow_backend(backend)])
+        combined_data = result_cache.fetch("FO", key, symbols, fetched, start_date, end_date, lambda: get_FO_bhavcopy(
+            start_date, end_date, symbols, batched, client, cache, transport, max_workers, fetched,
+            instruments, option_types, expiries, nearest_expiries, strike_range, atm_strikes, normalize, arrow_backend(backend)))
+        return finish_result(project(combined_data, columns), False, backend=backend)
 
     try:
         if start_date > end_date:
             raise ValueError("Startdate must be earlier than Enddate.")
         
-        conn = establish_connection()
+        client = resolve_client(client)
+
+        if filters is not None:
+            cache = None
+
+        if max_workers > 1 and not batched and cache is None:
+            symbols = list(dict.fromkeys(symbols))
+            logger.info(f"Fetching data for {len(symbols)} symbols on {max_workers} threads")
+            tasks = [
+                lambda conn, symbol=symbol: load_FO(conn, start_date, end_date, symbol, transport, columns, filters, backend)
+                for symbol in symbols
+            ]
+            results = run_parallel(client, tasks, max_workers)
+            return finish_result(collect_parallel(symbols, results, 1, lambda combined_data: combined_data), normalize, backend=backend)
+
+        conn = client.getconn()
+
+        if cache is not None:
+            keys = [(symbol,) for symbol in dict.fromkeys(symbols)]
+            cached_data = cache.fetch(
+                "FO", keys, start_date, end_date,
+                lambda group, lo, hi: load_FO(conn, lo, hi, [k[0] for k in group], transport),
+                columns=UDIFF_COLUMNS,
+            )
+            return finish_result(project(cached_data, columns), normalize, backend=backend)
+
+        if batched:
+            symbols = list(dict.fromkeys(symbols))
+            logger.info(f"Fetching data for {len(symbols)} symbols in batched mode")
+            combined_data = load_FO(conn, start_date, end_date, symbols, transport, with_columns(columns, "TckrSymb"), filters, backend)
+            return finish_result(project(order_by_symbols(combined_data, "TckrSymb", symbols), columns), normalize, backend=backend)
 
         for symbol in symbols:
-            print(f"Fetching data for symbol: {symbol}")
-            
-            # Fetch data from both tables
-            cm_data = fetch_data_FO(conn, start_date, end_date, symbol, "FO_bhavCopies_CM")
-            udiff_data = fetch_data_FO(conn, start_date, end_date, symbol, "FO_Bhavcopies_UDiFF")
+            try:
+                logger.info(f"Fetching data for symbol: {symbol}")
 
-            # Map columns for consistency
-            cm_data_mapped = map_columns_FO(cm_data, COLUMN_MAPPING_FO, "FO_bhavCopies_CM")
+                # Fetch both tables for this symbol, already mapped and merged by the database
+                combined_data = load_FO(conn, start_date, end_date, symbol, transport, columns, filters, backend)
 
-            # Merge data for this symbol
-            combined_data = pd.merge(udiff_data, cm_data_mapped, how="outer")
-            
-            # Append to the cumulative DataFrame
-            all_data = pd.concat([all_data, combined_data], ignore_index=True)
+                # Collect for a single concatenation at the end
+                all_data.append(combined_data)
+            except Exception as e:
+                logger.error(f"Error processing symbol {symbol}: {e}")
+                errors[symbol] = str(e)
+                conn.rollback()
 
     except Exception as e:
-        print(f"Error: {e}")
+        logger.error(f"Error: {e}")
+        errors = failed_call(symbols, e)
     finally:
         if conn:
-            conn.close()
+            client.putconn(conn)
 
-    return all_data
+    return finish_result(backends.with_errors(all_data.result(), errors), normalize, backend=backend)
 
 
-def get_indices_bhavcopy(start_date:Optional[datetime.date]=datetime(2016,1,1), end_date:Optional[datetime.date]=datetime.now(), symbols :Optional[List[str]]=None):
+def get_indices_bhavcopy(start_date:Optional[datetime.date]=datetime(2016,1,1), end_date:Optional[datetime.date]=datetime.now(), symbols :Optional[List[str]]=None, batched:bool=False, client=None, cache=None, transport:str="cursor", max_workers:int=1, columns:Optional[List[str]]=None, normalize:bool=True, output:str="frame", backend:str="pandas", index=None, result_cache=None):
     """Get the BhavCopy data for multiple symbols over a specified date range, ensuring consistent column mapping across different data sources.
         This function retrieves historical data from 2016-01-01 to yesterday's date
 Parameters:
     startdate (datetime): The starting date for the data retrieval in 'YYYY,MM,DD' format.
     enddate (datetime): The ending date for the data retrieval in 'YYYY,MM,DD' format.
     symbols (list): A list of financial symbols (e.g., NIFTY 50, Nifty500 Momentum 50 tickers) for which data is to be fetched.
+    batched (bool): Fetch all symbols with a single query instead of one query per symbol.
+    client (BhavcopyClient): Client whose connection pool is used. Defaults to the shared default client. With a ``RemoteClient`` the call is answered by its query server; cache, index and result_cache are then left to the server.
+    cache (BhavcopyCache): Local Parquet cache to read from; only dates it does not hold are fetched from the database.
+    transport (str): "cursor" (default) fetches rows as Python objects; "copy" uses COPY ... TO STDOUT for high-volume pulls and returns float64/datetime64 columns.
+    max_workers (int): Run the per-symbol queries on this many threads, each with its own pooled connection. Symbols that fail are listed in ``result.attrs["errors"]``. Ignored with batched or cache.
+    columns (list): Return only these columns (e.g. ['Index Name', 'Index Date', 'Closing Index Value']); only they are read and sent by the database. Defaults to all columns.
+    normalize (bool): Convert the result to compact dtypes (float64 prices, Int64 volume, datetime64 dates, category index names). Defaults to True; pass False for the raw psycopg2 values.
+    output (str): "frame" (default) returns the long DataFrame; "panel" returns a ``Panel`` of date x index float64 arrays, one per field (Open, High, Low and Closing Index Value and Volume, or the numeric ``columns`` requested), with indices in the requested order.
+    backend (str): "pandas" (default) returns a DataFrame; "arrow" a ``pyarrow.Table`` and "polars" a ``polars.DataFrame``, both built column by column from the fetched rows without going through pandas. With "arrow", failed symbols are in the ``errors`` schema metadata. Results read from a cache are converted.
+    index (SymbolIndex): Validate symbols against this index before querying: unknown symbols raise a ValueError naming the closest known ones, and symbols the index shows without rows in the date range are not queried.
+        When this segment of the index was never built or is older than its ``max_age``, it is refreshed first inside this call; the first build runs a GROUP BY over the segment's whole source tables, so call ``index.refresh()`` beforehand to keep that out of the getter.
+    result_cache (ResultCache): Keep results in this in-memory cache; identical calls, and calls for a date range inside a cached one, are answered without querying the database.
     
 
 Examples:
@@ -444,7 +683,8 @@ Examples:
 
 """ 
     conn = None
-    all_data = pd.DataFrame()  
+    all_data = FrameCollector()
+    errors = {}
 
     # Raise an error if startdate or enddate is not datetime
     if not isinstance(start_date, datetime):
@@ -453,32 +693,183 @@ Examples:
     if not isinstance(end_date, datetime):
             raise ValueError(f"Expected datetime, but got {type(end_date).__name__}")
     
-   
+    if columns is not None:
+        columns = resolve_columns(columns, INDICES_COLUMNS)
+    require_backend(backend)
+    fields, columns = panel_columns("Indices", columns, output, backend)
+    remote = remote_client(client)
+    if remote is not None:
+        params = dict(start_date=start_date, end_date=end_date, symbols=symbols, batched=batched, transport=transport,
+                      max_workers=max_workers, columns=columns)
+        return finish_result(remote.fetch("Indices", params, backend), normalize, output, "Indices", fields, symbols, backend)
+    if index is not None and symbols:
+        symbols = index.check("Indices", symbols, start_date, end_date, client=client)
+        if not symbols:
+            return finish_result(pd.DataFrame(columns=columns or INDICES_COLUMNS), normalize, output, "Indices", fields, symbols, backend)
+    if result_cache is not None and symbols and isinstance(symbols, list):
+        fetched = with_columns(columns, "Index Date", "Index Name")
+        key = freeze([normalize, transport, arrow_backend(backend)])
+        indices_data = result_cache.fetch("Indices", key, symbols, fetched, start_date, end_date, lambda: get_indices_bhavcopy(
+            start_date, end_date, symbols, batched, client, cache, transport, max_workers, fetched, normalize, backend=arrow_backend(backend)))
+        return finish_result(project(indices_data, columns), False, output, "Indices", fields, symbols, backend)
 
     try:
         if start_date > end_date:
             raise ValueError("Startdate must be earlier than Enddate.")
         
-        conn = establish_connection()
+        client = resolve_client(client)
+
+        if max_workers > 1 and not batched and cache is None:
+            symbols = list(dict.fromkeys(symbols))
+            logger.info(f"Fetching data for {len(symbols)} symbols on {max_workers} threads")
+            tasks = [
+                lambda conn, symbol=symbol: fetch_data_Indices(conn, start_date, end_date, symbol, "Indices_bhavCopies", transport, columns, backend)
+                for symbol in symbols
+            ]
+            results = run_parallel(client, tasks, max_workers)
+            return finish_result(collect_parallel(symbols, results, 1, lambda indices_data: indices_data), normalize, output, "Indices", fields, symbols, backend)
+
+        conn = client.getconn()
+
+        if cache is not None:
+            keys = [(symbol,) for symbol in dict.fromkeys(symbols)]
+            cached_data = cache.fetch(
+                "Indices", keys, start_date, end_date,
+                lambda group, lo, hi: fetch_data_Indices(conn, lo, hi, [k[0] for k in group], "Indices_bhavCopies", transport),
+                columns=INDICES_COLUMNS,
+            )
+            return finish_result(project(cached_data, columns), normalize, output, "Indices", fields, symbols, backend)
+
+        if batched:
+            symbols = list(dict.fromkeys(symbols))
+            logger.info(f"Fetching data for {len(symbols)} symbols in batched mode")
+            indices_data = fetch_data_Indices(conn, start_date, end_date, symbols, "Indices_bhavCopies", transport, with_columns(columns, "Index Name"), backend)
+            return finish_result(project(order_by_symbols(indices_data, "Index Name", symbols), columns), normalize, output, "Indices", fields, symbols, backend)
 
         for symbol in symbols:
-            print(f"Fetching data for symbol: {symbol}")
-            
-            # Fetch data from both tables
-            indices_data = fetch_data_Indices(conn, start_date, end_date, symbol, "Indices_bhavCopies")
-            
-            # Append to the cumulative DataFrame
-            all_data = pd.concat([all_data, indices_data], ignore_index=True)
+            try:
+                logger.info(f"Fetching data for symbol: {symbol}")
+
+                # Fetch data from both tables
+                indices_data = fetch_data_Indices(conn, start_date, end_date, symbol, "Indices_bhavCopies", transport, columns, backend)
 
+                # Collect for a single concatenation at the end
+                all_data.append(indices_data)
+            except Exception as e:
+                logger.error(f"Error processing symbol {symbol}: {e}")
+                errors[symbol] = str(e)
+                conn.rollback()
+
+    except PanelError:
+        raise
     except Exception as e:
-        print(f"Error: {e}")
+        logger.error(f"Error: {e}")
+        errors = failed_call(symbols, e)
     finally:
         if conn:
-            conn.close()
+            client.putconn(conn)
 
-    return all_data
+    return finish_result(backends.with_errors(all_data.result(), errors), normalize, output, "Indices", fields, symbols, backend)
 
 
+def stream_data(conn, query, params, columns, chunk_size=50000, backend="pandas", normalize=True):
+    """Yield DataFrames of at most ``chunk_size`` rows of ``query`` from a named server-side cursor.
+
+    Only one chunk of rows is held in memory at a time instead of the full ``fetchall()`` result.
+    Chunks are built as ``backend`` results (see ``backends``) and normalized like getter results.
+    """
+    cur = conn.cursor(name=f"bhavcopy_stream_{uuid.uuid4().hex}")
+    cur.itersize = chunk_size
+    if backend != "pandas":
+        backends.float_numerics(cur)
+    try:
+        cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield finish_result(backends.from_rows(rows, columns, arrow_backend(backend)), normalize, backend=backend)
+    finally:
+        cur.close()
+
+def _validate_stream_args(start_date, end_date, symbols, chunk_size):
+    if not isinstance(start_date, datetime):
+        raise ValueError(f"Expected datetime, but got {type(start_date).__name__}")
+    if not isinstance(end_date, datetime):
+        raise ValueError(f"Expected datetime, but got {type(end_date).__name__}")
+    if start_date > end_date:
+        raise ValueError("Startdate must be earlier than Enddate.")
+    if not symbols or not isinstance(symbols, list):
+        raise ValueError("Symbols must be a non-empty list.")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer.")
+
+def iter_CM_bhavcopy(start_date:Optional[datetime.date]=datetime(2016,1,1), end_date:Optional[datetime.date]=datetime.now(), symbols :Optional[List[str]]=None, series:Optional[List[str]]=None, chunk_size:int=50000, client=None, backend:str="pandas", normalize:bool=True):
+    """Stream CM BhavCopy data as DataFrame chunks of at most ``chunk_size`` rows.
+
+    Rows of both CM tables come from the same UNION ALL query as ``get_CM_bhavcopy``, in the UDiFF
+    format. Unlike ``get_CM_bhavcopy`` rows are yielded in the order the database returns them.
+
+Parameters:
+    start_date (datetime): The starting date for the data retrieval.
+    end_date (datetime): The ending date for the data retrieval.
+    symbols (list): A list of financial symbols (e.g., stock tickers) for which data is to be fetched.
+    series (list): The series to retrieve (e.g., 'EQ', 'GB','GS','SG').
+    chunk_size (int): Maximum number of rows per yielded DataFrame.
+    client (BhavcopyClient): Client whose connection pool is used. Defaults to the shared default client.
+    backend (str): "pandas" (default), "arrow" or "polars"; the type of each yielded chunk.
+    normalize (bool): Convert each chunk to the compact dtypes of the getters (categories are built per chunk). Defaults to True; pass False for the raw psycopg2 values.
+
+Examples:
+    for chunk in iter_CM_bhavcopy(datetime(2016,1,1), datetime(2024,1,31), ['TCS'], ['EQ']):
+        chunk.to_parquet(...)
+"""
+    _validate_stream_args(start_date, end_date, symbols, chunk_size)
+    require_backend(backend)
+    if not series or not isinstance(series, list) or not all(isinstance(s, str) for s in series):
+        raise ValueError("Series must be a non-empty list of strings.")
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+
+    client = pool_client(client, "iter_CM_bhavcopy")
+    conn = client.getconn()
+    try:
+        query, params, columns = build_union_query("CM", start_date, end_date, symbols, series)
+        yield from stream_data(conn, query, params, columns, chunk_size, backend, normalize)
+    finally:
+        client.putconn(conn)
+
+def iter_FO_bhavcopy(start_date:Optional[datetime.date]=datetime(2016,1,1), end_date:Optional[datetime.date]=datetime.now(), symbols :Optional[List[str]]=None, chunk_size:int=50000, client=None, backend:str="pandas", normalize:bool=True):
+    """Stream FO BhavCopy data as DataFrame chunks of at most ``chunk_size`` rows.
+
+    Rows of both FO tables come from the same UNION ALL query as ``get_FO_bhavcopy``, in the UDiFF
+    format. Unlike ``get_FO_bhavcopy`` rows are yielded in the order the database returns them.
+
+Parameters:
+    start_date (datetime): The starting date for the data retrieval.
+    end_date (datetime): The ending date for the data retrieval.
+    symbols (list): A list of financial symbols (e.g., BANKNIFTY tickers) for which data is to be fetched.
+    chunk_size (int): Maximum number of rows per yielded DataFrame.
+    client (BhavcopyClient): Client whose connection pool is used. Defaults to the shared default client.
+    backend (str): "pandas" (default), "arrow" or "polars"; the type of each yielded chunk.
+    normalize (bool): Convert each chunk to the compact dtypes of the getters (categories are built per chunk). Defaults to True; pass False for the raw psycopg2 values.
+
+Examples:
+    total_volume = 0
+    for chunk in iter_FO_bhavcopy(datetime(2016,1,1), datetime(2024,1,31), ['BANKNIFTY']):
+        total_volume += chunk["TtlTradgVol"].sum()
+"""
+    _validate_stream_args(start_date, end_date, symbols, chunk_size)
+    require_backend(backend)
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+
+    client = pool_client(client, "iter_FO_bhavcopy")
+    conn = client.getconn()
+    try:
+        query, params, columns = build_union_query("FO", start_date, end_date, symbols)
+        yield from stream_data(conn, query, params, columns, chunk_size, backend, normalize)
+    finally:
+        client.putconn(conn)
+
 
 def main():
     """Main function to run the script."""
@@ -1,3 +1,32 @@
 from .Bhavcopy_Reteriver import get_CM_bhavcopy
 from .Bhavcopy_Reteriver import get_FO_bhavcopy
-from .Bhavcopy_Reteriver import get_indices_bhavcopy
\ No newline at end of file
+from .Bhavcopy_Reteriver import get_indices_bhavcopy
+from .Bhavcopy_Reteriver import iter_CM_bhavcopy
+from .Bhavcopy_Reteriver import iter_FO_bhavcopy
+from .client import BhavcopyClient
+from .cache import BhavcopyCache
+from .aio import aget_CM_bhavcopy
+from .aio import aget_FO_bhavcopy
+from .aio import aget_indices_bhavcopy
+from .panel import Panel
+from .panel import PanelError
+from .panel import strike_panel
+from .derived import DerivedSeries
+from .derived import derive
+from .options import option_chain
+from .options import implied_volatility
+from .options import greeks
+from .options import put_call_ratio
+from .options import max_pain
+from .symbol_index import SymbolIndex
+from .result_cache import ResultCache
+from .profiling import profile
+from .profiling import add_hook
+from .profiling import remove_hook
+from .ingest import ingest
+from .snapshot import get_market_snapshot
+from .continuous import ContinuousFutures
+from .continuous import continuous_futures
+from .server import QueryServer
+from .server import RemoteClient
+from .sync import DeltaSync
@@ -0,0 +1,189 @@
+"""asyncio counterparts of the bhavcopy getters, built on asyncpg.
+
+The queries come from the same ``queries.build_query``/``build_union_query`` definitions as the
+blocking getters and take the same ``columns``, F&O contract filters, ``normalize`` and ``backend``
+options, so both paths return identical frames. Every per-symbol query runs concurrently on its own
+pooled connection. Batching, caching, ``output="panel"`` and the other options of the blocking
+getters that choose how rows are fetched are not available.
+
+Examples:
+    pool = await create_pool(max_size=8)
+    data = await aget_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['TCS', 'INFY'], ['EQ'], pool=pool)
+    await pool.close()
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Optional
+
+from . import backends
+from .Bhavcopy_Reteriver import arrow_backend, collect_parallel, finish_result, get_config_data, project, sort_rows, with_columns
+from .backends import require_backend
+from .profiling import stage
+from .queries import build_query, build_union_query, fo_filters, resolve_columns, to_numbered_params, INDICES_COLUMNS, ROW_KEYS, UDIFF_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+
+def _require_asyncpg():
+    try:
+        import asyncpg
+    except ImportError as e:
+        raise ImportError("The async API requires asyncpg. Install it with: pip install asyncpg") from e
+    return asyncpg
+
+
+async def create_pool(min_size=1, max_size=10, **kwargs):
+    """Create an asyncpg connection pool from ``config.conf``."""
+    asyncpg = _require_asyncpg()
+    config_data = get_config_data()
+    return await asyncpg.create_pool(
+        host=config_data['hostname'],
+        database=config_data['database'],
+        user=config_data['username'],
+        password=config_data['pwd'],
+        port=config_data['port'],
+        min_size=min_size,
+        max_size=max_size,
+        **kwargs,
+    )
+
+
+@asynccontextmanager
+async def _pool_scope(pool):
+    """Use ``pool`` if given, otherwise a pool that lives for the duration of one call."""
+    if pool is not None:
+        yield pool
+        return
+    pool = await create_pool()
+    try:
+        yield pool
+    finally:
+        await pool.close()
+
+
+async def afetch_data(pool, table_name, segment, startdate, enddate, symbol, series=None, columns=None, backend="pandas"):
+    """Async version of ``fetch_data_*``: fetch one source table into a DataFrame."""
+    query, params, columns = build_query(table_name, segment, startdate, enddate, symbol, series, columns)
+    return await arun_query(pool, query, params, columns, backend)
+
+
+async def aload(pool, segment, startdate, enddate, symbol, series=None, columns=None, filters=None, backend="pandas"):
+    """Async version of ``load_CM``/``load_FO``: fetch both tables of ``segment`` in the UDiFF format.
+
+    ``columns`` projects the result; the ``ROW_KEYS`` are fetched as well so rows sort the same way.
+    """
+    query, params, fetched = build_union_query(segment, startdate, enddate, symbol, series, with_columns(columns, *ROW_KEYS[segment]), filters)
+    return project(sort_rows(await arun_query(pool, query, params, fetched, backend), segment), columns)
+
+
+async def arun_query(pool, query, params, columns, backend="pandas"):
+    """Run ``query`` on a pooled connection and return its rows as a DataFrame (or Arrow table) with ``columns``."""
+    async with pool.acquire() as conn:
+        with stage("execute") as timing:
+            rows = await conn.fetch(to_numbered_params(query), *params)
+            timing.rows = len(rows)
+    with stage("build") as timing:
+        frame = backends.from_rows([tuple(row) for row in rows], columns, arrow_backend(backend))
+        timing.measure(frame)
+    return frame
+
+
+def _validate(start_date, end_date, symbols):
+    if not isinstance(start_date, datetime):
+        raise ValueError(f"Expected datetime, but got {type(start_date).__name__}")
+    if not isinstance(end_date, datetime):
+        raise ValueError(f"Expected datetime, but got {type(end_date).__name__}")
+    if start_date > end_date:
+        raise ValueError("Startdate must be earlier than Enddate.")
+    if not symbols or not isinstance(symbols, list):
+        raise ValueError("Symbols must be a non-empty list.")
+
+
+async def _gather(pool, fetch, symbols):
+    """Run ``fetch(pool, symbol)`` for every symbol concurrently, in symbol order."""
+    async with _pool_scope(pool) as pool:
+        return await asyncio.gather(*(fetch(pool, symbol) for symbol in symbols), return_exceptions=True)
+
+
+async def aget_CM_bhavcopy(start_date:Optional[datetime.date]=datetime(2016,1,1), end_date:Optional[datetime.date]=datetime.now(), symbols :Optional[List[str]]=None, series:Optional[List[str]]=None, pool=None, columns:Optional[List[str]]=None, normalize:bool=True, backend:str="pandas"):
+    """Async version of ``get_CM_bhavcopy``.
+
+Parameters:
+    start_date (datetime): The starting date for the data retrieval.
+    end_date (datetime): The ending date for the data retrieval.
+    symbols (list): A list of financial symbols (e.g., stock tickers) for which data is to be fetched.
+    series (list): The series to retrieve (e.g., 'EQ', 'GB','GS','SG').
+    pool (asyncpg.Pool): Pool to run the queries on. A temporary pool is created when omitted.
+    columns (list): Return only these UDiFF columns, as in ``get_CM_bhavcopy``. Defaults to all columns.
+    normalize (bool): Convert the result to compact dtypes, as in the blocking getters. Defaults to True.
+    backend (str): "pandas" (default), "arrow" or "polars", as in ``get_CM_bhavcopy``.
+
+Returns:
+    DataFrame: Same columns and order as ``get_CM_bhavcopy``. Failed symbols are listed in ``attrs["errors"]``.
+"""
+    _validate(start_date, end_date, symbols)
+    if not series or not isinstance(series, list) or not all(isinstance(s, str) for s in series):
+        raise ValueError("Series must be a non-empty list of strings.")
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+    if columns is not None:
+        columns = resolve_columns(columns, UDIFF_COLUMNS)
+    require_backend(backend)
+
+    results = await _gather(pool, lambda pool, symbol: aload(pool, "CM", start_date, end_date, symbol, series, columns, backend=backend), symbols)
+    return finish_result(collect_parallel(symbols, results, 1, lambda combined_data: combined_data), normalize, backend=backend)
+
+
+async def aget_FO_bhavcopy(start_date:Optional[datetime.date]=datetime(2016,1,1), end_date:Optional[datetime.date]=datetime.now(), symbols :Optional[List[str]]=None, pool=None, columns:Optional[List[str]]=None,
+                           instruments:Optional[List[str]]=None, option_types:Optional[List[str]]=None, expiries:Optional[List[datetime.date]]=None, nearest_expiries:Optional[int]=None, strike_range:Optional[tuple]=None, atm_strikes:Optional[int]=None, normalize:bool=True, backend:str="pandas"):
+    """Async version of ``get_FO_bhavcopy``.
+
+Parameters:
+    start_date (datetime): The starting date for the data retrieval.
+    end_date (datetime): The ending date for the data retrieval.
+    symbols (list): A list of financial symbols (e.g., BANKNIFTY tickers) for which data is to be fetched.
+    pool (asyncpg.Pool): Pool to run the queries on. A temporary pool is created when omitted.
+    columns (list): Return only these UDiFF columns, as in ``get_FO_bhavcopy``. Defaults to all columns.
+    instruments, option_types, expiries, nearest_expiries, strike_range, atm_strikes: Contract filters
+        run in the database, as in ``get_FO_bhavcopy``.
+    normalize (bool): Convert the result to compact dtypes, as in the blocking getters. Defaults to True.
+    backend (str): "pandas" (default), "arrow" or "polars", as in ``get_FO_bhavcopy``.
+
+Returns:
+    DataFrame: Same columns and order as ``get_FO_bhavcopy``. Failed symbols are listed in ``attrs["errors"]``.
+"""
+    _validate(start_date, end_date, symbols)
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+    if columns is not None:
+        columns = resolve_columns(columns, UDIFF_COLUMNS)
+    filters = fo_filters(instruments, option_types, expiries, nearest_expiries, strike_range, atm_strikes)
+    require_backend(backend)
+
+    results = await _gather(pool, lambda pool, symbol: aload(pool, "FO", start_date, end_date, symbol, columns=columns, filters=filters, backend=backend), symbols)
+    return finish_result(collect_parallel(symbols, results, 1, lambda combined_data: combined_data), normalize, backend=backend)
+
+
+async def aget_indices_bhavcopy(start_date:Optional[datetime.date]=datetime(2016,1,1), end_date:Optional[datetime.date]=datetime.now(), symbols :Optional[List[str]]=None, pool=None, columns:Optional[List[str]]=None, normalize:bool=True, backend:str="pandas"):
+    """Async version of ``get_indices_bhavcopy``.
+
+Parameters:
+    start_date (datetime): The starting date for the data retrieval.
+    end_date (datetime): The ending date for the data retrieval.
+    symbols (list): A list of index names (e.g., "Nifty 50") for which data is to be fetched.
+    pool (asyncpg.Pool): Pool to run the queries on. A temporary pool is created when omitted.
+    columns (list): Return only these columns, as in ``get_indices_bhavcopy``. Defaults to all columns.
+    normalize (bool): Convert the result to compact dtypes, as in the blocking getters. Defaults to True.
+    backend (str): "pandas" (default), "arrow" or "polars", as in ``get_indices_bhavcopy``.
+
+Returns:
+    DataFrame: Same columns and order as ``get_indices_bhavcopy``. Failed symbols are listed in ``attrs["errors"]``.
+"""
+    _validate(start_date, end_date, symbols)
+    symbols = list(dict.fromkeys(symbols))
+    if columns is not None:
+        columns = resolve_columns(columns, INDICES_COLUMNS)
+    require_backend(backend)
+
+    results = await _gather(pool, lambda pool, symbol: afetch_data(pool, "Indices_bhavCopies", "Indices", start_date, end_date, symbol, columns=columns, backend=backend), symbols)
+    return finish_result(collect_parallel(symbols, results, 1, lambda indices_data: indices_data), normalize, backend=backend)
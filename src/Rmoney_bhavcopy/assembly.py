@@ -0,0 +1,54 @@
+"""Result assembly for the bhavcopy getters.
+
+Growing a result with ``pd.concat([all_data, new_data])`` inside a loop copies everything
+accumulated so far on every iteration. The getters instead append each per-symbol frame
+to a FrameCollector and concatenate once at the end. Arrow tables (``backend="arrow"``) are
+collected the same way.
+"""
+import pandas as pd
+
+from .backends import concat, head, is_empty
+from .profiling import stage
+
+
+class FrameCollector:
+    """Collect DataFrames and concatenate them in a single pass."""
+
+    def __init__(self):
+        self._frames = []
+        self._schema = None
+
+    def append(self, frame):
+        """Add a frame to the result. Empty frames only contribute their columns."""
+        if frame is None:
+            return
+        if is_empty(frame):
+            if self._schema is None:
+                self._schema = head(frame, 0)
+            return
+        self._frames.append(frame)
+
+    def extend(self, frames):
+        """Add several frames to the result."""
+        for frame in frames:
+            self.append(frame)
+
+    def __len__(self):
+        return len(self._frames)
+
+    def result(self):
+        """Return all collected frames as one DataFrame with a fresh RangeIndex."""
+        with stage("assemble") as timing:
+            result = concat_frames(self._frames, self._schema)
+            timing.measure(result)
+        return result
+
+
+def concat_frames(frames, schema=None):
+    """Concatenate ``frames`` once, falling back to ``schema`` (or an empty frame) when there is nothing to join."""
+    frames = [frame for frame in frames if frame is not None and not is_empty(frame)]
+    if not frames:
+        if schema is None:
+            return pd.DataFrame()
+        return head(schema, 0) if not isinstance(schema, pd.DataFrame) else schema.copy()
+    return concat(frames)
@@ -0,0 +1,273 @@
+"""Result backends for the bhavcopy getters: pandas, Arrow and Polars.
+
+With ``backend="pandas"`` (the default) results are DataFrames as before. With ``"arrow"`` rows are
+built straight into a ``pyarrow.Table``: the copy transport parses the CSV stream with Arrow's
+own reader, and the cursor transport fetches NUMERIC values as floats and turns each fetched
+column into one typed Arrow array. The
+legacy -> UDiFF mapping already happens in SQL (``queries.build_union_query``), so the table
+comes out in the UDiFF layout. Sorting, projection, symbol ordering and concatenation then run
+on the table, and ``"polars"`` wraps the finished table with ``polars.from_arrow`` without copying
+the column buffers.
+
+Arrow column types follow ``queries.COLUMN_TYPES``:
+
+    numeric  -> float64
+    int      -> int64
+    date     -> timestamp[ns]
+    text     -> string (dictionary-encoded for ``schema.CATEGORY_COLUMNS`` when normalized)
+
+The helpers below accept either a DataFrame or a Table so the getters share one code path.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import psycopg2.extensions
+
+from .queries import COLUMN_TYPES
+from .schema import CATEGORY_COLUMNS
+
+BACKENDS = ("pandas", "arrow", "polars")
+
+_DEC2FLOAT = psycopg2.extensions.new_type(psycopg2.extensions.DECIMAL.values, "DEC2FLOAT", psycopg2.extensions.FLOAT)
+
+
+def require_backend(backend):
+    """Check ``backend`` is known and its library is installed."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Invalid backend: {backend}. Expected one of {BACKENDS}.")
+    if backend == "pandas":
+        return
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError(f"backend={backend!r} requires pyarrow. Install it with: pip install pyarrow") from e
+    if backend == "polars":
+        try:
+            import polars  # noqa: F401
+        except ImportError as e:
+            raise ImportError("backend='polars' requires polars. Install it with: pip install polars") from e
+
+
+def is_arrow(frame):
+    return type(frame).__module__.startswith("pyarrow")
+
+
+def arrow_type(column):
+    """Return the Arrow type of ``column``."""
+    import pyarrow as pa
+
+    kind = COLUMN_TYPES.get(column)
+    if kind == "numeric":
+        return pa.float64()
+    if kind == "int":
+        return pa.int64()
+    if kind == "date":
+        return pa.timestamp("ns")
+    return pa.string()
+
+
+def _column_array(values, column):
+    """Build the typed Arrow array of ``column`` from fetched Python values."""
+    import pyarrow as pa
+
+    target = arrow_type(column)
+    if pa.types.is_string(target):
+        return pa.array([value if value is None or isinstance(value, str) else str(value) for value in values], type=target)
+    try:
+        return pa.array(values, type=target)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        if pa.types.is_floating(target):
+            # Decimal values (asyncpg) are converted one by one: a decimal128 cast does not round like float()
+            return pa.array([None if value is None else float(value) for value in values], type=target)
+        # Dates are inferred as date32 and cast to the target type
+        return pa.array(values).cast(target)
+
+
+def float_numerics(cursor):
+    """Make ``cursor`` return NUMERIC values as floats instead of ``Decimal`` objects.
+
+    Only used when building Arrow results: the values go straight into float64 arrays, and psycopg2
+    skips creating a ``Decimal`` for every price. Other cursors of the connection are unaffected.
+    """
+    if isinstance(cursor, psycopg2.extensions.cursor):
+        psycopg2.extensions.register_type(_DEC2FLOAT, cursor)
+
+
+def empty(columns, backend="pandas"):
+    """Return an empty result with ``columns``."""
+    if backend == "pandas":
+        return pd.DataFrame(columns=columns)
+    import pyarrow as pa
+
+    return pa.schema([(column, arrow_type(column)) for column in columns]).empty_table()
+
+
+def from_rows(rows, columns, backend="pandas"):
+    """Build a result from fetched row tuples."""
+    if backend == "pandas":
+        return pd.DataFrame(rows, columns=columns)
+    import pyarrow as pa
+
+    if not rows:
+        return empty(columns, backend)
+    values = list(zip(*rows))
+    return pa.table({column: _column_array(values[i], column) for i, column in enumerate(columns)})
+
+
+def from_csv(buffer, columns, backend="pandas"):
+    """Parse a ``COPY ... TO STDOUT WITH (FORMAT csv)`` stream, typed by ``COLUMN_TYPES``."""
+    types = [COLUMN_TYPES[column] for column in columns]
+    if backend == "pandas":
+        dtype = {column: str if kind in ("text", "date") else "float64" for column, kind in zip(columns, types)}
+        frame = pd.read_csv(buffer, header=None, names=columns, dtype=dtype, keep_default_na=False, na_values=[""])
+        for column, kind in zip(columns, types):
+            if kind == "date":
+                frame[column] = pd.to_datetime(frame[column], format="ISO8601")
+        return frame
+
+    import pyarrow as pa
+    from pyarrow import csv
+
+    # Integers are read as float64 first: legacy tables store volumes as numeric with a scale
+    column_types = {
+        column: pa.float64() if kind == "int" else arrow_type(column) for column, kind in zip(columns, types)
+    }
+    table = csv.read_csv(
+        buffer,
+        read_options=csv.ReadOptions(column_names=columns),
+        convert_options=csv.ConvertOptions(
+            column_types=column_types, null_values=[""], strings_can_be_null=True, quoted_strings_can_be_null=False,
+        ),
+    )
+    for i, (column, kind) in enumerate(zip(columns, types)):
+        if kind == "int":
+            table = table.set_column(i, column, table.column(i).cast(pa.int64()))
+    return table
+
+
+def is_empty(frame):
+    if is_arrow(frame):
+        return frame.num_rows == 0
+    return frame.empty
+
+
+def head(frame, rows):
+    if is_arrow(frame):
+        return frame.slice(0, rows)
+    return frame.iloc[0:rows]
+
+
+def concat(frames):
+    """Concatenate non-empty frames of one kind with a fresh RangeIndex (pandas)."""
+    if len(frames) == 1:
+        frame = frames[0]
+        return frame if is_arrow(frame) else frame.reset_index(drop=True)
+    if is_arrow(frames[0]):
+        import pyarrow as pa
+
+        return pa.concat_tables(frames)
+    return pd.concat(frames, ignore_index=True)
+
+
+def sort(frame, keys):
+    """Stable sort by ``keys`` with missing values last."""
+    if is_arrow(frame):
+        return frame.sort_by([(key, "ascending") for key in keys])
+    return frame.sort_values(keys, kind="stable", ignore_index=True)
+
+
+def select(frame, columns):
+    """Keep only ``columns``; None keeps every column."""
+    if columns is None:
+        return frame
+    if is_arrow(frame):
+        return frame.select(columns)
+    return frame[columns]
+
+
+def order_by_symbols(frame, column, symbols):
+    """Order rows by the position of their symbol in ``symbols``, keeping the order within each symbol."""
+    if is_arrow(frame):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        codes = pc.index_in(frame.column(column), value_set=pa.array(symbols, type=frame.schema.field(column).type))
+        codes = codes.to_numpy(zero_copy_only=False)
+        return frame.take(np.argsort(np.where(np.isnan(codes), len(symbols), codes), kind="stable"))
+    order = {symbol: i for i, symbol in enumerate(symbols)}
+    return frame.sort_values(column, key=lambda col: col.map(order), kind="stable", ignore_index=True)
+
+
+def column_names(frame):
+    return list(frame.column_names if is_arrow(frame) else frame.columns)
+
+
+def memory_size(frame, deep=True):
+    """Bytes held by ``frame``; ``deep`` includes the Python objects of DataFrame object columns."""
+    if is_arrow(frame):
+        return frame.nbytes
+    return int(frame.memory_usage(index=True, deep=deep).sum())
+
+
+def between(frame, column, start, end):
+    """Rows whose ``column`` date lies in [start, end]."""
+    if is_arrow(frame):
+        import pyarrow.compute as pc
+
+        values = frame.column(column)
+        mask = pc.and_(pc.greater_equal(values, start.to_datetime64()), pc.less_equal(values, end.to_datetime64()))
+        return frame.filter(mask)
+    dates = pd.to_datetime(frame[column])
+    return frame[((dates >= start) & (dates <= end)).to_numpy()].reset_index(drop=True)
+
+
+def errors_of(frame):
+    """Failed symbols recorded by ``with_errors``, or an empty dict."""
+    if is_arrow(frame):
+        metadata = frame.schema.metadata or {}
+        return json.loads(metadata[b"errors"]) if b"errors" in metadata else {}
+    return frame.attrs.get("errors") or {}
+
+
+def with_errors(frame, errors):
+    """Record failed symbols: ``attrs["errors"]`` on DataFrames, ``errors`` schema metadata (JSON) on Tables."""
+    if is_arrow(frame):
+        metadata = dict(frame.schema.metadata or {})
+        metadata[b"errors"] = json.dumps(errors).encode()
+        return frame.replace_schema_metadata(metadata)
+    frame.attrs["errors"] = errors
+    return frame
+
+
+def normalize_arrow(table):
+    """Dictionary-encode the low-cardinality text columns of ``table``; other columns are already typed."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    for i, column in enumerate(table.column_names):
+        if column in CATEGORY_COLUMNS and pa.types.is_string(table.schema.field(i).type):
+            table = table.set_column(i, column, pc.dictionary_encode(table.column(i)))
+    return table
+
+
+def to_backend(frame, backend):
+    """Return ``frame`` as the result type of ``backend``.
+
+    Arrow tables pass to Polars without copying the column buffers. DataFrames (read from a
+    ``BhavcopyCache``) are converted.
+    """
+    if backend == "pandas":
+        return frame.to_pandas() if is_arrow(frame) else frame
+    import pyarrow as pa
+
+    if not is_arrow(frame):
+        errors = frame.attrs.get("errors")
+        frame = pa.Table.from_pandas(frame, preserve_index=False)
+        if errors is not None:
+            frame = with_errors(frame, errors)
+    if backend == "polars":
+        import polars as pl
+
+        return pl.from_arrow(frame, rechunk=False)
+    return frame
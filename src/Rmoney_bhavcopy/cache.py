@@ -0,0 +1,205 @@
+"""Local on-disk Parquet cache of historical bhavcopy data.
+
+Bhavcopy history does not change once published, so results are stored on disk after
+column mapping and only dates not held yet (or within ``refresh_days`` of today) are
+fetched from the database again.
+
+Layout::
+
+    <root>/<segment>/<symbol>[/<series>]/<YYYY-MM>.parquet   one file per month
+    <root>/<segment>/<symbol>[/<series>]/_coverage.json      date ranges already held
+
+Examples:
+    cache = BhavcopyCache("~/.rmoney_bhavcopy")
+    data = get_CM_bhavcopy(start_date, end_date, ['TCS'], ['EQ'], cache=cache)
+"""
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from urllib.parse import quote
+
+import pandas as pd
+
+from .assembly import FrameCollector
+
+logger = logging.getLogger(__name__)
+
+# Date column and per-key columns of the normalized frame for each segment
+SEGMENTS = {
+    "CM": {"date": "TradDt", "keys": ["TckrSymb", "SctySrs"]},
+    "FO": {"date": "TradDt", "keys": ["TckrSymb"]},
+    "Indices": {"date": "Index Date", "keys": ["Index Name"]},
+}
+
+
+def to_date(value):
+    """Convert a date, datetime or date string to a ``datetime.date``."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def subtract_ranges(start, end, covered):
+    """Return the sub-ranges of [start, end] not inside any of the sorted ``covered`` ranges."""
+    gaps = []
+    cursor = start
+    for lo, hi in covered:
+        if hi < cursor:
+            continue
+        if lo > end:
+            break
+        if lo > cursor:
+            gaps.append((cursor, lo - timedelta(days=1)))
+        cursor = max(cursor, hi + timedelta(days=1))
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def merge_ranges(ranges):
+    """Merge overlapping or adjacent date ranges."""
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+class BhavcopyCache:
+    """Date-partitioned Parquet cache, split per segment and per symbol.
+
+    Parameters:
+        root (str): Directory holding the cache.
+        refresh_days (int): Dates within this many days of today are always re-fetched,
+            so late or corrected files are picked up.
+    """
+
+    def __init__(self, root, refresh_days=3):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("BhavcopyCache requires pyarrow. Install it with: pip install pyarrow") from e
+        self.root = os.path.abspath(os.path.expanduser(root))
+        self.refresh_days = refresh_days
+        self._lock = threading.RLock()
+
+    def _key_dir(self, segment, key):
+        parts = [quote(str(part), safe="") for part in key]
+        return os.path.join(self.root, segment, *parts)
+
+    def _coverage_path(self, segment, key):
+        return os.path.join(self._key_dir(segment, key), "_coverage.json")
+
+    def coverage(self, segment, key):
+        """Return the sorted date ranges held for ``key``."""
+        path = self._coverage_path(segment, key)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            ranges = json.load(f)
+        return [(date.fromisoformat(lo), date.fromisoformat(hi)) for lo, hi in ranges]
+
+    def _write_coverage(self, segment, key, ranges):
+        path = self._coverage_path(segment, key)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump([[lo.isoformat(), hi.isoformat()] for lo, hi in ranges], f)
+        os.replace(tmp, path)
+
+    def missing_ranges(self, segment, key, start, end):
+        """Return the date ranges in [start, end] that must be fetched from the database."""
+        return subtract_ranges(to_date(start), to_date(end), self.coverage(segment, key))
+
+    def read(self, segment, key, start, end):
+        """Read the cached rows of ``key`` between ``start`` and ``end``, ordered by date."""
+        start, end = to_date(start), to_date(end)
+        date_col = SEGMENTS[segment]["date"]
+        key_dir = self._key_dir(segment, key)
+        frames = FrameCollector()
+        for month in pd.period_range(start, end, freq="M"):
+            path = os.path.join(key_dir, f"{month}.parquet")
+            if os.path.exists(path):
+                frames.append(pd.read_parquet(path))
+        data = frames.result()
+        if data.empty:
+            return data
+        dates = pd.to_datetime(data[date_col])
+        data = data[(dates >= pd.Timestamp(start)) & (dates <= pd.Timestamp(end))]
+        return data.sort_values(date_col, kind="stable", key=pd.to_datetime, ignore_index=True)
+
+    def store(self, segment, key, frame, start, end):
+        """Replace the cached rows of ``key`` in [start, end] with ``frame`` and record the coverage."""
+        start, end = to_date(start), to_date(end)
+        date_col = SEGMENTS[segment]["date"]
+        key_dir = self._key_dir(segment, key)
+        with self._lock:
+            os.makedirs(key_dir, exist_ok=True)
+            new_months = pd.to_datetime(frame[date_col]).dt.to_period("M") if not frame.empty else None
+            for month in pd.period_range(start, end, freq="M"):
+                path = os.path.join(key_dir, f"{month}.parquet")
+                parts = FrameCollector()
+                if os.path.exists(path):
+                    existing = pd.read_parquet(path)
+                    dates = pd.to_datetime(existing[date_col])
+                    parts.append(existing[(dates < pd.Timestamp(start)) | (dates > pd.Timestamp(end))])
+                if new_months is not None:
+                    parts.append(frame[new_months == month])
+                data = parts.result()
+                if data.empty:
+                    if os.path.exists(path):
+                        os.remove(path)
+                    continue
+                data = data.sort_values(date_col, kind="stable", key=pd.to_datetime, ignore_index=True)
+                tmp = path + ".tmp"
+                data.to_parquet(tmp, index=False)
+                os.replace(tmp, path)
+
+            # Recent dates stay uncovered so they are fetched again on the next call
+            held_until = min(end, date.today() - timedelta(days=self.refresh_days))
+            if held_until >= start:
+                ranges = merge_ranges(self.coverage(segment, key) + [(start, held_until)])
+                self._write_coverage(segment, key, ranges)
+
+    def fetch(self, segment, keys, start, end, loader, columns=None):
+        """Return rows for ``keys`` in [start, end], loading only what the cache does not hold.
+
+        Parameters:
+            segment (str): 'CM', 'FO' or 'Indices'.
+            keys (list): Cache keys as tuples of the segment's key column values, e.g. ('TCS', 'EQ').
+            loader (callable): ``loader(keys, start, end)`` returning a normalized frame for all
+                of ``keys``. Keys missing the same ranges are loaded together.
+            columns (list): Columns of the result when nothing is found.
+        """
+        start, end = to_date(start), to_date(end)
+        key_cols = SEGMENTS[segment]["keys"]
+
+        groups = {}
+        for key in keys:
+            gaps = tuple(self.missing_ranges(segment, key, start, end))
+            if gaps:
+                groups.setdefault(gaps, []).append(key)
+
+        for gaps, group in groups.items():
+            for lo, hi in gaps:
+                logger.info(f"Cache miss for {len(group)} {segment} keys from {lo} to {hi}")
+                loaded = loader(group, lo, hi)
+                by_key = {}
+                if not loaded.empty:
+                    by_key = dict(iter(loaded.groupby(key_cols, sort=False)))
+                for key in group:
+                    part = by_key.get(key, loaded.iloc[0:0])
+                    self.store(segment, key, part, lo, hi)
+
+        result = FrameCollector()
+        result.append(pd.DataFrame(columns=columns) if columns is not None else None)
+        for key in keys:
+            result.append(self.read(segment, key, start, end))
+        return result.result()
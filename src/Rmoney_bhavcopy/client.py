@@ -0,0 +1,190 @@
+"""Reusable client owning a thread-safe pool of database connections.
+
+The module-level getters in ``Bhavcopy_Reteriver`` borrow connections from a shared
+default client, so repeated calls no longer pay for a new TCP connection and
+authentication every time.
+
+Examples:
+    with BhavcopyClient(maxconn=4) as client:
+        data = client.get_CM_bhavcopy(start_date, end_date, ['TCS'], ['EQ'])
+"""
+import logging
+import threading
+from contextlib import contextmanager
+
+from . import Bhavcopy_Reteriver
+from .profiling import stage
+
+logger = logging.getLogger(__name__)
+
+
+class PoolError(Exception):
+    """Raised when a connection cannot be taken from the pool."""
+
+
+class ConnectionPool:
+    """Thread-safe connection pool built on a connection factory.
+
+    Works like ``psycopg2.pool.ThreadedConnectionPool``, but connections come from
+    any zero-argument callable (so a stub factory can be used in tests), and
+    ``getconn`` waits for a free connection instead of failing when ``maxconn``
+    connections are in use.
+    """
+
+    def __init__(self, factory, minconn=0, maxconn=8):
+        if maxconn < 1 or minconn < 0 or minconn > maxconn:
+            raise ValueError("Expected 0 <= minconn <= maxconn and maxconn >= 1.")
+        self._factory = factory
+        self.maxconn = maxconn
+        self._idle = []
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        for _ in range(minconn):
+            self._idle.append(self._factory())
+            self._size += 1
+
+    def getconn(self, timeout=None):
+        """Take a connection from the pool, opening a new one while below ``maxconn``."""
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError("Connection pool is closed.")
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.maxconn:
+                    self._size += 1
+                    break
+                if not self._cond.wait(timeout):
+                    raise PoolError(f"No connection available within {timeout} seconds.")
+        try:
+            return self._factory()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def putconn(self, conn, close=False):
+        """Return a connection to the pool, discarding it if it is closed or broken."""
+        if not close and not conn.closed:
+            try:
+                # End the implicit transaction opened by the last SELECT
+                conn.rollback()
+            except Exception as e:
+                logger.warning(f"Discarding broken connection: {e}")
+                close = True
+        with self._cond:
+            if close or conn.closed or self._closed:
+                self._size -= 1
+                self._close_quietly(conn)
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def closeall(self):
+        """Close every idle connection and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._close_quietly(conn)
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+class BhavcopyClient:
+    """Session object holding a connection pool and exposing the bhavcopy getters.
+
+    Parameters:
+        connection_factory (callable): Zero-argument callable returning a new DB-API connection.
+            Defaults to ``establish_connection``, which reads ``config.conf``.
+        minconn (int): Connections opened up front.
+        maxconn (int): Maximum number of simultaneously open connections.
+    """
+
+    def __init__(self, connection_factory=None, minconn=0, maxconn=8):
+        if connection_factory is None:
+            connection_factory = _establish_connection
+        self.pool = ConnectionPool(connection_factory, minconn=minconn, maxconn=maxconn)
+
+    def getconn(self, timeout=None):
+        """Borrow a connection; give it back with ``putconn``."""
+        with stage("acquire"):
+            return self.pool.getconn(timeout)
+
+    def putconn(self, conn, close=False):
+        """Give back a connection obtained from ``getconn``."""
+        self.pool.putconn(conn, close=close)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Borrow a connection for the duration of a ``with`` block."""
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def close(self):
+        """Close all pooled connections."""
+        self.pool.closeall()
+        logger.info("Connection pool closed.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def get_CM_bhavcopy(self, *args, **kwargs):
+        """Same as ``Bhavcopy_Reteriver.get_CM_bhavcopy`` using this client's pool."""
+        return Bhavcopy_Reteriver.get_CM_bhavcopy(*args, client=self, **kwargs)
+
+    def get_FO_bhavcopy(self, *args, **kwargs):
+        """Same as ``Bhavcopy_Reteriver.get_FO_bhavcopy`` using this client's pool."""
+        return Bhavcopy_Reteriver.get_FO_bhavcopy(*args, client=self, **kwargs)
+
+    def get_indices_bhavcopy(self, *args, **kwargs):
+        """Same as ``Bhavcopy_Reteriver.get_indices_bhavcopy`` using this client's pool."""
+        return Bhavcopy_Reteriver.get_indices_bhavcopy(*args, client=self, **kwargs)
+
+    def get_market_snapshot(self, *args, **kwargs):
+        """Same as ``snapshot.get_market_snapshot`` using this client's pool."""
+        from .snapshot import get_market_snapshot
+
+        return get_market_snapshot(*args, client=self, **kwargs)
+
+
+def _establish_connection():
+    # Looked up on every call so configuration changes and test patches take effect
+    return Bhavcopy_Reteriver.establish_connection()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_default_client():
+    """Return the shared client used by the module-level getters, creating it on first use."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = BhavcopyClient()
+        return _default_client
+
+
+def set_default_client(client):
+    """Replace the shared client. The previous client is closed; pass None to reset."""
+    global _default_client
+    with _default_lock:
+        previous, _default_client = _default_client, client
+    if previous is not None and previous is not client:
+        previous.close()
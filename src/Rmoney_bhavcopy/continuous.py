@@ -0,0 +1,316 @@
+"""Continuous, roll-adjusted futures series built from F&O bhavcopy rows.
+
+For every underlying and trade date ``ContinuousFutures`` holds one of the futures listed that day:
+
+    roll="expiry"   the front month, until it has fewer than ``roll_days`` calendar days left,
+                    then the next month
+    roll="oi"       the front month, until the next month's open interest (OpnIntrst) is higher
+
+A series never rolls back to an earlier expiry. At each roll the jump between the old and the new
+contract, both priced on the last day before the roll, is taken out of the history before it:
+
+    adjustment="ratio"        earlier prices are multiplied by new / old
+    adjustment="difference"   new - old is added to earlier prices
+
+Rows are sorted once by underlying, date and expiry, so the front and next month of a day are the
+first two rows of its block. The contract held, the roll points and the cumulative adjustment are
+then found with NumPy operations over all days of all underlyings, with no Python loop over dates,
+expiries or underlyings.
+
+The history keeps the raw price of the contract held and the cumulative adjustment up to each day
+(``RollAdj``); the back-adjusted ``Adj<price>`` column is worked out from them when the series is
+read, so ``update`` only appends the new days. ``save`` and ``load`` keep the history in a Parquet
+file, and ``refresh`` fetches only the days after it (through a ``BhavcopyCache`` when one is given).
+
+Examples:
+    futures = ContinuousFutures(roll="oi", adjustment="ratio")
+    series = futures.update(get_FO_bhavcopy(datetime(2019,1,1), datetime(2024,1,31), ['NIFTY', 'BANKNIFTY'], instruments=FUTURE_TYPES))
+    futures.save("futures.parquet")
+
+    futures = ContinuousFutures.load("futures.parquet")
+    series = futures.refresh(datetime.now(), ['NIFTY', 'BANKNIFTY'])
+"""
+import logging
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .derived import _floats, group_bounds, grouped_cumsum
+from .options import FUTURE_TYPES
+
+logger = logging.getLogger(__name__)
+
+DATE = "TradDt"
+SYMBOL = "TckrSymb"
+EXPIRY = "XpryDt"
+ROLLS = ["expiry", "oi"]
+ADJUSTMENTS = ["ratio", "difference"]
+
+
+def _locate(keys, wanted):
+    """Position of each of ``wanted`` in the sorted ``keys`` (-1 when absent)."""
+    if not len(keys):
+        return np.full(len(wanted), -1)
+    positions = np.minimum(np.searchsorted(keys, wanted), len(keys) - 1)
+    return np.where(keys[positions] == wanted, positions, -1)
+
+
+class ContinuousFutures:
+    """Incremental continuous futures per underlying, rolled by days to expiry or by open interest.
+
+    Parameters:
+        roll (str): "expiry" rolls ``roll_days`` before the front month expires; "oi" rolls when the
+            next month's open interest overtakes the front month's.
+        roll_days (int): With roll="expiry", move to the next month once the front month has fewer
+            than this many calendar days left; 0 holds it through its expiry day.
+        adjustment (str): "ratio" or "difference" back-adjustment of the prices before each roll.
+        price (str): Price column of the F&O rows the series is built on.
+    """
+
+    def __init__(self, roll="expiry", roll_days=0, adjustment="ratio", price="ClsPric"):
+        if roll not in ROLLS:
+            raise ValueError(f"Unknown roll {roll!r}. Expected one of {ROLLS}.")
+        if adjustment not in ADJUSTMENTS:
+            raise ValueError(f"Unknown adjustment {adjustment!r}. Expected one of {ADJUSTMENTS}.")
+        if roll_days < 0:
+            raise ValueError("roll_days cannot be negative.")
+        self.roll = roll
+        self.roll_days = roll_days
+        self.adjustment = adjustment
+        self.price = price
+        self.history = pd.DataFrame({
+            DATE: np.array([], "datetime64[ns]"), SYMBOL: np.array([], object), EXPIRY: np.array([], "datetime64[ns]"),
+            price: np.array([]), "OpnIntrst": np.array([]), f"Nxt{EXPIRY}": np.array([], "datetime64[ns]"),
+            f"Nxt{price}": np.array([]), "NxtOpnIntrst": np.array([]), "Roll": np.array([], bool), "RollAdj": np.array([]),
+        })
+
+    @property
+    def columns(self):
+        """Names of the columns returned by ``series``."""
+        return [DATE, SYMBOL, EXPIRY, self.price, "OpnIntrst", f"Nxt{EXPIRY}", f"Nxt{self.price}", "NxtOpnIntrst",
+                "Roll", "RollAdj", f"Adj{self.price}"]
+
+    def last_dates(self):
+        """Return the last processed trade date of each underlying as a Series."""
+        if self.history.empty:
+            return pd.Series(dtype="datetime64[ns]")
+        return self.history.groupby(SYMBOL, sort=False)[DATE].max()
+
+    def _prepare(self, data):
+        missing = [column for column in [DATE, SYMBOL, EXPIRY, self.price, "OpnIntrst"] if column not in data.columns]
+        if missing:
+            raise ValueError(f"Continuous futures need the F&O columns {missing}")
+        if "FinInstrmTp" in data.columns:
+            data = data[data["FinInstrmTp"].astype(object).isin(FUTURE_TYPES).to_numpy()]
+        frame = pd.DataFrame({
+            DATE: pd.to_datetime(data[DATE]).astype("datetime64[ns]").to_numpy(),
+            SYMBOL: data[SYMBOL].astype(object).to_numpy(),
+            EXPIRY: pd.to_datetime(data[EXPIRY]).astype("datetime64[ns]").to_numpy(),
+            self.price: _floats(data[self.price]),
+            "OpnIntrst": _floats(data["OpnIntrst"]),
+        })
+        return frame[(frame[EXPIRY] >= frame[DATE]).to_numpy()]
+
+    def _state(self):
+        """Contracts held and next on the last stored day of each underlying, as F&O rows."""
+        last = self.history.drop_duplicates(SYMBOL, keep="last")
+        held = last[[DATE, SYMBOL, EXPIRY, self.price, "OpnIntrst", "RollAdj"]]
+        following = last[[DATE, SYMBOL, f"Nxt{EXPIRY}", f"Nxt{self.price}", "NxtOpnIntrst"]].set_axis(
+            [DATE, SYMBOL, EXPIRY, self.price, "OpnIntrst"], axis=1)
+        following = following[following[EXPIRY].notna().to_numpy()].assign(RollAdj=np.nan)
+        return pd.concat([held, following], ignore_index=True)
+
+    def update(self, data):
+        """Append the days of ``data`` that are newer than the history and return the adjusted series.
+
+        ``data`` is an F&O frame such as the result of ``get_FO_bhavcopy`` (normalized or not). When
+        it has ``FinInstrmTp`` only futures rows are used; without it ``data`` must hold futures only.
+        Rows on or before the last stored date of their underlying are ignored, so overlapping
+        fetches can be passed as they are.
+
+        Returns:
+            DataFrame: ``series()``, the whole history with the adjusted prices, since a roll in the
+            new days changes the adjustment of every earlier day.
+        """
+        new = self._prepare(data).assign(RollAdj=np.nan, _new=True)
+        frame = new
+        if not self.history.empty:
+            frame = pd.concat([self._state().assign(_new=False), new], ignore_index=True)
+        if frame.empty:
+            return self.series()
+
+        codes, symbols = pd.factorize(frame[SYMBOL], sort=True)
+        dates = frame[DATE].to_numpy(dtype="datetime64[D]").view("int64")
+        expiries = frame[EXPIRY].to_numpy(dtype="datetime64[D]").view("int64")
+        is_new = frame["_new"].to_numpy(dtype=bool)
+
+        # Drop new rows on or before the last stored date of their underlying
+        if not is_new.all():
+            last = np.full(len(symbols), np.iinfo("int64").min)
+            np.maximum.at(last, codes[~is_new], dates[~is_new])
+            keep = ~is_new | (dates > last[codes])
+            frame, codes, dates, expiries, is_new = frame[keep], codes[keep], dates[keep], expiries[keep], is_new[keep]
+
+        order = np.lexsort((expiries, dates, codes))
+        frame, codes, dates, expiries, is_new = frame.take(order), codes[order], dates[order], expiries[order], is_new[order]
+        # Of repeated (underlying, date, expiry) rows keep the last one given
+        repeated = np.r_[(codes[1:] == codes[:-1]) & (dates[1:] == dates[:-1]) & (expiries[1:] == expiries[:-1]), False]
+        if repeated.any():
+            frame, codes, dates, expiries, is_new = (frame[~repeated], codes[~repeated], dates[~repeated],
+                                                     expiries[~repeated], is_new[~repeated])
+        frame = frame.reset_index(drop=True)
+        if not is_new.any():
+            return self.series()
+        new_days = self._roll(frame, codes, symbols, dates, expiries, is_new)
+        if len(new_days):
+            logger.info(f"Appending {len(new_days)} days to the continuous futures of {new_days[SYMBOL].nunique()} underlyings")
+            history = pd.concat([self.history, new_days], ignore_index=True) if not self.history.empty else new_days
+            self.history = history.sort_values([SYMBOL, DATE], kind="stable", ignore_index=True)
+        return self.series()
+
+    def _roll(self, frame, codes, symbols, dates, expiries, is_new):
+        """One row per new (underlying, date) of the sorted contract rows: contract held, roll, adjustment."""
+        n = len(frame)
+        day_start = np.flatnonzero(np.r_[True, (codes[1:] != codes[:-1]) | (dates[1:] != dates[:-1])])
+        day_end = np.r_[day_start[1:], n]
+        day_code, day_date = codes[day_start], dates[day_start]
+        prices = frame[self.price].to_numpy(dtype="float64")
+        interest = frame["OpnIntrst"].to_numpy(dtype="float64")
+
+        # Front and next month are the first two rows of each day
+        front = day_start
+        following = np.where(day_end - day_start > 1, day_start + 1, front)
+        has_next = following != front
+        if self.roll == "expiry":
+            use_next = has_next & (expiries[front] - day_date < self.roll_days)
+        else:
+            use_next = has_next & (interest[following] > interest[front])
+        # A stored day keeps its contract, which is the first of its two rows
+        use_next &= is_new[day_start]
+        chosen = np.where(use_next, expiries[following], expiries[front])
+
+        # Never roll back: running maximum of the chosen expiry within each underlying
+        base = chosen.min() if len(chosen) else 0
+        span = int(chosen.max() - base) + 1 if len(chosen) else 1
+        held = np.maximum.accumulate((chosen - base) + day_code * span) - day_code * span + base
+
+        # Rows are sorted, so (underlying, date, expiry) keys are too and can be searched
+        date_base, expiry_base = dates.min(), expiries.min()
+        date_span, expiry_span = int(dates.max() - date_base) + 1, int(expiries.max() - expiry_base) + 1
+        key = lambda code, day, expiry: (code * date_span + (day - date_base)) * expiry_span + (expiry - expiry_base)
+        keys = key(codes.astype("int64"), dates, expiries)
+        held_row = _locate(keys, key(day_code.astype("int64"), day_date, held))
+        # Without a quote for the contract held (a gap in the data) take the day's own choice
+        held_row = np.where(held_row >= 0, held_row, np.where(use_next, following, front))
+        held = expiries[held_row]
+        next_row = np.where(held_row + 1 < day_end, held_row + 1, -1)
+
+        first_day = np.r_[True, day_code[1:] != day_code[:-1]] if len(day_code) else np.zeros(0, bool)
+        rolled = ~first_day & (held != np.r_[held[:1], held[:-1]])
+        rolls = np.flatnonzero(rolled)
+        # Old and new contract on the day before the roll, or on the roll day when that is missing
+        old = prices[held_row[rolls - 1]]
+        new_row = _locate(keys, key(day_code[rolls].astype("int64"), day_date[rolls - 1], held[rolls]))
+        new = np.where(new_row >= 0, prices[new_row], np.nan)
+        fallback = np.isnan(new) | np.isnan(old)
+        if fallback.any():
+            old_row = _locate(keys, key(day_code[rolls].astype("int64"), day_date[rolls], held[rolls - 1]))
+            old = np.where(fallback, np.where(old_row >= 0, prices[old_row], np.nan), old)
+            new = np.where(fallback, prices[held_row[rolls]], new)
+
+        # Cumulative adjustment: the stored value on each underlying's stored day, then every roll since
+        stored = frame["RollAdj"].to_numpy(dtype="float64")[held_row]
+        starts = np.where(first_day & ~np.isnan(stored), stored, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.adjustment == "ratio":
+                steps = np.zeros(len(day_start))
+                steps[rolls] = np.log(new / old)
+                steps = np.where(np.isfinite(steps), steps, 0.0)
+                steps = np.where(np.isnan(starts), steps, np.log(starts))
+                adjustment = np.exp(grouped_cumsum(steps, group_bounds(day_code)))
+            else:
+                steps = np.zeros(len(day_start))
+                steps[rolls] = new - old
+                steps = np.where(np.isfinite(steps), steps, 0.0)
+                steps = np.where(np.isnan(starts), steps, starts)
+                adjustment = grouped_cumsum(steps, group_bounds(day_code))
+
+        take = lambda column, rows: pd.api.extensions.take(frame[column].array, rows, allow_fill=True)
+        days = is_new[day_start]
+        return pd.DataFrame({
+            DATE: take(DATE, held_row),
+            SYMBOL: np.asarray(symbols, dtype=object)[day_code],
+            EXPIRY: take(EXPIRY, held_row),
+            self.price: prices[held_row],
+            "OpnIntrst": interest[held_row],
+            f"Nxt{EXPIRY}": take(EXPIRY, next_row),
+            f"Nxt{self.price}": take(self.price, next_row),
+            "NxtOpnIntrst": take("OpnIntrst", next_row),
+            "Roll": rolled,
+            "RollAdj": adjustment,
+        })[days].reset_index(drop=True)
+
+    def series(self, symbols=None):
+        """Return the history of ``symbols`` (all by default) with the back-adjusted ``Adj<price>`` column.
+
+        The last day of each underlying is unadjusted; each earlier day is adjusted by every roll after it.
+        """
+        history = self.history
+        if symbols is not None:
+            history = history[history[SYMBOL].isin([symbol.upper() for symbol in symbols]).to_numpy()]
+        latest = history.groupby(SYMBOL, sort=False)["RollAdj"].transform("last")
+        if self.adjustment == "ratio":
+            adjusted = history[self.price] * latest / history["RollAdj"]
+        else:
+            adjusted = history[self.price] + latest - history["RollAdj"]
+        return history.assign(**{f"Adj{self.price}": adjusted}).reset_index(drop=True)
+
+    def refresh(self, end_date, symbols, start_date=datetime(2016,1,1), cache=None, client=None):
+        """Fetch the days after the history up to ``end_date`` with ``get_FO_bhavcopy`` and append them.
+
+        Underlyings without history are fetched from ``start_date``. Only futures are requested from
+        the database; with a ``BhavcopyCache`` the full F&O rows go through the cache (which takes no
+        contract filters) and only days it does not hold reach the database.
+
+        Returns:
+            DataFrame: ``series(symbols)``.
+        """
+        from .Bhavcopy_Reteriver import get_FO_bhavcopy
+
+        symbols = [symbol.upper() for symbol in symbols]
+        last = self.last_dates()
+        starts = [last.get(symbol) for symbol in symbols]
+        if all(value is not None for value in starts):
+            start_date = min(starts).to_pydatetime() + timedelta(days=1)
+        if start_date > end_date:
+            return self.series(symbols)
+        logger.info(f"Refreshing continuous futures from {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}")
+        columns = [DATE, SYMBOL, "FinInstrmTp", EXPIRY, self.price, "OpnIntrst"]
+        data = get_FO_bhavcopy(start_date, end_date, symbols, batched=True, client=client, cache=cache, columns=columns,
+                               instruments=None if cache is not None else FUTURE_TYPES)
+        if data.empty:
+            data = pd.DataFrame(columns=columns)
+        self.update(data)
+        return self.series(symbols)
+
+    def save(self, path):
+        """Write the history to a Parquet file."""
+        history = self.history.copy()
+        history.attrs = {"roll": self.roll, "roll_days": self.roll_days, "adjustment": self.adjustment, "price": self.price}
+        history.to_parquet(path, index=False)
+
+    @classmethod
+    def load(cls, path):
+        """Read a history written by ``save``."""
+        history = pd.read_parquet(path)
+        attrs = history.attrs
+        futures = cls(roll=attrs["roll"], roll_days=int(attrs["roll_days"]), adjustment=attrs["adjustment"], price=attrs["price"])
+        history.attrs = {}
+        futures.history = history
+        return futures
+
+
+def continuous_futures(data, roll="expiry", roll_days=0, adjustment="ratio", price="ClsPric"):
+    """Return the continuous futures series of every underlying in ``data`` (an F&O frame), in one pass."""
+    return ContinuousFutures(roll, roll_days, adjustment, price).update(data)
@@ -0,0 +1,254 @@
+"""Derived daily series computed from CM bhavcopy rows.
+
+For every symbol and series, ``DerivedSeries`` adds:
+
+    Rtrn         daily return, ClsPric / PrvsClsgPric - 1
+    LogRtrn      log(1 + Rtrn)
+    AdjClsPric   close price chained through the daily returns, so corporate actions (which the
+                 exchange applies to PrvsClsgPric) do not show up as jumps
+    Vwap         TtlTrfVal / TtlTradgVol
+    Gap          opening gap, OpnPric / PrvsClsgPric - 1
+    GapFlag      abs(Gap) >= gap_threshold
+    Vol<window>  annualised rolling standard deviation of LogRtrn
+    Adv<window>  rolling average daily traded volume
+
+Rows are sorted once by symbol, series and date. All series are then computed over the whole frame
+with NumPy cumulative sums differenced at group boundaries, so there is no Python loop over rows
+or groups. The rolling values need a full window of valid inputs, as in ``pandas.rolling``.
+
+``update`` is incremental: the object keeps the last ``window`` rows of every group, and new days
+are computed on top of that tail instead of recomputing the full history. ``save`` and ``load``
+persist that state, and ``refresh`` fetches only the days after it (through a ``BhavcopyCache``
+when one is given).
+
+Examples:
+    series = DerivedSeries(window=20)
+    history = series.update(get_CM_bhavcopy(datetime(2016,1,1), datetime(2024,1,31), ['TCS'], ['EQ']))
+    series.save("tcs_state.parquet")
+
+    series = DerivedSeries.load("tcs_state.parquet")
+    latest = series.refresh(datetime.now(), ['TCS'], ['EQ'], cache=BhavcopyCache("~/.rmoney_bhavcopy"))
+"""
+import logging
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+KEYS = ["TckrSymb", "SctySrs"]
+DATE = "TradDt"
+# CM columns the derivations read
+INPUT_COLUMNS = [DATE, "TckrSymb", "SctySrs", "OpnPric", "ClsPric", "PrvsClsgPric", "TtlTradgVol", "TtlTrfVal"]
+TRADING_DAYS = 252
+
+
+def _floats(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def group_bounds(codes):
+    """Return the first row of each row's group for ``codes`` sorted into contiguous groups."""
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    return starts[np.cumsum(np.r_[True, codes[1:] != codes[:-1]]) - 1]
+
+
+def rolling_sum(values, first, window):
+    """Sum of the last ``window`` values of each row's group, and the number of valid values in it."""
+    valid = ~np.isnan(values)
+    sums = np.r_[0.0, np.cumsum(np.where(valid, values, 0.0))]
+    counts = np.r_[0, np.cumsum(valid)]
+    end = np.arange(1, len(values) + 1)
+    begin = np.maximum(end - window, first)
+    return sums[end] - sums[begin], counts[end] - counts[begin]
+
+
+def grouped_cumsum(values, first):
+    """Cumulative sum of ``values`` restarting at each group's first row."""
+    sums = np.r_[0.0, np.cumsum(values)]
+    return sums[1:] - sums[first]
+
+
+class DerivedSeries:
+    """Incremental returns, adjusted prices, VWAP, gaps, rolling volatility and ADV per symbol and series.
+
+    Parameters:
+        window (int): Rolling window, in trading days, of the volatility and ADV columns.
+        gap_threshold (float): Absolute opening gap from which ``GapFlag`` is set.
+    """
+
+    def __init__(self, window=20, gap_threshold=0.02):
+        if window < 2:
+            raise ValueError("window must be at least 2.")
+        self.window = window
+        self.gap_threshold = gap_threshold
+        self.state = pd.DataFrame(columns=INPUT_COLUMNS + ["AdjClsPric"])
+
+    @property
+    def columns(self):
+        """Names of the derived columns."""
+        return ["Rtrn", "LogRtrn", "AdjClsPric", "Vwap", "Gap", "GapFlag", f"Vol{self.window}", f"Adv{self.window}"]
+
+    def last_dates(self):
+        """Return the last processed trade date of each (symbol, series) as a Series."""
+        if self.state.empty:
+            return pd.Series(dtype="datetime64[ns]")
+        return self.state.groupby(KEYS, observed=True, sort=False)[DATE].max()
+
+    def _prepare(self, data):
+        missing = [column for column in INPUT_COLUMNS if column not in data.columns]
+        if missing:
+            raise ValueError(f"Derived series need the CM columns {missing}")
+        frame = pd.DataFrame({column: data[column] for column in INPUT_COLUMNS})
+        for column in KEYS:
+            frame[column] = frame[column].astype(object)
+        frame[DATE] = pd.to_datetime(frame[DATE]).astype("datetime64[ns]")
+        for column in INPUT_COLUMNS[3:]:
+            frame[column] = _floats(frame[column])
+        return frame
+
+    def update(self, data):
+        """Derive the rows of ``data`` that are newer than the state and add them to the state.
+
+        ``data`` is a CM frame such as the result of ``get_CM_bhavcopy`` (normalized or not). Rows
+        on or before the last processed date of their symbol and series are ignored, so
+        overlapping fetches can be passed as they are.
+
+        Returns:
+            DataFrame: The input columns and the derived columns of the new rows, ordered by
+            symbol, series and date.
+        """
+        new = self._prepare(data).assign(AdjClsPric=np.nan, _new=True)
+        frame = new
+        if not self.state.empty:
+            frame = pd.concat([self.state.assign(_new=False), new], ignore_index=True)
+
+        # One integer code per (symbol, series); every later step works on these codes
+        symbol_codes, _ = pd.factorize(frame["TckrSymb"], sort=True, use_na_sentinel=False)
+        series_codes, series = pd.factorize(frame["SctySrs"], sort=True, use_na_sentinel=False)
+        codes = symbol_codes.astype("int64") * max(len(series), 1) + series_codes
+        dates = frame[DATE].to_numpy(dtype="datetime64[ns]").view("int64")
+        is_new = frame["_new"].to_numpy(dtype=bool)
+
+        # Drop new rows on or before the last stored date of their group
+        if not is_new.all():
+            last = np.full(codes.max() + 1, np.iinfo("int64").min)
+            np.maximum.at(last, codes[~is_new], dates[~is_new])
+            keep = ~is_new | (dates > last[codes])
+            frame, codes, dates, is_new = frame[keep], codes[keep], dates[keep], is_new[keep]
+
+        order = np.lexsort((dates, codes))
+        frame, codes, dates, is_new = frame.take(order), codes[order], dates[order], is_new[order]
+        # Of repeated (symbol, series, date) rows keep the last one given
+        repeated = np.r_[(codes[1:] == codes[:-1]) & (dates[1:] == dates[:-1]), False]
+        if repeated.any():
+            frame, codes, is_new = frame[~repeated], codes[~repeated], is_new[~repeated]
+        frame = frame.reset_index(drop=True)
+        derived = self._compute(frame, codes)
+
+        self.state = derived.loc[self._tail_mask(codes), INPUT_COLUMNS + ["AdjClsPric"]].reset_index(drop=True)
+        return derived[is_new].drop(columns="_new").reset_index(drop=True)
+
+    def _tail_mask(self, codes):
+        """Mark the last ``window`` rows of each group of the sorted ``codes``."""
+        if not len(codes):
+            return np.zeros(0, dtype=bool)
+        last = np.r_[np.flatnonzero(codes[1:] != codes[:-1]), len(codes) - 1]
+        group_end = np.repeat(last, np.diff(np.r_[-1, last]))
+        return (group_end - np.arange(len(codes))) < self.window
+
+    def _compute(self, frame, codes):
+        n = len(frame)
+        first = group_bounds(codes) if n else np.array([], int)
+        is_first = first == np.arange(n)
+
+        close = frame["ClsPric"].to_numpy(dtype="float64")
+        prev = frame["PrvsClsgPric"].to_numpy(dtype="float64")
+        # Without the exchange's previous close fall back to the previous row of the group
+        shifted = np.r_[np.nan, close[:-1]] if n else close
+        prev = np.where(np.isnan(prev) & ~is_first, shifted, prev)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rtrn = close / prev - 1.0
+            log_rtrn = np.log1p(rtrn)
+            gap = frame["OpnPric"].to_numpy(dtype="float64") / prev - 1.0
+            volume = frame["TtlTradgVol"].to_numpy(dtype="float64")
+            vwap = np.where(volume > 0, frame["TtlTrfVal"].to_numpy(dtype="float64") / volume, np.nan)
+
+        # Chain the close through the returns from each group's first row; rows carried over in the
+        # state keep their stored value, so appended days continue the same chain
+        growth = np.where(np.isnan(log_rtrn) | is_first, 0.0, log_rtrn)
+        chained = close[first] * np.exp(grouped_cumsum(growth, first))
+        stored = frame["AdjClsPric"].to_numpy(dtype="float64")
+        has_stored = ~np.isnan(stored)
+        if has_stored.any():
+            # Each group is rescaled by the ratio at its last stored row
+            rows = np.flatnonzero(has_stored)
+            last_rows = rows[np.r_[codes[rows][1:] != codes[rows][:-1], True]]
+            ratio = np.ones(codes.max() + 1)
+            ratio[codes[last_rows]] = stored[last_rows] / chained[last_rows]
+            chained = chained * ratio[codes]
+        adjusted = np.where(has_stored, stored, chained)
+
+        window = self.window
+        sums, counts = rolling_sum(log_rtrn, first, window)
+        squares, _ = rolling_sum(log_rtrn * log_rtrn, first, window)
+        with np.errstate(invalid="ignore"):
+            variance = np.maximum(squares - sums * sums / window, 0.0) / (window - 1)
+        vol = np.where(counts == window, np.sqrt(variance * TRADING_DAYS), np.nan)
+        volume_sums, volume_counts = rolling_sum(volume, first, window)
+        adv = np.where(volume_counts == window, volume_sums / window, np.nan)
+
+        result = frame.drop(columns="AdjClsPric")
+        result["Rtrn"] = rtrn
+        result["LogRtrn"] = log_rtrn
+        result["AdjClsPric"] = adjusted
+        result["Vwap"] = vwap
+        result["Gap"] = gap
+        result["GapFlag"] = np.abs(gap) >= self.gap_threshold
+        result[f"Vol{window}"] = vol
+        result[f"Adv{window}"] = adv
+        return result
+
+    def refresh(self, end_date, symbols, series, start_date=datetime(2016,1,1), cache=None, client=None):
+        """Fetch the days after the state up to ``end_date`` with ``get_CM_bhavcopy`` and derive them.
+
+        Symbols and series without state are fetched from ``start_date``. With a ``BhavcopyCache``
+        only days the cache does not hold reach the database.
+        """
+        from .Bhavcopy_Reteriver import get_CM_bhavcopy
+
+        last = self.last_dates()
+        keys = [(symbol.upper(), s) for symbol in symbols for s in series]
+        starts = [last.get(key) for key in keys] if not last.empty else [None] * len(keys)
+        if all(value is not None for value in starts):
+            start_date = min(starts).to_pydatetime() + timedelta(days=1)
+        if start_date > end_date:
+            return self.update(pd.DataFrame(columns=INPUT_COLUMNS))
+        logger.info(f"Refreshing derived series from {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}")
+        data = get_CM_bhavcopy(start_date, end_date, symbols, series, cache=cache, client=client, columns=INPUT_COLUMNS)
+        if data.empty:
+            data = pd.DataFrame(columns=INPUT_COLUMNS)
+        return self.update(data)
+
+    def save(self, path):
+        """Write the state to a Parquet file."""
+        state = self.state.copy()
+        state.attrs = {"window": self.window, "gap_threshold": self.gap_threshold}
+        state.to_parquet(path, index=False)
+
+    @classmethod
+    def load(cls, path):
+        """Read a state written by ``save``."""
+        state = pd.read_parquet(path)
+        series = cls(window=int(state.attrs["window"]), gap_threshold=float(state.attrs["gap_threshold"]))
+        series.state = state
+        return series
+
+
+def derive(data, window=20, gap_threshold=0.02):
+    """Return ``data`` (a CM frame) with the derived columns of ``DerivedSeries`` added, in one pass."""
+    return DerivedSeries(window, gap_threshold).update(data)
@@ -0,0 +1,231 @@
+"""Bulk loading of NSE daily bhavcopy files into the bhavcopy tables.
+
+``ingest`` loads UDiFF and legacy daily files, as CSV or ZIP archives of CSVs, from a directory
+(searched recursively) or a list of paths. The table of each file is recognised from its header:
+
+    UDiFF CM / F&O      BhavCopy_NSE_CM_*.csv, BhavCopy_NSE_FO_*.csv   -> bhavcopies_udiff, FO_Bhavcopies_UDiFF
+    legacy CM           cm01JUL2024bhav.csv                            -> bhavcopies_cm
+    legacy F&O          fo01JUL2024bhav.csv                            -> FO_bhavCopies_CM
+    indices             ind_close_all_01072024.csv                     -> Indices_bhavCopies
+
+Files are read in chunks of ``chunk_size`` rows as text, cleaned into the columns and order of
+``queries.TABLES`` (dates written as ISO dates, "-" and blanks as NULL) and streamed to the server
+with ``COPY FROM STDIN``. Every file is loaded in one transaction that first deletes the rows of the
+trade dates it contains, so loading a file again replaces its days instead of duplicating them.
+Files are loaded in parallel, each on its own pooled connection.
+
+Examples:
+    report = ingest("/data/nse/2023", max_workers=8)
+    report.attrs["errors"]    # files that failed, with their error messages
+"""
+import io
+import logging
+import time
+import zipfile
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from . import backends
+from .Bhavcopy_Reteriver import pool_client, run_parallel
+from .queries import COLUMN_TYPES, TABLES, UNIFIED_SEGMENTS, quote_ident
+
+logger = logging.getLogger(__name__)
+
+# Format of the date columns in each table's files
+DATE_FORMATS = {
+    "bhavcopies_cm": "%d-%b-%Y",
+    "bhavcopies_udiff": "%Y-%m-%d",
+    "FO_bhavCopies_CM": "%d-%b-%Y",
+    "FO_Bhavcopies_UDiFF": "%Y-%m-%d",
+    "Indices_bhavCopies": "%d-%m-%Y",
+}
+# UDiFF table of each ``Sgmt`` code
+UDIFF_TABLES = {segment: tables[0] for segment, tables in UNIFIED_SEGMENTS.items()}
+NULL_VALUES = ["", "-", "NA", "N/A"]
+
+
+def detect_table(columns, first_row=None):
+    """Return the table a file with header ``columns`` belongs to.
+
+    UDiFF CM and F&O files share a header; ``first_row`` (a dict) tells them apart by its ``Sgmt``.
+    """
+    found = {column for column in columns if column}
+    for table_name, spec in TABLES.items():
+        if set(spec["columns"]) != found:
+            continue
+        if table_name not in UDIFF_TABLES.values():
+            return table_name
+        segment = (first_row or {}).get("Sgmt")
+        if segment not in UDIFF_TABLES:
+            raise ValueError(f"Unknown UDiFF segment {segment!r}. Expected one of {list(UDIFF_TABLES)}.")
+        return UDIFF_TABLES[segment]
+    raise ValueError(f"Unrecognised bhavcopy header: {list(columns)}")
+
+
+@contextmanager
+def _open_member(path, member):
+    with zipfile.ZipFile(path) as archive, archive.open(member) as handle:
+        yield handle
+
+
+def iter_sources(paths):
+    """Yield (name, open) for every CSV file below ``paths``, including the CSVs inside ZIP archives.
+
+    ``open`` is a zero-argument callable returning a binary file object.
+    """
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.suffix.lower() in (".csv", ".zip")))
+        elif path.exists():
+            files.append(path)
+        else:
+            raise ValueError(f"No such file or directory: {path}")
+    for path in files:
+        if path.suffix.lower() != ".zip":
+            yield str(path), (lambda path=path: open(path, "rb"))
+            continue
+        with zipfile.ZipFile(path) as archive:
+            members = [name for name in archive.namelist() if name.lower().endswith(".csv")]
+        for member in members:
+            yield f"{path}!{member}", (lambda path=path, member=member: _open_member(path, member))
+
+
+def date_column(table_name):
+    """The trade date column of ``table_name`` as named in its files (``TABLES`` may use another case)."""
+    spec = TABLES[table_name]
+    return next(column for column in spec["columns"] if column.lower() == spec["date"].lower())
+
+
+def clean_chunk(chunk, table_name):
+    """Put a chunk read as text into the column order of ``table_name``, with ISO dates and NULLs for blanks."""
+    spec = TABLES[table_name]
+    trade_date = date_column(table_name)
+    chunk = chunk.reindex(columns=spec["columns"])
+    for column in spec["columns"]:
+        kind = COLUMN_TYPES[column]
+        values = chunk[column]
+        if kind == "date":
+            # A daily file holds a handful of distinct dates: parse those and map them back
+            distinct = values.dropna().unique()
+            parsed = pd.to_datetime(pd.Series(distinct, dtype=object), format=DATE_FORMATS[table_name], errors="coerce")
+            if parsed.isna().any():
+                parsed = pd.to_datetime(pd.Series(distinct, dtype=object), format="mixed", dayfirst=True)
+            chunk[column] = values.map(dict(zip(distinct, parsed.dt.strftime("%Y-%m-%d"))))
+        elif kind == "int" and values.str.contains(".", regex=False).any():
+            # Some files write counts as "12.0"
+            chunk[column] = pd.to_numeric(values).round().astype("Int64")
+        elif kind == "text":
+            chunk[column] = values.str.strip()
+    if chunk[trade_date].isna().any():
+        raise ValueError(f"Rows without a trade date in {table_name} file.")
+    return chunk
+
+
+def read_chunks(handle, chunk_size=100_000):
+    """Yield (table_name, chunk) for a bhavcopy CSV, each chunk cleaned by ``clean_chunk``."""
+    reader = pd.read_csv(
+        handle, dtype=str, chunksize=chunk_size, skipinitialspace=True,
+        keep_default_na=False, na_values=NULL_VALUES,
+    )
+    table_name = None
+    for chunk in reader:
+        chunk.columns = ["" if column.startswith("Unnamed:") else column.strip() for column in chunk.columns]
+        chunk = chunk.loc[:, [column for column in chunk.columns if column]]
+        if table_name is None:
+            first_row = chunk.iloc[0].to_dict() if len(chunk) else None
+            table_name = detect_table(list(chunk.columns), first_row)
+        yield table_name, clean_chunk(chunk, table_name)
+
+
+def replace_dates(cur, table_name, dates):
+    """Delete the rows of ``dates`` from ``table_name``, holding a lock on each (table, date) until commit."""
+    spec = TABLES[table_name]
+    date_col = quote_ident(spec["date"], spec.get("quoted", False))
+    for day in sorted(dates):
+        # Concurrent loads of the same day wait for each other instead of interleaving
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"{table_name}:{day}",))
+    cur.execute(f"DELETE FROM {table_name} WHERE {date_col} = ANY(%s::date[])", (sorted(dates),))
+
+
+def copy_chunk(cur, table_name, chunk):
+    """Stream ``chunk`` into ``table_name`` with ``COPY FROM STDIN``."""
+    quoted = TABLES[table_name].get("quoted", False)
+    columns = ", ".join(quote_ident(column, quoted).replace("%%", "%") for column in chunk.columns)
+    buffer = io.StringIO()
+    chunk.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    cur.copy_expert(f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def load_source(conn, name, opener, chunk_size=100_000):
+    """Load one file in a single transaction, replacing the trade dates it contains.
+
+    Returns:
+        dict: file, table, rows, first and last trade date, seconds.
+    """
+    started = time.perf_counter()
+    cur = conn.cursor()
+    table_name, rows, dates = None, 0, set()
+    try:
+        with opener() as handle:
+            for table_name, chunk in read_chunks(handle, chunk_size):
+                new_dates = set(chunk[date_column(table_name)]) - dates
+                if new_dates:
+                    replace_dates(cur, table_name, new_dates)
+                    dates |= new_dates
+                copy_chunk(cur, table_name, chunk)
+                rows += len(chunk)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    logger.info(f"Loaded {rows} rows of {len(dates)} trade dates from {name} into {table_name}")
+    days = sorted(map(date.fromisoformat, dates))
+    return {
+        "file": name, "table": table_name, "rows": rows,
+        "first_date": days[0] if days else None, "last_date": days[-1] if days else None,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def ingest(paths, max_workers=4, chunk_size=100_000, client=None):
+    """Load NSE daily bhavcopy files into the bhavcopy tables.
+
+    Parameters:
+        paths (str | Path | list): A directory (searched recursively), a file, or a list of them.
+            CSV files and ZIP archives of CSV files are read.
+        max_workers (int): Number of files loaded at the same time, each on its own connection.
+        chunk_size (int): Rows read and copied at a time.
+        client (BhavcopyClient, optional): Client whose pool provides the connections; defaults to
+            the shared default client.
+
+    Returns:
+        DataFrame: One row per loaded file (file, table, rows, first_date, last_date, seconds), with
+        ``attrs["errors"]`` mapping each file that failed to its error message. A failed file
+        leaves the tables unchanged.
+
+    Examples:
+        report = ingest("/data/nse/udiff", max_workers=8)
+        report.groupby("table")["rows"].sum()
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1.")
+    sources = list(iter_sources(paths))
+    tasks = [lambda conn, name=name, opener=opener: load_source(conn, name, opener, chunk_size) for name, opener in sources]
+    results = run_parallel(pool_client(client, "ingest"), tasks, max_workers)
+
+    loaded, errors = [], {}
+    for (name, _), result in zip(sources, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error loading {name}: {result}")
+            errors[name] = str(result)
+        else:
+            loaded.append(result)
+    report = pd.DataFrame(loaded, columns=["file", "table", "rows", "first_date", "last_date", "seconds"])
+    return backends.with_errors(report, errors)
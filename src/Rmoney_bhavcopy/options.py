@@ -0,0 +1,263 @@
+"""Option-chain analytics over F&O bhavcopy rows: implied volatility, Greeks, PCR and max pain.
+
+Everything works on whole NumPy arrays at once. Implied volatility is found with a batched,
+safeguarded Newton iteration: every contract keeps a [low, high] volatility bracket, takes the
+Newton step when it stays inside the bracket and bisects otherwise, and the iteration stops when
+all contracts have converged. Prices use Black-Scholes on the underlying price with a flat
+continuously compounded ``rate``; the normal CDF is computed in NumPy (no SciPy needed).
+
+Conventions:
+    time to expiry   (XpryDt - TradDt) in calendar days / 365
+    vega             price change for a 1 percentage point change in volatility
+    theta            price change per calendar day
+
+Examples:
+    data = get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['NIFTY'])
+    chain = option_chain(data, rate=0.07)
+    pcr = put_call_ratio(chain)
+    pain = max_pain(chain)
+"""
+import numpy as np
+import pandas as pd
+
+from .derived import group_bounds, grouped_cumsum
+
+DAYS_PER_YEAR = 365.0
+# Instrument types of futures, in the UDiFF and legacy formats
+FUTURE_TYPES = ["IDF", "STF", "FUTIDX", "FUTSTK"]
+EXPIRY_KEYS = ["TradDt", "TckrSymb", "XpryDt"]
+
+_SQRT_2PI = np.sqrt(2.0 * np.pi)
+
+
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def norm_cdf(x):
+    """Standard normal CDF, Hart's double precision approximation (as given by West, 2005)."""
+    x = np.asarray(x, dtype="float64")
+    z = np.abs(x)
+    e = np.exp(-0.5 * z * z)
+    near = (((((((0.0352624965998911 * z + 0.700383064443688) * z + 6.37396220353165) * z
+                + 33.912866078383) * z + 112.079291497871) * z + 221.213596169931) * z + 220.206867912376)
+            / ((((((((0.0883883476483184 * z + 1.75566716318264) * z + 16.064177579207) * z
+                   + 86.7807322029461) * z + 296.564248779674) * z + 637.333633378831) * z
+                 + 793.826512519948) * z + 440.413735824752))) * e
+    with np.errstate(divide="ignore", invalid="ignore"):
+        b = z + 0.65
+        b = z + 4.0 / b
+        b = z + 3.0 / b
+        b = z + 2.0 / b
+        b = z + 1.0 / b
+        far = e / b / 2.506628274631
+    tail = np.where(z < 7.07106781186547, near, np.where(z > 37.0, 0.0, far))
+    return np.where(x > 0, 1.0 - tail, tail)
+
+
+def _d1_d2(spot, strike, t, rate, volatility):
+    root = volatility * np.sqrt(t)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * volatility * volatility) * t) / root
+    return d1, d1 - root
+
+
+def black_scholes(spot, strike, t, rate, volatility, is_call):
+    """Black-Scholes price of European options; all arguments broadcast."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1, d2 = _d1_d2(spot, strike, t, rate, volatility)
+    discounted = strike * np.exp(-rate * t)
+    call = spot * norm_cdf(d1) - discounted * norm_cdf(d2)
+    put = discounted * norm_cdf(-d2) - spot * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def implied_volatility(price, spot, strike, t, rate=0.0, is_call=True, tol=1e-6, max_iter=100, low=1e-4, high=5.0):
+    """Implied volatility of each option price.
+
+    Parameters:
+        price, spot, strike, t: Arrays (or scalars) of option price, underlying price, strike and
+            time to expiry in years.
+        rate (float): Continuously compounded risk-free rate.
+        is_call: Boolean array, True for calls.
+        tol (float): Absolute price tolerance of the solution.
+        max_iter (int): Iteration limit; contracts not converged by then are NaN.
+        low, high (float): Volatility bracket searched.
+
+    Returns:
+        ndarray: Volatilities, NaN where the price is outside the no-arbitrage bounds, a value is
+        missing, the option has expired (t <= 0) or no volatility in [low, high] matches.
+    """
+    price, spot, strike, t, is_call = np.broadcast_arrays(
+        np.asarray(price, dtype="float64"), np.asarray(spot, dtype="float64"),
+        np.asarray(strike, dtype="float64"), np.asarray(t, dtype="float64"), np.asarray(is_call, dtype=bool),
+    )
+    discounted = strike * np.exp(-rate * t)
+    intrinsic = np.where(is_call, np.maximum(spot - discounted, 0.0), np.maximum(discounted - spot, 0.0))
+    upper = np.where(is_call, spot, discounted)
+    with np.errstate(invalid="ignore"):
+        valid = (t > 0) & (spot > 0) & (strike > 0) & (price > intrinsic) & (price < upper)
+
+    # Solve only the valid contracts; ``idx`` maps the working arrays back to the input
+    idx = np.flatnonzero(valid)
+    p, s, k, tt, call = price.ravel()[idx], spot.ravel()[idx], strike.ravel()[idx], t.ravel()[idx], is_call.ravel()[idx]
+    lo, hi = np.full(len(idx), low), np.full(len(idx), high)
+    # Brenner-Subrahmanyam starting point
+    sigma = np.clip(np.sqrt(2.0 * np.pi / tt) * p / s, low, high)
+    converged = np.zeros(len(idx), dtype=bool)
+    active = np.arange(len(idx))
+
+    for _ in range(max_iter):
+        if not len(active):
+            break
+        sg = sigma[active]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d1, _ = _d1_d2(s[active], k[active], tt[active], rate, sg)
+        diff = black_scholes(s[active], k[active], tt[active], rate, sg, call[active]) - p[active]
+        done = np.abs(diff) <= tol
+        converged[active[done]] = True
+
+        # Price rises with volatility: tighten the bracket around the root
+        hi[active] = np.where(diff > 0, sg, hi[active])
+        lo[active] = np.where(diff < 0, sg, lo[active])
+        vega = s[active] * norm_pdf(d1) * np.sqrt(tt[active])
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            step = sg - diff / vega
+        inside = (step > lo[active]) & (step < hi[active])
+        sigma[active] = np.where(done, sg, np.where(inside, step, 0.5 * (lo[active] + hi[active])))
+        # Bracket collapsed without reaching the price tolerance: no root in [low, high]
+        stuck = (hi[active] - lo[active]) < 1e-12
+        active = active[~done & ~stuck]
+
+    result = np.full(price.shape, np.nan)
+    result.ravel()[idx[converged]] = sigma[converged]
+    return result
+
+
+def greeks(spot, strike, t, rate, volatility, is_call):
+    """Black-Scholes delta, gamma, vega (per volatility point) and theta (per calendar day).
+
+    Returns:
+        dict: 'Delta', 'Gamma', 'Vega' and 'Theta' arrays.
+    """
+    spot, strike, t, volatility = (np.asarray(value, dtype="float64") for value in (spot, strike, t, volatility))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1, d2 = _d1_d2(spot, strike, t, rate, volatility)
+        root_t = np.sqrt(t)
+        density = norm_pdf(d1)
+        discounted = strike * np.exp(-rate * t)
+        decay = -spot * density * volatility / (2.0 * root_t)
+        return {
+            "Delta": np.where(is_call, norm_cdf(d1), norm_cdf(d1) - 1.0),
+            "Gamma": density / (spot * volatility * root_t),
+            "Vega": spot * density * root_t / 100.0,
+            "Theta": np.where(
+                is_call, decay - rate * discounted * norm_cdf(d2), decay + rate * discounted * norm_cdf(-d2)
+            ) / DAYS_PER_YEAR,
+        }
+
+
+def underlying_prices(data):
+    """Underlying price of each row: ``UndrlygPric``, or the close of the nearest future that day.
+
+    Legacy rows (before UDiFF) carry no underlying price, so the nearest-expiry future of the same
+    symbol and trade date stands in for it.
+    """
+    spot = pd.to_numeric(data["UndrlygPric"], errors="coerce") if "UndrlygPric" in data.columns else pd.Series(np.nan, index=data.index)
+    spot = spot.to_numpy(dtype="float64", na_value=np.nan)
+    missing = np.isnan(spot)
+    if missing.any() and {"FinInstrmTp", "ClsPric"} <= set(data.columns):
+        futures = data[data["FinInstrmTp"].astype(object).isin(FUTURE_TYPES).to_numpy()]
+        nearest = (
+            futures.sort_values("XpryDt", kind="stable")
+            .drop_duplicates(["TradDt", "TckrSymb"])[["TradDt", "TckrSymb", "ClsPric"]]
+            .astype({"TckrSymb": object})
+        )
+        keys = data[["TradDt", "TckrSymb"]].astype({"TckrSymb": object})
+        fallback = keys.merge(nearest, on=["TradDt", "TckrSymb"], how="left")["ClsPric"]
+        spot = np.where(missing, pd.to_numeric(fallback, errors="coerce").to_numpy(dtype="float64", na_value=np.nan), spot)
+    return spot
+
+
+def option_chain(data, rate=0.0, price="SttlmPric", tol=1e-6):
+    """Add implied volatility and Greeks to the option rows of an F&O frame.
+
+    Parameters:
+        data (DataFrame): Result of ``get_FO_bhavcopy`` (normalized or not).
+        rate (float): Continuously compounded risk-free rate, e.g. 0.07.
+        price (str): Column holding the option price solved for, 'SttlmPric' (default) or 'ClsPric'.
+        tol (float): Absolute price tolerance of the implied volatility.
+
+    Returns:
+        DataFrame: The CE/PE rows of ``data`` with 'Spot', 'TmToXpry' (years), 'IV', 'Delta',
+        'Gamma', 'Vega' and 'Theta' columns.
+    """
+    is_option = data["OptnTp"].astype(object).isin(["CE", "PE"]).to_numpy()
+    spot = underlying_prices(data)[is_option]
+    chain = data[is_option].reset_index(drop=True)
+
+    days = (pd.to_datetime(chain["XpryDt"]) - pd.to_datetime(chain["TradDt"])).dt.days.to_numpy(dtype="float64")
+    t = days / DAYS_PER_YEAR
+    strike = pd.to_numeric(chain["StrkPric"], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    premium = pd.to_numeric(chain[price], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    is_call = (chain["OptnTp"].astype(object) == "CE").to_numpy()
+
+    volatility = implied_volatility(premium, spot, strike, t, rate, is_call, tol=tol)
+    chain["Spot"] = spot
+    chain["TmToXpry"] = t
+    chain["IV"] = volatility
+    for name, values in greeks(spot, strike, t, rate, volatility, is_call).items():
+        chain[name] = values
+    return chain
+
+
+def put_call_ratio(chain, by=EXPIRY_KEYS, field="OpnIntrst"):
+    """Put/call ratio of ``field`` (open interest by default, or e.g. 'TtlTradgVol') per ``by`` group.
+
+    Returns:
+        DataFrame: ``by`` columns with 'CE', 'PE' totals and 'PCR'.
+    """
+    values = pd.to_numeric(chain[field], errors="coerce").astype("float64")
+    frame = chain[list(by)].assign(_side=chain["OptnTp"].astype(object), _value=values)
+    totals = frame.pivot_table(index=list(by), columns="_side", values="_value", aggfunc="sum", observed=True)
+    totals = totals.reindex(columns=["CE", "PE"]).fillna(0.0)
+    totals.columns.name = None
+    with np.errstate(divide="ignore", invalid="ignore"):
+        totals["PCR"] = totals["PE"] / totals["CE"].where(totals["CE"] > 0)
+    return totals.reset_index()
+
+
+def max_pain(chain, by=EXPIRY_KEYS, field="OpnIntrst"):
+    """Max-pain strike per ``by`` group: the strike at which option holders' total payoff is lowest.
+
+    The payoff at each listed strike K is sum(call OI * max(K - Ki, 0)) + sum(put OI * max(Kj - K, 0)),
+    computed for every group at once from cumulative sums over the sorted strikes.
+
+    Returns:
+        DataFrame: ``by`` columns with 'MaxPain' (strike) and 'Payout' (payoff at that strike).
+    """
+    by = list(by)
+    values = pd.to_numeric(chain[field], errors="coerce").fillna(0).to_numpy(dtype="float64")
+    is_call = (chain["OptnTp"].astype(object) == "CE").to_numpy()
+    frame = chain[by].assign(
+        StrkPric=pd.to_numeric(chain["StrkPric"], errors="coerce").astype("float64"),
+        _call=np.where(is_call, values, 0.0),
+        _put=np.where(is_call, 0.0, values),
+    )
+    strikes = frame.groupby(by + ["StrkPric"], observed=True, sort=True)[["_call", "_put"]].sum().reset_index()
+    if strikes.empty:
+        return pd.DataFrame(columns=by + ["MaxPain", "Payout"])
+
+    codes = strikes.groupby(by, observed=True, sort=False).ngroup().to_numpy()
+    first = group_bounds(codes)
+    k = strikes["StrkPric"].to_numpy()
+    calls, puts = strikes["_call"].to_numpy(), strikes["_put"].to_numpy()
+    # Calls struck at or below K pay K - Ki; puts struck above K pay Kj - K
+    call_oi, call_value = grouped_cumsum(calls, first), grouped_cumsum(calls * k, first)
+    put_oi, put_value = grouped_cumsum(puts, first), grouped_cumsum(puts * k, first)
+    ends = np.r_[np.flatnonzero(codes[1:] != codes[:-1]), len(codes) - 1]
+    group_last = np.repeat(ends, np.diff(np.r_[-1, ends]))
+    payout = (k * call_oi - call_value) + ((put_value[group_last] - put_value) - k * (put_oi[group_last] - put_oi))
+
+    strikes["Payout"] = payout
+    best = strikes.loc[strikes.groupby(codes)["Payout"].idxmin().to_numpy()]
+    return best[by + ["StrkPric", "Payout"]].rename(columns={"StrkPric": "MaxPain"}).reset_index(drop=True)
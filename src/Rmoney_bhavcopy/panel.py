@@ -0,0 +1,197 @@
+"""Wide (date x symbol) panels built from long bhavcopy frames.
+
+``to_panel`` places every row directly into preallocated NumPy arrays through integer codes for
+its trade date and symbol, so no ``pivot_table`` grouping or object-dtype reshaping is involved.
+All fields share the same sorted trading-calendar axis and symbol axis.
+
+F&O data has many contracts per symbol and day, so ``get_FO_bhavcopy`` has no ``output="panel"``;
+``strike_panel`` pivots one trade date of its options by strike and (expiry, option type) instead.
+
+Examples:
+    panel = get_CM_bhavcopy(start_date, end_date, ['TCS', 'INFY'], ['EQ'], output="panel")
+    closes = panel["ClsPric"]            # 2-D float64 array, dates x symbols
+    returns = panel.frame("ClsPric").pct_change()
+
+    chain = strike_panel(get_FO_bhavcopy(start_date, end_date, ['NIFTY']), datetime(2024,1,2))
+"""
+import numpy as np
+import pandas as pd
+
+# Date column, symbol column and default fields of the panel for each segment
+PANEL_AXES = {
+    "CM": {
+        "date": "TradDt", "symbol": "TckrSymb",
+        "fields": ["OpnPric", "HghPric", "LwPric", "ClsPric", "TtlTradgVol"],
+    },
+    "Indices": {
+        "date": "Index Date", "symbol": "Index Name",
+        "fields": ["Open Index Value", "High Index Value", "Low Index Value", "Closing Index Value", "Volume"],
+    },
+}
+
+OUTPUTS = ("frame", "panel")
+
+
+class PanelError(ValueError):
+    """Raised when a long frame has several rows for one (date, symbol) cell of a panel."""
+
+
+class Panel:
+    """Aligned 2-D float64 arrays, one per field, on shared date and symbol axes.
+
+    Attributes:
+        dates (DatetimeIndex): Sorted trading dates (rows).
+        symbols (Index): Symbols (columns).
+        values (dict): Field name -> array of shape (len(dates), len(symbols)); NaN where a symbol
+            has no row on a date.
+        errors (dict): Symbols that failed to load, as in ``attrs["errors"]`` of the long frame.
+    """
+
+    def __init__(self, dates, symbols, values, errors=None):
+        self.dates = dates
+        self.symbols = symbols
+        self.values = values
+        self.errors = errors or {}
+
+    @property
+    def fields(self):
+        return list(self.values)
+
+    @property
+    def shape(self):
+        return (len(self.dates), len(self.symbols))
+
+    def __getitem__(self, field):
+        return self.values[field]
+
+    def __contains__(self, field):
+        return field in self.values
+
+    def frame(self, field):
+        """Return one field as a wide DataFrame indexed by date with one column per symbol."""
+        return pd.DataFrame(self.values[field], index=self.dates, columns=self.symbols)
+
+    def __repr__(self):
+        return f"Panel({len(self.dates)} dates x {len(self.symbols)} symbols, fields={self.fields})"
+
+
+def _as_float(series):
+    """Return ``series`` as a float64 array, with NaN for missing values."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _codes(values, axis=None):
+    """Map ``values`` to integer positions on ``axis``, or on their sorted unique values."""
+    if axis is None:
+        codes, uniques = pd.factorize(values, sort=True)
+        return codes, pd.Index(np.asarray(uniques))
+    axis = pd.Index(list(dict.fromkeys(axis)))
+    return axis.get_indexer(values), axis
+
+
+def to_panel(dataframe, fields, date_column="TradDt", symbol_column="TckrSymb", symbols=None):
+    """Pivot a long frame into a ``Panel`` of ``fields``.
+
+    Parameters:
+        dataframe (DataFrame): Long frame with one row per date and symbol.
+        fields (list): Numeric columns to pivot.
+        date_column (str): Column giving the row axis.
+        symbol_column (str): Column giving the column axis.
+        symbols (list): Column order of the panel. Symbols without rows get all-NaN columns and rows
+            of other symbols are dropped. Defaults to the sorted symbols present.
+
+    Raises:
+        PanelError: Several rows share a date and symbol, e.g. two series of one stock; select one
+            row per cell first.
+    """
+    if dataframe.empty:
+        dates = pd.DatetimeIndex([], name=date_column)
+        symbols = pd.Index(list(dict.fromkeys(symbols or [])), name=symbol_column)
+        values = {field: np.full((0, len(symbols)), np.nan) for field in fields}
+        return Panel(dates, symbols, values, dataframe.attrs.get("errors"))
+    missing = [field for field in fields if field not in dataframe.columns]
+    if missing:
+        raise ValueError(f"Cannot build a panel of missing columns: {missing}")
+
+    symbol_values = dataframe[symbol_column]
+    if isinstance(symbol_values.dtype, pd.CategoricalDtype):
+        symbol_values = symbol_values.astype(object)
+    date_codes, dates = _codes(pd.to_datetime(dataframe[date_column]).to_numpy())
+    symbol_codes, symbol_axis = _codes(symbol_values.to_numpy(), symbols)
+
+    keep = symbol_codes >= 0
+    if not keep.all():
+        date_codes, symbol_codes = date_codes[keep], symbol_codes[keep]
+
+    cells = date_codes * len(symbol_axis) + symbol_codes
+    unique_cells, counts = np.unique(cells, return_counts=True)
+    if (counts > 1).any():
+        cell = unique_cells[np.argmax(counts > 1)]
+        day, symbol = dates[cell // len(symbol_axis)], symbol_axis[cell % len(symbol_axis)]
+        raise PanelError(
+            f"{(counts > 1).sum()} (date, symbol) cells have several rows, e.g. {symbol} on {pd.Timestamp(day).date()}; "
+            "keep one row per date and symbol (e.g. a single series) before building a panel"
+        )
+
+    values = {}
+    for field in fields:
+        array = np.full((len(dates), len(symbol_axis)), np.nan)
+        array[date_codes, symbol_codes] = _as_float(dataframe[field])[keep]
+        values[field] = array
+    return Panel(
+        pd.DatetimeIndex(dates, name=date_column),
+        symbol_axis.rename(symbol_column),
+        values,
+        dataframe.attrs.get("errors"),
+    )
+
+
+def panel_fields(segment, columns=None):
+    """Fields a getter pivots: the numeric ``columns`` requested, or the segment's default fields."""
+    from .queries import COLUMN_TYPES
+
+    if columns is None:
+        return PANEL_AXES[segment]["fields"]
+    return [column for column in columns if COLUMN_TYPES.get(column) in ("numeric", "int")]
+
+
+def strike_panel(dataframe, trade_date, field="ClsPric", symbol=None, expiries=None):
+    """Pivot one trade date of F&O options into a strike x (expiry, option type) DataFrame.
+
+    Parameters:
+        dataframe (DataFrame): Result of ``get_FO_bhavcopy``.
+        trade_date (datetime): Trade date to pivot.
+        field (str): Column holding the values, e.g. 'ClsPric', 'OpnIntrst' or 'TtlTradgVol'.
+        symbol (str): Underlying to pivot; required when ``dataframe`` holds several symbols.
+        expiries (list): Expiry dates to keep. Defaults to every expiry traded on ``trade_date``.
+
+    Returns:
+        DataFrame: Indexed by strike, with ('XpryDt', 'OptnTp') column pairs, NaN where a strike is
+        not listed for an expiry.
+    """
+    present = pd.unique(dataframe["TckrSymb"].astype(object))
+    if symbol is None:
+        if len(present) > 1:
+            raise ValueError(f"Data holds several symbols {list(present)}; pass symbol=...")
+    else:
+        dataframe = dataframe[dataframe["TckrSymb"].astype(object) == symbol]
+
+    dates = pd.to_datetime(dataframe["TradDt"])
+    option_types = dataframe["OptnTp"].astype(object)
+    rows = dataframe[(dates == pd.Timestamp(trade_date)).to_numpy() & option_types.isin(["CE", "PE"]).to_numpy()]
+    expiry_values = pd.to_datetime(rows["XpryDt"])
+    if expiries is not None:
+        selected = expiry_values.isin(pd.to_datetime(list(expiries)))
+        rows, expiry_values = rows[selected], expiry_values[selected]
+
+    strike_codes, strikes = _codes(_as_float(rows["StrkPric"]))
+    pairs = pd.MultiIndex.from_arrays(
+        [expiry_values.to_numpy(), rows["OptnTp"].astype(object).to_numpy()], names=["XpryDt", "OptnTp"]
+    )
+    pair_codes, pair_axis = pd.factorize(pairs, sort=True)
+    array = np.full((len(strikes), len(pair_axis)), np.nan)
+    array[strike_codes, pair_codes] = _as_float(rows[field])
+    columns = pd.MultiIndex.from_tuples(list(pair_axis), names=["XpryDt", "OptnTp"])
+    return pd.DataFrame(array, index=strikes.rename("StrkPric"), columns=columns)
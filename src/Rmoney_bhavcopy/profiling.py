@@ -0,0 +1,196 @@
+"""Stage timings of the retrieval pipeline.
+
+Inside ``with profile() as report:`` every getter call records, for each stage and symbol, the
+elapsed time, the rows handled and the bytes produced (column buffers of the frames built, without
+the Python objects held by object columns; CSV bytes received for ``copy``):
+
+    connect     opening a database connection (``establish_connection``)
+    acquire     borrowing a connection from the client's pool, including waiting for one
+    execute     running the SQL with a cursor (the rows are transferred here)
+    fetch       ``fetchall`` turning the transferred rows into Python tuples
+    copy        ``COPY ... TO STDOUT`` into memory (bytes of CSV received)
+    build       building the DataFrame / Arrow table from the fetched tuples
+    parse       parsing the COPY stream
+    sort        ordering the unified rows by ``ROW_KEYS``
+    assemble    concatenating the per-symbol frames
+    normalize   converting to the compact dtypes
+    convert     building the requested backend or panel
+
+The legacy and UDiFF tables are mapped and merged by one UNION ALL query, so the column mapping
+and merge happen inside ``execute``. ``report.frame()`` returns one row per stage run and
+``report.summary()`` totals per stage. Hooks added with ``add_hook`` (or passed to ``profile``)
+receive every ``StageRecord`` as it completes, e.g. for a metrics exporter; while a hook is
+registered stages are timed outside ``profile`` blocks too.
+
+When no profile is active and no hook is registered, ``stage`` returns a shared no-op object, so
+instrumented code pays one context-variable lookup per stage.
+
+Examples:
+    with profile() as report:
+        data = get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['NIFTY', 'BANKNIFTY'])
+    print(report.summary())
+
+    add_hook(lambda record: statsd.timing(f"bhavcopy.{record.stage}", record.seconds * 1000))
+"""
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import pandas as pd
+
+StageRecord = namedtuple("StageRecord", ["stage", "symbol", "rows", "bytes", "seconds", "started"])
+
+_profile = ContextVar("bhavcopy_profile", default=None)
+_symbol = ContextVar("bhavcopy_symbol", default=None)
+_hooks = []
+
+
+class Profile:
+    """Stage records collected by one ``profile`` block."""
+
+    def __init__(self, hooks=()):
+        self.records = []
+        self.hooks = list(hooks)
+        self.started = time.perf_counter()
+        self.seconds = None
+
+    def add(self, record):
+        self.records.append(record)
+        for hook in self.hooks:
+            hook(record)
+
+    def frame(self):
+        """One row per stage run: stage, symbol, rows, bytes, seconds and start offset in the block."""
+        frame = pd.DataFrame(self.records, columns=StageRecord._fields)
+        frame["started"] = frame["started"] - self.started
+        return frame
+
+    def summary(self):
+        """Calls, rows, bytes and seconds per stage, slowest stage first."""
+        frame = self.frame()
+        groups = frame.groupby("stage", sort=False)
+        summary = pd.DataFrame({
+            "calls": groups.size(),
+            "rows": groups["rows"].sum(min_count=1),
+            "bytes": groups["bytes"].sum(min_count=1),
+            "seconds": groups["seconds"].sum(),
+        })
+        return summary.sort_values("seconds", ascending=False)
+
+    def __repr__(self):
+        total = "running" if self.seconds is None else f"{self.seconds:.3f}s"
+        return f"Profile({len(self.records)} stages, {total})"
+
+
+class _Stage:
+    __slots__ = ("name", "symbol", "rows", "bytes", "profile", "_started", "_frame")
+
+    def __init__(self, name, symbol, profile):
+        self.name = name
+        self.symbol = symbol
+        self.rows = None
+        self.bytes = None
+        self.profile = profile
+        self._frame = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def measure(self, frame):
+        """Record the rows and memory of a result frame or Arrow table when the stage ends."""
+        self._frame = frame
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._started
+        if self._frame is not None:
+            from .backends import memory_size
+
+            # Measured outside the timed block; object columns count their pointers only
+            self.rows, self.bytes = len(self._frame), memory_size(self._frame, deep=False)
+            self._frame = None
+        symbol = self.symbol if self.symbol is not None else _symbol.get()
+        record = StageRecord(self.name, symbol, self.rows, self.bytes, seconds, self._started)
+        if self.profile is not None:
+            self.profile.add(record)
+        for hook in _hooks:
+            hook(record)
+        return False
+
+
+class _NoStage:
+    """Stand-in returned by ``stage`` while profiling is off; attribute writes are ignored."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+    def measure(self, frame):
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+def enabled():
+    """True inside a ``profile`` block or while a hook is registered."""
+    return _profile.get() is not None or bool(_hooks)
+
+
+def stage(name, symbol=None):
+    """Time a ``with`` block as stage ``name``; set ``rows`` and ``bytes`` (or call ``measure(frame)``) on the returned object."""
+    active = _profile.get()
+    if active is None and not _hooks:
+        return _NO_STAGE
+    return _Stage(name, symbol, active)
+
+
+class _SymbolScope:
+    __slots__ = ("symbol", "_token")
+
+    def __init__(self, symbol):
+        self.symbol = symbol if isinstance(symbol, str) or symbol is None else ",".join(map(str, symbol))
+
+    def __enter__(self):
+        self._token = _symbol.set(self.symbol)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _symbol.reset(self._token)
+        return False
+
+
+def symbol_scope(symbol):
+    """Attribute the stages run inside the ``with`` block to ``symbol`` (a symbol or a list of them)."""
+    if not enabled():
+        return _NO_STAGE
+    return _SymbolScope(symbol)
+
+
+@contextmanager
+def profile(hooks=()):
+    """Collect the stage records of the getter calls made inside the block into a ``Profile``."""
+    report = Profile(hooks)
+    token = _profile.set(report)
+    try:
+        yield report
+    finally:
+        _profile.reset(token)
+        report.seconds = time.perf_counter() - report.started
+
+
+def add_hook(hook):
+    """Call ``hook(record)`` with every ``StageRecord`` from now on, inside or outside ``profile`` blocks."""
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    _hooks.remove(hook)
@@ -0,0 +1,431 @@
+"""Table definitions and SQL builders shared by the bhavcopy fetch functions."""
+import re
+
+# Column order of every source table, as returned by ``SELECT *``
+CM_COLUMNS = [
+    "SYMBOL", "SERIES", "OPEN", "HIGH", "LOW", "CLOSE", "LAST",
+    "PREVCLOSE", "TOTTRDQTY", "TOTTRDVAL", "TIMESTAMP", "TOTALTRADES", "ISIN"
+]
+UDIFF_COLUMNS = [
+    "TradDt", "BizDt", "Sgmt", "Src", "FinInstrmTp", "FinInstrmId", "ISIN",
+    "TckrSymb", "SctySrs", "XpryDt", "FininstrmActlXpryDt", "StrkPric", "OptnTp",
+    "FinInstrmNm", "OpnPric", "HghPric", "LwPric", "ClsPric", "LastPric",
+    "PrvsClsgPric", "UndrlygPric", "SttlmPric", "OpnIntrst", "ChngInOpnIntrst",
+    "TtlTradgVol", "TtlTrfVal", "TtlNbOfTxsExctd", "SsnId", "NewBrdLotQty",
+    "Rmks", "Rsvd1", "Rsvd2", "Rsvd3", "Rsvd4"
+]
+FO_CM_COLUMNS = [
+    "INSTRUMENT", "SYMBOL", "EXPIRY_DT", "STRIKE_PR", "OPTION_TYP", "OPEN", "HIGH",
+    "LOW", "CLOSE", "SETTLE_PR", "CONTRACTS", "VAL_INLAKH", "OPEN_INT", "CHG_IN_OI", "TIMESTAMP"
+]
+INDICES_COLUMNS = [
+    "Index Name", "Index Date", "Open Index Value", "High Index Value", "Low Index Value",
+    "Closing Index Value", "Points Change", "Change(%)", "Volume", "Turnover (Rs. Cr.)",
+    "P/E", "P/B", "Div Yield"
+]
+
+# Legacy column name -> UDiFF column name
+COLUMN_MAPPING_CM = {
+    "SYMBOL": "TckrSymb",
+    "SERIES": "SctySrs",
+    "OPEN": "OpnPric",
+    "HIGH": "HghPric",
+    "LOW": "LwPric",
+    "CLOSE": "ClsPric",
+    "LAST": "LastPric",
+    "PREVCLOSE": "PrvsClsgPric",
+    "TOTTRDQTY": "TtlTradgVol",
+    "TOTTRDVAL": "TtlTrfVal",
+    "TIMESTAMP": "TradDt",
+    "TOTALTRADES": "TtlNbOfTxsExctd",
+    "ISIN": "ISIN"
+}
+COLUMN_MAPPING_FO = {
+    "INSTRUMENT": "FinInstrmTp",
+    "SYMBOL": "TckrSymb",
+    "EXPIRY_DT": "XpryDt",
+    "STRIKE_PR": "StrkPric",
+    "OPTION_TYP": "OptnTp",
+    "OPEN": "OpnPric",
+    "HIGH": "HghPric",
+    "LOW": "LwPric",
+    "CLOSE": "ClsPric",
+    "SETTLE_PR": "SttlmPric",
+    "CONTRACTS": "TtlTradgVol",
+    "VAL_INLAKH": "TtlTrfVal",
+    "OPEN_INT": "OpnIntrst",
+    "CHG_IN_OI": "ChngInOpnIntrst",
+    "TIMESTAMP": "TradDt"
+}
+
+# Logical type of every column: "text", "date", "numeric" or "int"
+COLUMN_TYPES = {
+    # bhavcopies_cm
+    "SYMBOL": "text", "SERIES": "text", "OPEN": "numeric", "HIGH": "numeric", "LOW": "numeric",
+    "CLOSE": "numeric", "LAST": "numeric", "PREVCLOSE": "numeric", "TOTTRDQTY": "int",
+    "TOTTRDVAL": "numeric", "TIMESTAMP": "date", "TOTALTRADES": "int", "ISIN": "text",
+    # FO_bhavCopies_CM
+    "INSTRUMENT": "text", "EXPIRY_DT": "date", "STRIKE_PR": "numeric", "OPTION_TYP": "text",
+    "SETTLE_PR": "numeric", "CONTRACTS": "int", "VAL_INLAKH": "numeric", "OPEN_INT": "int",
+    "CHG_IN_OI": "int",
+    # bhavcopies_udiff / FO_Bhavcopies_UDiFF
+    "TradDt": "date", "BizDt": "date", "Sgmt": "text", "Src": "text", "FinInstrmTp": "text",
+    "FinInstrmId": "int", "TckrSymb": "text", "SctySrs": "text", "XpryDt": "date",
+    "FininstrmActlXpryDt": "date", "StrkPric": "numeric", "OptnTp": "text", "FinInstrmNm": "text",
+    "OpnPric": "numeric", "HghPric": "numeric", "LwPric": "numeric", "ClsPric": "numeric",
+    "LastPric": "numeric", "PrvsClsgPric": "numeric", "UndrlygPric": "numeric", "SttlmPric": "numeric",
+    "OpnIntrst": "int", "ChngInOpnIntrst": "int", "TtlTradgVol": "int", "TtlTrfVal": "numeric",
+    "TtlNbOfTxsExctd": "int", "SsnId": "text", "NewBrdLotQty": "int", "Rmks": "text",
+    "Rsvd1": "text", "Rsvd2": "text", "Rsvd3": "text", "Rsvd4": "text",
+    # Indices_bhavCopies
+    "Index Name": "text", "Index Date": "date", "Open Index Value": "numeric",
+    "High Index Value": "numeric", "Low Index Value": "numeric", "Closing Index Value": "numeric",
+    "Points Change": "numeric", "Change(%)": "numeric", "Volume": "int",
+    "Turnover (Rs. Cr.)": "numeric", "P/E": "numeric", "P/B": "numeric", "Div Yield": "numeric",
+}
+
+# SQL type used for each logical type when casting or emitting typed NULLs
+SQL_TYPES = {"text": "text", "date": "date", "numeric": "numeric", "int": "bigint"}
+
+# Per-table filter columns. ``series`` is None for tables without a series column.
+# ``quoted`` tables were created with case-sensitive column names, which must always be quoted.
+TABLES = {
+    "bhavcopies_cm": {
+        "segment": "CM", "date": "timestamp", "symbol": "symbol", "series": "series",
+        "columns": CM_COLUMNS,
+    },
+    "bhavcopies_udiff": {
+        "segment": "CM", "date": "TradDt", "symbol": "TckrSymb", "series": "SctySrs",
+        "columns": UDIFF_COLUMNS,
+    },
+    "FO_bhavCopies_CM": {
+        "segment": "FO", "date": "TIMESTAMP", "symbol": "SYMBOL", "series": None,
+        "columns": FO_CM_COLUMNS,
+        "contract": {"instrument": "INSTRUMENT", "option": "OPTION_TYP", "expiry": "EXPIRY_DT", "strike": "STRIKE_PR"},
+    },
+    "FO_Bhavcopies_UDiFF": {
+        "segment": "FO", "date": "TradDt", "symbol": "TckrSymb", "series": None,
+        "columns": UDIFF_COLUMNS,
+        "contract": {"instrument": "FinInstrmTp", "option": "OptnTp", "expiry": "XpryDt", "strike": "StrkPric"},
+    },
+    "Indices_bhavCopies": {
+        "segment": "Indices", "date": "Index Date", "symbol": "Index Name", "series": None,
+        "columns": INDICES_COLUMNS, "quoted": True,
+    },
+}
+
+# Legacy F&O instrument type -> UDiFF instrument type
+INSTRUMENT_TYPES = {"FUTIDX": "IDF", "OPTIDX": "IDO", "FUTSTK": "STF", "OPTSTK": "STO"}
+
+# UDiFF table, legacy table and legacy -> UDiFF mapping of the segments stored in both formats
+UNIFIED_SEGMENTS = {
+    "CM": ("bhavcopies_udiff", "bhavcopies_cm", COLUMN_MAPPING_CM),
+    "FO": ("FO_Bhavcopies_UDiFF", "FO_bhavCopies_CM", COLUMN_MAPPING_FO),
+}
+# Columns identifying one row per trade date, used to order the unified result client-side
+ROW_KEYS = {
+    "CM": ["TradDt", "TckrSymb", "SctySrs"],
+    "FO": ["TradDt", "TckrSymb", "FinInstrmTp", "XpryDt", "StrkPric", "OptnTp"],
+}
+
+
+def quote_ident(name, always=False):
+    """Quote a column name when it cannot be written as a bare identifier, or ``always``.
+
+    ``%`` is doubled because every query is run with ``%s`` parameters (e.g. "Change(%)").
+    """
+    if not always and name.replace("_", "").isalnum():
+        return name
+    return '"' + name.replace('"', '""').replace("%", "%%") + '"'
+
+
+def resolve_columns(columns, available):
+    """Validate a column projection against ``available``, keeping the caller's order.
+
+    Returns ``available`` when ``columns`` is None.
+    """
+    if columns is None:
+        return list(available)
+    if isinstance(columns, str) or not columns:
+        raise ValueError("Columns must be a non-empty list of column names.")
+    unknown = [column for column in columns if column not in available]
+    if unknown:
+        raise ValueError(f"Unknown columns: {unknown}. Expected names from {list(available)}.")
+    return list(dict.fromkeys(columns))
+
+
+def fo_filters(instruments=None, option_types=None, expiries=None, nearest_expiries=None, strike_range=None, atm_strikes=None):
+    """Validate the F&O contract filters and collect them in a dict, or return None when none is set.
+
+    Parameters:
+        instruments (list): Instrument types in either format, e.g. ['OPTIDX'] or ['IDO'].
+        option_types (list): Option types, e.g. ['CE'].
+        expiries (list): Expiry dates to keep.
+        nearest_expiries (int): Keep the N nearest expiries of each symbol on each trade date.
+        strike_range (tuple): (low, high) strike bounds; either may be None. Keeps option rows only.
+        atm_strikes (int): Keep the at-the-money strike and the k strikes on either side of it, per
+            trade date and expiry. Keeps option rows only.
+    """
+    filters = {}
+    if instruments is not None:
+        if isinstance(instruments, str) or not instruments:
+            raise ValueError("Instruments must be a non-empty list of instrument types.")
+        known = set(INSTRUMENT_TYPES) | set(INSTRUMENT_TYPES.values())
+        unknown = [instrument for instrument in instruments if instrument not in known]
+        if unknown:
+            raise ValueError(f"Unknown instrument types: {unknown}. Expected one of {sorted(known)}.")
+        filters["instruments"] = list(instruments)
+    if option_types is not None:
+        if isinstance(option_types, str) or not option_types:
+            raise ValueError("Option types must be a non-empty list, e.g. ['CE', 'PE'].")
+        filters["option_types"] = list(option_types)
+    if expiries is not None:
+        if isinstance(expiries, str) or not expiries:
+            raise ValueError("Expiries must be a non-empty list of dates.")
+        filters["expiries"] = list(expiries)
+    if nearest_expiries is not None:
+        if not isinstance(nearest_expiries, int) or nearest_expiries < 1:
+            raise ValueError("nearest_expiries must be a positive integer.")
+        filters["nearest_expiries"] = nearest_expiries
+    if strike_range is not None:
+        if len(strike_range) != 2 or all(bound is None for bound in strike_range):
+            raise ValueError("strike_range must be a (low, high) tuple with at least one bound.")
+        filters["strike_range"] = tuple(strike_range)
+    if atm_strikes is not None:
+        if not isinstance(atm_strikes, int) or atm_strikes < 0:
+            raise ValueError("atm_strikes must be a non-negative integer.")
+        filters["atm_strikes"] = atm_strikes
+    return filters or None
+
+
+def _underlying(spec):
+    """SQL expression for the underlying price used to find the at-the-money strike."""
+    if "UndrlygPric" in spec["columns"]:
+        return "UndrlygPric"
+    # The legacy format has no underlying price: use the close of the nearest future that day
+    contract = spec["contract"]
+    is_future = f"left({contract['instrument']}, 3) = 'FUT'"
+    return (
+        f"FIRST_VALUE(CASE WHEN {is_future} THEN CLOSE END) OVER "
+        f"(PARTITION BY {quote_ident(spec['date'])}, {quote_ident(spec['symbol'])} "
+        f"ORDER BY {is_future} DESC, {contract['expiry']})"
+    )
+
+
+def _filtered_source(table_name, spec, where, params, filters, columns):
+    """Apply the ``fo_filters`` to one F&O table.
+
+    Plain filters are added to ``where``. "Nearest expiries" and "ATM ± k" need window functions,
+    so the table is then wrapped in subqueries ranking expiries per trade date and strikes per
+    expiry, and the ranks are filtered in the outer WHERE. The subqueries only carry ``columns``
+    (the table columns the outer SELECT uses) and the contract columns, which keeps the window
+    sorts small.
+
+    Returns:
+        tuple: (source, where, params) to use as ``SELECT ... FROM {source} WHERE {where}``.
+    """
+    if not filters:
+        return table_name, where, params
+    contract = spec.get("contract")
+    if contract is None:
+        raise ValueError(f"F&O filters are not supported for {table_name}.")
+    params = list(params)
+    clauses = []
+    if "instruments" in filters:
+        if table_name == "FO_bhavCopies_CM":
+            reverse = {udiff: legacy for legacy, udiff in INSTRUMENT_TYPES.items()}
+            codes = [reverse.get(instrument, instrument) for instrument in filters["instruments"]]
+        else:
+            codes = [INSTRUMENT_TYPES.get(instrument, instrument) for instrument in filters["instruments"]]
+        clauses.append(f"{contract['instrument']} = ANY(%s)")
+        params.append(list(dict.fromkeys(codes)))
+    if "option_types" in filters:
+        clauses.append(f"{contract['option']} = ANY(%s)")
+        params.append(filters["option_types"])
+    if "expiries" in filters:
+        clauses.append(f"{contract['expiry']} = ANY(%s)")
+        params.append(filters["expiries"])
+    if "strike_range" in filters or "atm_strikes" in filters:
+        clauses.append(f"{contract['option']} IN ('CE', 'PE')")
+    low, high = filters.get("strike_range", (None, None))
+    if low is not None:
+        clauses.append(f"{contract['strike']} >= %s")
+        params.append(low)
+    if high is not None:
+        clauses.append(f"{contract['strike']} <= %s")
+        params.append(high)
+
+    windowed = "nearest_expiries" in filters or "atm_strikes" in filters
+    if not windowed:
+        return table_name, " AND ".join([where] + clauses), params
+
+    date_col, symbol_col = quote_ident(spec["date"]), quote_ident(spec["symbol"])
+    expiry, strike = contract["expiry"], contract["strike"]
+    carried = ", ".join(quote_ident(column) for column in dict.fromkeys(
+        list(columns) + [spec["date"], spec["symbol"]] + list(contract.values())))
+    if "atm_strikes" in filters:
+        # Computed before the plain filters so the legacy futures used as underlying are still visible
+        source = f"(SELECT {carried}, {_underlying(spec)} AS atm_underlying FROM {table_name} WHERE {where}) AS priced"
+        carried = "*"
+    else:
+        source = table_name
+        clauses.insert(0, where)
+    if "nearest_expiries" in filters:
+        # Filtered before the strike windows so they only see the kept expiries
+        source = (
+            f"(SELECT {carried}, DENSE_RANK() OVER (PARTITION BY {date_col}, {symbol_col} ORDER BY {expiry}) AS expiry_rank"
+            f" FROM {source}{' WHERE ' + ' AND '.join(clauses) if clauses else ''}) AS expiry_ranked"
+        )
+        clauses = ["expiry_rank <= %s"]
+        params.append(filters["nearest_expiries"])
+        carried = "*"
+    if "atm_strikes" in filters:
+        chain = f"PARTITION BY {date_col}, {symbol_col}, {expiry}"
+        source = (
+            f"(SELECT {carried}, DENSE_RANK() OVER ({chain} ORDER BY {strike}) AS strike_rank,"
+            f" FIRST_VALUE({strike}) OVER ({chain} ORDER BY ABS({strike} - atm_underlying), {strike}) AS atm_strike"
+            f" FROM {source}{' WHERE ' + ' AND '.join(clauses) if clauses else ''}) AS strike_ranked"
+        )
+        source = (
+            f"(SELECT *, MAX(CASE WHEN {strike} = atm_strike THEN strike_rank END) OVER ({chain}) AS atm_rank"
+            f" FROM {source}) AS chained"
+        )
+        clauses = ["atm_underlying IS NOT NULL", "ABS(strike_rank - atm_rank) <= %s"]
+        params.append(filters["atm_strikes"])
+    return source, " AND ".join(clauses), params
+
+
+def _match(column, value):
+    """Build an equality predicate, using ``= ANY(%s)`` for list values."""
+    if isinstance(value, (list, tuple)):
+        return f"{quote_ident(column)} = ANY(%s)", list(value)
+    return f"{quote_ident(column)} = %s", value
+
+
+def get_table_spec(table_name, segment):
+    """Return the table definition, checking it belongs to ``segment``."""
+    spec = TABLES.get(table_name)
+    if spec is None or spec["segment"] != segment:
+        raise ValueError("Invalid table name provided.")
+    return spec
+
+
+def _where(spec, startdate, enddate, symbol, series):
+    """Build the WHERE clause and its parameters for one table."""
+    date_col = quote_ident(spec["date"])
+    clauses = [f"{date_col} >= %s", f"{date_col} <= %s"]
+    params = [startdate, enddate]
+
+    clause, param = _match(spec["symbol"], symbol)
+    clauses.append(clause)
+    params.append(param)
+
+    if spec["series"] is not None and series is not None:
+        clause, param = _match(spec["series"], series)
+        clauses.append(clause)
+        params.append(param)
+
+    return " AND ".join(clauses), params
+
+
+def build_query(table_name, segment, startdate, enddate, symbol, series=None, columns=None, filters=None):
+    """Build the SELECT for one source table.
+
+    ``symbol`` and ``series`` may each be a single value or a list; lists are
+    matched with ``= ANY(%s)`` so that many symbols are fetched in one round trip.
+    ``columns`` selects a subset of the table's own columns instead of ``SELECT *``.
+    ``filters`` are F&O contract filters from ``fo_filters``.
+
+    Returns:
+        tuple: (query, params, columns)
+    """
+    spec = get_table_spec(table_name, segment)
+    where, params = _where(spec, startdate, enddate, symbol, series)
+    columns = resolve_columns(columns, spec["columns"])
+    source, where, params = _filtered_source(table_name, spec, where, params, filters, columns)
+    if columns == spec["columns"] and source == table_name:
+        return f"SELECT * FROM {table_name} WHERE {where}", tuple(params), columns
+    select = ", ".join(quote_ident(column, spec.get("quoted", False)) for column in columns)
+    query = f"SELECT {select} FROM {source} WHERE {where}"
+    return query, tuple(params), columns
+
+
+def build_union_query(segment, startdate, enddate, symbol, series=None, columns=None, filters=None):
+    """Build one query returning the UDiFF and legacy tables of ``segment`` in the UDiFF format.
+
+    The legacy table's columns are renamed to their UDiFF names with the COLUMN_MAPPING_* dicts,
+    and UDiFF columns the legacy format lacks are filled with typed NULLs, so the database returns
+    a single unified result set. Every column of both tables is cast to its ``COLUMN_TYPES`` type. Rows are not ordered: an ORDER BY over the wide unified rows spills
+    the sort to disk on the server, so callers sort by ``ROW_KEYS`` after fetching when they need to.
+
+    ``columns`` projects the result onto a subset of the UDiFF columns; each one is translated to
+    its legacy name, so both tables only read and send the requested columns. ``filters`` are F&O
+    contract filters from ``fo_filters``, translated to each table's own columns and codes.
+
+    Returns:
+        tuple: (query, params, columns)
+    """
+    if segment not in UNIFIED_SEGMENTS:
+        raise ValueError(f"Invalid segment: {segment}. Expected one of {list(UNIFIED_SEGMENTS)}.")
+    udiff_table, legacy_table, mapping = UNIFIED_SEGMENTS[segment]
+    udiff_spec = get_table_spec(udiff_table, segment)
+    legacy_spec = get_table_spec(legacy_table, segment)
+    reverse_mapping = {udiff: legacy for legacy, udiff in mapping.items()}
+    columns = resolve_columns(columns, UDIFF_COLUMNS)
+
+    udiff_select, legacy_select = [], []
+    for column in columns:
+        sql_type = SQL_TYPES[COLUMN_TYPES[column]]
+        # Both branches are cast, so the result types never depend on the live table definitions
+        udiff_select.append(f"{quote_ident(column)}::{sql_type} AS {quote_ident(column)}")
+        if column in reverse_mapping:
+            legacy_select.append(f"{quote_ident(reverse_mapping[column])}::{sql_type} AS {quote_ident(column)}")
+        else:
+            legacy_select.append(f"NULL::{sql_type} AS {quote_ident(column)}")
+
+    udiff_where, udiff_params = _where(udiff_spec, startdate, enddate, symbol, series)
+    legacy_where, legacy_params = _where(legacy_spec, startdate, enddate, symbol, series)
+    legacy_columns = [reverse_mapping[column] for column in columns if column in reverse_mapping]
+    udiff_source, udiff_where, udiff_params = _filtered_source(udiff_table, udiff_spec, udiff_where, udiff_params, filters, columns)
+    legacy_source, legacy_where, legacy_params = _filtered_source(legacy_table, legacy_spec, legacy_where, legacy_params, filters, legacy_columns)
+
+    query = (
+        f"SELECT {', '.join(udiff_select)} FROM {udiff_source} WHERE {udiff_where}"
+        f" UNION ALL "
+        f"SELECT {', '.join(legacy_select)} FROM {legacy_source} WHERE {legacy_where}"
+    )
+    return query, tuple(udiff_params + legacy_params), columns
+
+
+def build_index_query(table_name, keys, since=None):
+    """Build the query listing the distinct ``keys`` of one table with their first and last trade dates.
+
+    ``keys`` are UDiFF column names (or the table's own names for tables outside
+    ``UNIFIED_SEGMENTS``); legacy tables read the mapped legacy columns. ``since`` limits the scan
+    to trade dates on or after it, for incremental refreshes.
+
+    Returns:
+        tuple: (query, params)
+    """
+    spec = TABLES.get(table_name)
+    if spec is None:
+        raise ValueError("Invalid table name provided.")
+    rename = {}
+    unified = UNIFIED_SEGMENTS.get(spec["segment"])
+    if unified is not None and table_name == unified[1]:
+        rename = {udiff: legacy for legacy, udiff in unified[2].items()}
+    quoted = spec.get("quoted", False)
+    select = ", ".join(quote_ident(rename.get(key, key), quoted) for key in keys)
+    date_col = quote_ident(spec["date"], quoted)
+    query = f"SELECT {select}, MIN({date_col}), MAX({date_col}) FROM {table_name}"
+    params = ()
+    if since is not None:
+        query += f" WHERE {date_col} >= %s"
+        params = (since,)
+    return query + f" GROUP BY {select}", params
+
+
+def to_numbered_params(query):
+    """Rewrite ``%s`` placeholders as ``$1, $2, ...`` for drivers such as asyncpg."""
+    counter = iter(range(1, query.count("%s") + 1))
+    return re.sub(r"%[s%]", lambda m: f"${next(counter)}" if m.group() == "%s" else "%", query)
@@ -0,0 +1,158 @@
+"""In-process LRU cache of getter results.
+
+Dashboards and parameter sweeps repeat the same ``get_*_bhavcopy`` calls many times a minute.
+With ``result_cache=ResultCache()`` the getters keep their (normalized) results in memory, keyed
+on the segment, the set of symbols, the series, the columns and the other options that change
+the rows returned. A call whose date range lies inside a cached one, for the same or fewer columns,
+is answered by slicing the cached frame, so narrowing the range never reaches the database.
+
+Historical bhavcopies do not change, so entries only expire when their range reaches today
+(``ttl`` after they were stored). Memory is bounded by ``max_bytes``; the least recently used
+entries are evicted first.
+
+Examples:
+    results = ResultCache(max_bytes=256 * 2**20, ttl=timedelta(minutes=5))
+    month = get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['TCS'], ['EQ'], result_cache=results)
+    week = get_CM_bhavcopy(datetime(2024,1,8), datetime(2024,1,12), ['TCS'], ['EQ'], result_cache=results)  # from memory
+    results.stats()
+"""
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from . import backends
+from .cache import SEGMENTS
+
+logger = logging.getLogger(__name__)
+
+
+def freeze(value):
+    """Turn lists, tuples and dicts of options into a hashable key part."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class _Entry:
+    __slots__ = ("frame", "symbols", "columns", "size", "expires")
+
+    def __init__(self, frame, symbols, columns, size, expires):
+        self.frame = frame
+        self.symbols = symbols
+        self.columns = columns
+        self.size = size
+        self.expires = expires
+
+
+class ResultCache:
+    """Memory-bounded LRU cache of getter results with a TTL for ranges reaching today.
+
+    Parameters:
+        max_bytes (int): Upper bound on the memory held by cached frames.
+        ttl (timedelta): Lifetime of entries whose date range includes today or later.
+    """
+
+    def __init__(self, max_bytes=512 * 2**20, ttl=timedelta(minutes=5)):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """Return hit, miss and eviction counts and the current size of the cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions, "entries": len(self._entries), "bytes": self._bytes,
+            }
+
+    def clear(self):
+        """Drop every entry; the statistics are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, entry_key):
+        self._bytes -= self._entries.pop(entry_key).size
+
+    def _lookup(self, key, columns, start, end):
+        now = datetime.now()
+        for entry_key in [k for k in reversed(self._entries) if k[0] == key]:
+            entry = self._entries[entry_key]
+            if entry.expires is not None and entry.expires <= now:
+                self._drop(entry_key)
+                continue
+            covers_columns = entry.columns is None or (columns is not None and set(columns) <= entry.columns)
+            if covers_columns and entry_key[1] <= start and end <= entry_key[2]:
+                self._entries.move_to_end(entry_key)
+                return entry
+        return None
+
+    def get(self, segment, key, symbols, columns, start, end):
+        """Return the cached rows of ``symbols`` in [start, end] in ``symbols`` order, or None.
+
+        ``columns`` (None for all) must be held by the entry; they are returned in the cached order.
+        """
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        symbols = tuple(dict.fromkeys(symbols))
+        with self._lock:
+            entry = self._lookup((segment, frozenset(symbols), key), columns, start, end)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        frame = backends.between(entry.frame, SEGMENTS[segment]["date"], start, end)
+        if symbols != entry.symbols:
+            frame = backends.order_by_symbols(frame, SEGMENTS[segment]["keys"][0], list(symbols))
+        return frame
+
+    def put(self, segment, key, symbols, columns, start, end, frame):
+        """Store a result. Failed fetches (frames without the date column, or with errors) are not cached."""
+        if SEGMENTS[segment]["date"] not in backends.column_names(frame) or backends.errors_of(frame):
+            return
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        symbols = tuple(dict.fromkeys(symbols))
+        size = backends.memory_size(frame)
+        if size > self.max_bytes:
+            return
+        expires = datetime.now() + self.ttl if end.date() >= date.today() else None
+        columns = None if columns is None else set(columns)
+        full_key = (segment, frozenset(symbols), key)
+        with self._lock:
+            # Entries inside the new range with no more columns are redundant, unless they outlive it
+            for entry_key in [k for k in self._entries if k[0] == full_key and start <= k[1] and k[2] <= end]:
+                held = self._entries[entry_key]
+                covered = columns is None or (held.columns is not None and held.columns <= columns)
+                if covered and (expires is None or held.expires is not None):
+                    self._drop(entry_key)
+            # A deep copy: without copy-on-write (pandas < 3) the caller's in-place writes would reach the cache
+            stored = frame if backends.is_arrow(frame) else frame.copy()
+            self._entries[(full_key, start, end)] = _Entry(stored, symbols, columns, size, expires)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def fetch(self, segment, key, symbols, columns, start, end, loader):
+        """Return the rows of ``symbols`` in [start, end], calling ``loader()`` on a miss and caching its result.
+
+        ``key`` holds the options other than symbols, columns and dates that change the result.
+        Partial or failed results (see ``put``) are returned without being cached.
+        """
+        frame = self.get(segment, key, symbols, columns, start, end)
+        if frame is not None:
+            logger.info(f"Result cache hit for {len(symbols)} {segment} symbols")
+            return frame
+        frame = loader()
+        self.put(segment, key, symbols, columns, start, end, frame)
+        return frame
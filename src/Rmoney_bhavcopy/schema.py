@@ -0,0 +1,75 @@
+"""Compact dtypes for bhavcopy results.
+
+psycopg2 returns prices as ``Decimal`` objects, dates as ``datetime.date`` objects and every text
+column as Python strings, all held in object columns. ``normalize`` converts a result in one pass
+using the logical types in ``queries.COLUMN_TYPES``:
+
+    numeric  -> float64
+    int      -> Int64 (int64 values; missing values stay <NA>)
+    date     -> datetime64[ns]
+    text     -> category for the low-cardinality columns in ``CATEGORY_COLUMNS``, otherwise unchanged
+
+Examples:
+    data = normalize(raw)    # what the getters do by default
+"""
+import logging
+
+import pandas as pd
+
+from .queries import COLUMN_TYPES
+
+logger = logging.getLogger(__name__)
+
+# pandas dtype used for each logical type
+DTYPES = {"numeric": "float64", "int": "Int64", "date": "datetime64[ns]"}
+
+# Text columns with few distinct values, stored as ``category``
+CATEGORY_COLUMNS = {
+    "SYMBOL", "SERIES", "INSTRUMENT", "OPTION_TYP", "ISIN",
+    "TckrSymb", "SctySrs", "OptnTp", "FinInstrmTp", "Sgmt", "Src", "SsnId",
+    "Index Name",
+}
+
+
+def column_dtype(column):
+    """Return the pandas dtype ``normalize`` gives ``column``, or None to leave it unchanged."""
+    kind = COLUMN_TYPES.get(column)
+    if kind == "text":
+        return "category" if column in CATEGORY_COLUMNS else None
+    return DTYPES.get(kind)
+
+
+def _convert(series, dtype):
+    if dtype == "datetime64[ns]":
+        return pd.to_datetime(series).astype(dtype)
+    if dtype == "Int64":
+        # Decimal and float inputs both go through float64; volumes and OI fit exactly
+        return series.astype("float64").astype(dtype)
+    return series.astype(dtype)
+
+
+def normalize(dataframe):
+    """Return ``dataframe`` with compact dtypes.
+
+    Columns missing from ``COLUMN_TYPES`` are left unchanged, as are ``dataframe.attrs``. Memory use
+    before and after is logged at DEBUG level; it is only measured then, because measuring the
+    object columns of the input takes longer than converting them.
+    """
+    if dataframe.empty and len(dataframe.columns) == 0:
+        return dataframe
+    report = logger.isEnabledFor(logging.DEBUG)
+    if report:
+        before = dataframe.memory_usage(deep=True).sum()
+    columns = {}
+    for column in dataframe.columns:
+        dtype = column_dtype(column)
+        series = dataframe[column]
+        if dtype is not None and series.dtype != dtype:
+            series = _convert(series, dtype)
+        columns[column] = series
+    result = pd.DataFrame(columns, index=dataframe.index)
+    result.attrs = dict(dataframe.attrs)
+    if report:
+        after = result.memory_usage(deep=True).sum()
+        logger.debug(f"Normalized {len(result)} rows: {before / 2**20:.1f} MiB -> {after / 2**20:.1f} MiB")
+    return result
@@ -0,0 +1,312 @@
+"""Local query server in front of the getters, answering in Arrow IPC.
+
+Instead of every notebook opening its own database connections with the credentials of
+``config.py``, one ``QueryServer`` holds a single ``BhavcopyClient`` pool and ``ResultCache`` and
+answers ``get_CM_bhavcopy``, ``get_FO_bhavcopy`` and ``get_indices_bhavcopy`` calls over HTTP.
+Identical requests that arrive while one is being answered wait for that answer instead of
+running the query again. Results are sent as an Arrow IPC stream (failed symbols in the ``errors``
+schema metadata), so they are read without parsing.
+
+A ``RemoteClient`` points the getters at a server: pass it as ``client=`` or make it the default
+client with ``set_default_client``. The getters then send their arguments to the server and apply
+``normalize``, ``output`` and ``backend`` to the answer locally; ``cache``, ``index`` and
+``result_cache`` are left to the server. Functions that borrow database connections themselves
+(``iter_CM_bhavcopy``, ``iter_FO_bhavcopy``, ``ingest`` and ``SymbolIndex.refresh``) are not served
+and raise a ``TypeError`` with a ``RemoteClient``; pass them a ``BhavcopyClient``.
+
+Protocol:
+    POST /query   JSON {"segment": "CM" | "FO" | "Indices", "params": {getter keyword arguments}}
+                  -> 200 Arrow IPC stream, 400 {"error": ...} for invalid arguments
+    GET  /stats   -> JSON request, coalescing and result cache counters
+
+Run with:
+    python -m Rmoney_bhavcopy.server --host 127.0.0.1 --port 8765
+
+Examples:
+    set_default_client(RemoteClient("http://127.0.0.1:8765"))
+    data = get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['TCS'], ['EQ'])
+"""
+import argparse
+import json
+import logging
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import Future
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import backends
+from .Bhavcopy_Reteriver import get_CM_bhavcopy, get_FO_bhavcopy, get_indices_bhavcopy
+from .client import BhavcopyClient
+from .result_cache import ResultCache, freeze
+
+logger = logging.getLogger(__name__)
+
+GETTERS = {"CM": get_CM_bhavcopy, "FO": get_FO_bhavcopy, "Indices": get_indices_bhavcopy}
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+
+class ServerError(Exception):
+    """Raised when the query server cannot answer a request."""
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError("The query server requires pyarrow. Install it with: pip install pyarrow") from e
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot send {type(value).__name__} to the query server")
+
+
+def decode_params(params):
+    """Turn the JSON arguments of a request back into getter arguments."""
+    params = dict(params)
+    for name in ("start_date", "end_date"):
+        if name in params:
+            params[name] = datetime.fromisoformat(params[name])
+    if params.get("expiries") is not None:
+        params["expiries"] = [date.fromisoformat(value[:10]) for value in params["expiries"]]
+    if params.get("strike_range") is not None:
+        params["strike_range"] = tuple(params["strike_range"])
+    return params
+
+
+def to_ipc(table):
+    """Serialize a ``pyarrow.Table`` as an Arrow IPC stream."""
+    import pyarrow as pa
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def from_ipc(payload):
+    """Read a ``pyarrow.Table`` from an Arrow IPC stream."""
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(payload).read_all()
+
+
+class QueryServer:
+    """HTTP server answering getter calls from one connection pool and result cache.
+
+    Parameters:
+        host (str): Address to listen on. Defaults to localhost only.
+        port (int): Port to listen on; 0 picks a free port (see ``url``).
+        client (BhavcopyClient): Client whose pool runs the queries. Defaults to a new client with
+            ``maxconn`` connections built from ``config.conf``.
+        result_cache (ResultCache): Cache shared by all requests. Defaults to a new ``ResultCache``;
+            pass False to disable caching.
+        maxconn (int): Size of the default client's pool.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, client=None, result_cache=None, maxconn=8):
+        _require_pyarrow()
+        self.client = client if client is not None else BhavcopyClient(maxconn=maxconn)
+        self.result_cache = ResultCache() if result_cache is None else (result_cache or None)
+        self.requests = 0
+        self.coalesced = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        """Base URL of the server, for ``RemoteClient``."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stats(self):
+        """Return request and coalescing counts and the result cache statistics."""
+        with self._lock:
+            stats = {"requests": self.requests, "coalesced": self.coalesced, "in_flight": len(self._in_flight)}
+        stats["result_cache"] = self.result_cache.stats() if self.result_cache is not None else None
+        return stats
+
+    def answer(self, segment, params):
+        """Run a getter call for ``params`` (JSON arguments) and return the result as Arrow IPC bytes.
+
+        A call identical to one still running waits for that call's result.
+        """
+        if segment not in GETTERS:
+            raise ValueError(f"Unknown segment {segment!r}. Expected one of {list(GETTERS)}.")
+        key = freeze([segment, params])
+        with self._lock:
+            self.requests += 1
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+        try:
+            table = GETTERS[segment](**decode_params(params), client=self.client, result_cache=self.result_cache, backend="arrow")
+            future.set_result(to_ipc(table))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return future.result()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, body, content_type="application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path != "/stats":
+                    return self._send(404, json.dumps({"error": f"No such path: {self.path}"}).encode())
+                self._send(200, json.dumps(server.stats()).encode())
+
+            def do_POST(self):
+                if self.path != "/query":
+                    return self._send(404, json.dumps({"error": f"No such path: {self.path}"}).encode())
+                try:
+                    request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                    body = server.answer(request["segment"], request.get("params", {}))
+                except (ValueError, KeyError, TypeError) as e:
+                    return self._send(400, json.dumps({"error": str(e)}).encode())
+                except Exception as e:
+                    logger.error(f"Error answering query: {e}")
+                    return self._send(500, json.dumps({"error": str(e)}).encode())
+                self._send(200, body, ARROW_STREAM)
+
+            def log_message(self, format, *args):
+                logger.debug(f"{self.address_string()} {format % args}")
+
+        return Handler
+
+    def serve_forever(self):
+        """Answer requests until ``close`` is called."""
+        logger.info(f"Query server listening on {self.url}")
+        self.httpd.serve_forever()
+
+    def start(self):
+        """Answer requests on a background thread; returns the server."""
+        self._thread = threading.Thread(target=self.serve_forever, name="bhavcopy-query-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        """Stop the server and close its connection pool."""
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+        self.client.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class RemoteClient:
+    """Client sending getter calls to a ``QueryServer`` instead of the database.
+
+    Can be passed as ``client=`` to the getters (and to everything built on them, such as
+    ``get_market_snapshot``), or installed with ``set_default_client``. The streaming getters,
+    ``ingest`` and ``SymbolIndex.refresh`` need a connection pool and raise a ``TypeError`` with it.
+
+    Parameters:
+        url (str): Base URL of the server, e.g. "http://127.0.0.1:8765".
+        timeout (float): Seconds to wait for an answer. None waits indefinitely.
+    """
+
+    def __init__(self, url, timeout=None):
+        _require_pyarrow()
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, path, body=None):
+        data = None if body is None else json.dumps(body, default=_json_default).encode()
+        request = urllib.request.Request(self.url + path, data=data, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            message = json.loads(e.read() or b"{}").get("error", e.reason)
+            if e.code == 400:
+                raise ValueError(message) from None
+            raise ServerError(f"Query server error {e.code}: {message}") from None
+        except urllib.error.URLError as e:
+            raise ServerError(f"Cannot reach query server at {self.url}: {e.reason}") from None
+
+    def fetch(self, segment, params, backend="pandas"):
+        """Send a getter call and return its rows: a ``pyarrow.Table``, or a DataFrame for backend="pandas"."""
+        table = from_ipc(self._request("/query", {"segment": segment, "params": params}))
+        if backend == "pandas":
+            # Plain columns, so ``normalize`` builds the same categories as for a local call
+            import pyarrow as pa
+
+            columns = [column.cast(column.type.value_type) if pa.types.is_dictionary(column.type) else column for column in table.columns]
+            frame = pa.table(columns, names=table.column_names).to_pandas()
+            return backends.with_errors(frame, backends.errors_of(table))
+        return table
+
+    def stats(self):
+        """Return the server's ``QueryServer.stats``."""
+        return json.loads(self._request("/stats"))
+
+    def close(self):
+        """Nothing to release; present so the client can replace a ``BhavcopyClient``."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def get_CM_bhavcopy(self, *args, **kwargs):
+        """Same as ``Bhavcopy_Reteriver.get_CM_bhavcopy`` answered by the server."""
+        return get_CM_bhavcopy(*args, client=self, **kwargs)
+
+    def get_FO_bhavcopy(self, *args, **kwargs):
+        """Same as ``Bhavcopy_Reteriver.get_FO_bhavcopy`` answered by the server."""
+        return get_FO_bhavcopy(*args, client=self, **kwargs)
+
+    def get_indices_bhavcopy(self, *args, **kwargs):
+        """Same as ``Bhavcopy_Reteriver.get_indices_bhavcopy`` answered by the server."""
+        return get_indices_bhavcopy(*args, client=self, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the bhavcopy getters over HTTP in Arrow IPC format.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--maxconn", type=int, default=8, help="database connections in the pool")
+    parser.add_argument("--cache-mb", type=int, default=512, help="result cache size; 0 disables it")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    result_cache = ResultCache(max_bytes=args.cache_mb * 2**20) if args.cache_mb else False
+    server = QueryServer(args.host, args.port, result_cache=result_cache, maxconn=args.maxconn)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
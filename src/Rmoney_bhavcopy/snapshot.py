@@ -0,0 +1,185 @@
+"""One frame per day and symbol combining the CM, F&O and Indices segments.
+
+``get_market_snapshot`` answers "stock close, its front-month future, its at-the-money options
+and the index close, per day" with one call. The parts are fetched concurrently, each with one
+batched query reading only the columns it needs, and with the contract selection done by the
+database (``fo_filters``):
+
+    CM          ``cm_fields`` of the first of ``series`` the symbol trades in
+    FUT_*       ``future_fields`` of the nearest future, so the series rolls to the next month
+                when the front month expires (``FUT_XpryDt`` shows the contract used)
+    CE_*, PE_*  ``option_fields`` of the at-the-money call and put of the nearest option expiry
+                (``OPT_XpryDt``, ``ATM_StrkPric``)
+    indices     ``index_field`` of each of ``indices``, one column per index
+
+All parts are placed on one trading calendar, the sorted union of their trade dates, by computing
+each row's (date, symbol) position and taking the values straight into the output columns, so no
+pandas merge is involved. Rows of days on which a symbol has no data in any part are dropped.
+
+Examples:
+    snapshot = get_market_snapshot(datetime(2024,1,1), datetime(2024,3,31), ['RELIANCE', 'TCS'], indices=['Nifty 50'])
+    snapshot[["TradDt", "TckrSymb", "ClsPric", "FUT_ClsPric", "CE_ClsPric", "PE_ClsPric", "Nifty 50"]]
+"""
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .Bhavcopy_Reteriver import get_CM_bhavcopy, get_FO_bhavcopy, get_indices_bhavcopy, resolve_client
+from .options import FUTURE_TYPES
+
+logger = logging.getLogger(__name__)
+
+OPTION_TYPES = ["IDO", "STO", "OPTIDX", "OPTSTK"]
+
+
+def _positions(values, axis):
+    """Position of each value on ``axis`` (-1 when absent)."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(object)
+    return pd.Index(axis).get_indexer(values.to_numpy())
+
+
+def _take(frame, rows, fields, prefix=""):
+    """Columns of ``fields`` laid out by ``rows`` (row of ``frame`` for each output row, -1 for none)."""
+    return {
+        f"{prefix}{field}": pd.api.extensions.take(frame[field].array, rows, allow_fill=True)
+        for field in fields
+    }
+
+
+def _layout(frame, calendar, symbols):
+    """Row of ``frame`` for each (date, symbol) cell of the output, the first row winning on duplicates."""
+    cells = _positions(frame["TradDt"], calendar) * len(symbols) + _positions(frame["TckrSymb"], symbols)
+    rows = np.full(len(calendar) * len(symbols), -1, dtype="int64")
+    # Assigned in reverse so the first row of each cell is written last
+    rows[cells[::-1]] = np.arange(len(frame) - 1, -1, -1)
+    return rows
+
+
+def _failed_part(columns):
+    """Empty stand-in for a part whose getter failed as a whole (a frame without columns)."""
+    return pd.DataFrame({column: pd.Series(dtype="float64") for column in columns})
+
+
+def get_market_snapshot(start_date, end_date, symbols, indices=None, series=None, cm_fields=None,
+                        future_fields=("ClsPric", "OpnIntrst"), option_fields=("ClsPric", "OpnIntrst"),
+                        index_field="Closing Index Value", client=None):
+    """Get CM, front-month future, at-the-money option and index data aligned per day and symbol.
+
+    Parameters:
+        start_date (datetime): The starting date for the data retrieval.
+        end_date (datetime): The ending date for the data retrieval.
+        symbols (list): Symbols (e.g. ['RELIANCE', 'TCS']); each is looked up in the CM and F&O segments.
+        indices (list): Index names (e.g. ['Nifty 50']) added as one column each, or None.
+        series (list): CM series in order of preference; a symbol trading in several on a day keeps
+            the first. Defaults to ['EQ'].
+        cm_fields (list): CM columns to include, or an empty list to skip the CM segment. Defaults to ['ClsPric'].
+        future_fields (list): Columns of the front-month future, prefixed with "FUT_", or an empty list to skip futures.
+        option_fields (list): Columns of the at-the-money call and put, prefixed with "CE_" and "PE_",
+            or an empty list to skip options.
+        index_field (str): Column of the Indices segment used for the index columns.
+        client (BhavcopyClient): Client whose connection pool is used. Defaults to the shared default client.
+
+    Returns:
+        DataFrame: One row per trade date and symbol with data, ordered by date then ``symbols``
+        order: TradDt, TckrSymb, then the CM fields, FUT_XpryDt and the FUT_ fields, OPT_XpryDt,
+        ATM_StrkPric and the CE_/PE_ fields, and the index columns. ``attrs["errors"]`` holds the
+        failures of each part, keyed "<part>:<symbol>"; the columns of a part that failed as a whole are NaN.
+
+    Examples:
+        snapshot = get_market_snapshot(datetime(2024,1,1), datetime(2024,1,31), ['TCS'], indices=['Nifty 50'],
+                                       cm_fields=['ClsPric', 'TtlTradgVol'], future_fields=['ClsPric'])
+    """
+    if start_date > end_date:
+        raise ValueError("Start date cannot be after end date.")
+    if not symbols and not indices:
+        raise ValueError("Expected symbols or indices.")
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols or []))
+    series = ["EQ"] if series is None else list(series)
+    cm_fields = ["ClsPric"] if cm_fields is None else list(cm_fields)
+    client = resolve_client(client)
+
+    parts, wanted = {}, {}
+    if symbols and cm_fields:
+        wanted["CM"] = list(dict.fromkeys(["TradDt", "TckrSymb", "SctySrs", *cm_fields]))
+        parts["CM"] = lambda: get_CM_bhavcopy(
+            start_date, end_date, symbols, series, batched=True, client=client, columns=wanted["CM"],
+        )
+    if symbols and future_fields:
+        wanted["FUT"] = list(dict.fromkeys(["TradDt", "TckrSymb", "XpryDt", *future_fields]))
+        parts["FUT"] = lambda: get_FO_bhavcopy(
+            start_date, end_date, symbols, batched=True, client=client, instruments=FUTURE_TYPES, nearest_expiries=1,
+            columns=wanted["FUT"],
+        )
+    if symbols and option_fields:
+        wanted["OPT"] = list(dict.fromkeys(["TradDt", "TckrSymb", "XpryDt", "StrkPric", "OptnTp", *option_fields]))
+        parts["OPT"] = lambda: get_FO_bhavcopy(
+            start_date, end_date, symbols, batched=True, client=client, instruments=OPTION_TYPES, nearest_expiries=1,
+            atm_strikes=0, columns=wanted["OPT"],
+        )
+    if indices:
+        wanted["Indices"] = ["Index Date", "Index Name", index_field]
+        parts["Indices"] = lambda: get_indices_bhavcopy(
+            start_date, end_date, list(indices), batched=True, client=client, columns=wanted["Indices"],
+        )
+    with ThreadPoolExecutor(max_workers=len(parts)) as executor:
+        futures = {name: executor.submit(contextvars.copy_context().run, fetch) for name, fetch in parts.items()}
+        frames = {name: future.result() for name, future in futures.items()}
+
+    errors = {f"{name}:{key}": message for name, frame in frames.items() for key, message in frame.attrs.get("errors", {}).items()}
+    for name, frame in frames.items():
+        # A getter that failed as a whole returns a frame without columns; its part is left empty
+        if wanted[name][0] not in frame.columns:
+            frames[name] = _failed_part(wanted[name])
+    if "Indices" in frames:
+        frames["Indices"] = frames["Indices"].rename(columns={"Index Date": "TradDt"})
+    dates = [frame["TradDt"].to_numpy(dtype="datetime64[ns]") for frame in frames.values() if len(frame)]
+    calendar = np.unique(np.concatenate(dates)) if dates else np.array([], dtype="datetime64[ns]")
+    columns = {}
+    present = np.zeros(len(calendar) * len(symbols), dtype=bool)
+    if "CM" in frames:
+        cm = frames["CM"]
+        if len(series) > 1:
+            preference = _positions(cm["SctySrs"], list(series))
+            cm = cm.take(np.argsort(preference, kind="stable"))
+        rows = _layout(cm, calendar, symbols)
+        columns.update(_take(cm, rows, cm_fields))
+        present |= rows >= 0
+    if "FUT" in frames:
+        rows = _layout(frames["FUT"], calendar, symbols)
+        columns.update(_take(frames["FUT"], rows, ["XpryDt", *future_fields], "FUT_"))
+        present |= rows >= 0
+    if "OPT" in frames:
+        options = frames["OPT"]
+        rows = _layout(options, calendar, symbols)
+        columns["OPT_XpryDt"] = pd.api.extensions.take(options["XpryDt"].array, rows, allow_fill=True)
+        columns["ATM_StrkPric"] = pd.api.extensions.take(options["StrkPric"].array, rows, allow_fill=True)
+        for option_type in ("CE", "PE"):
+            chosen = options[(options["OptnTp"] == option_type).to_numpy()]
+            columns.update(_take(chosen, _layout(chosen, calendar, symbols), option_fields, f"{option_type}_"))
+        present |= rows >= 0
+
+    if "Indices" in frames:
+        index_data = frames["Indices"]
+        for name in dict.fromkeys(indices):
+            chosen = index_data[(index_data["Index Name"] == name).to_numpy()]
+            by_date = np.full(len(calendar), -1, dtype="int64")
+            by_date[_positions(chosen["TradDt"], calendar)[::-1]] = np.arange(len(chosen) - 1, -1, -1)
+            rows = np.repeat(by_date, len(symbols)) if symbols else by_date
+            columns[name] = pd.api.extensions.take(chosen[index_field].array, rows, allow_fill=True)
+
+    if not symbols:
+        result = pd.DataFrame({"TradDt": calendar, **columns})
+        result.attrs["errors"] = errors
+        return result
+    result = pd.DataFrame({
+        "TradDt": np.repeat(calendar, len(symbols)),
+        "TckrSymb": pd.Categorical.from_codes(np.tile(np.arange(len(symbols)), len(calendar)), categories=symbols),
+        **columns,
+    })
+    result = result[present].reset_index(drop=True)
+    result.attrs["errors"] = errors
+    return result
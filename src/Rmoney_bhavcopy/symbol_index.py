@@ -0,0 +1,279 @@
+"""Index of the symbols, series, ISINs and contracts held in the bhavcopy tables.
+
+One row per contract with its first and last trade date:
+
+    CM       TckrSymb, SctySrs, ISIN, FirstTradDt, LastTradDt
+    FO       TckrSymb, FinInstrmTp, XpryDt, FirstTradDt, LastTradDt
+    Indices  Index Name, FirstTradDt, LastTradDt
+
+It is built with one GROUP BY query per source table (UDiFF and legacy, legacy instrument types
+translated to UDiFF codes), so questions such as "which symbols trade in series GB" or "which
+BANKNIFTY expiries traded in March 2023" are answered without fetching bhavcopy rows.
+
+``refresh`` is incremental: each table is only scanned from its last indexed trade date (less
+``refresh_days``, to pick up late corrections) and the result is merged into the index. With a
+``root`` directory the index is kept on disk between sessions.
+
+The getters accept ``index=``: unknown symbols then raise a ``ValueError`` naming the closest
+known symbols, and symbols known not to trade in the requested range are not queried. A getter
+only refreshes the segment it reads, and only when that segment was never indexed or is older than
+``max_age``; the first build scans the segment's whole tables, so call ``refresh()`` ahead of
+latency-sensitive calls.
+
+Layout::
+
+    <root>/<segment>.parquet   one file per segment
+    <root>/_state.json         last indexed trade date per table, time of the last refresh per segment
+
+Examples:
+    index = SymbolIndex("~/.rmoney_bhavcopy/index")
+    index.refresh()
+    gold_bonds = index.symbols("CM", series=['GB'])
+    expiries = index.expiries('BANKNIFTY', datetime(2023,3,1), datetime(2023,3,31))
+    data = get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['TCS', 'HDFCBAK'], ['EQ'], index=index)
+    # ValueError: Unknown CM symbols: 'HDFCBAK' (did you mean HDFCBANK?)
+"""
+import difflib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from .queries import INSTRUMENT_TYPES, UNIFIED_SEGMENTS, build_index_query
+
+logger = logging.getLogger(__name__)
+
+# Key columns and source tables of each segment
+INDEX_SEGMENTS = {
+    "CM": {"keys": ["TckrSymb", "SctySrs", "ISIN"], "tables": list(UNIFIED_SEGMENTS["CM"][:2])},
+    "FO": {"keys": ["TckrSymb", "FinInstrmTp", "XpryDt"], "tables": list(UNIFIED_SEGMENTS["FO"][:2])},
+    "Indices": {"keys": ["Index Name"], "tables": ["Indices_bhavCopies"]},
+}
+DATES = ["FirstTradDt", "LastTradDt"]
+
+
+def _segment(segment):
+    if segment not in INDEX_SEGMENTS:
+        raise ValueError(f"Invalid segment: {segment}. Expected one of {list(INDEX_SEGMENTS)}.")
+    return INDEX_SEGMENTS[segment]
+
+
+def _timestamp(value):
+    return None if value is None else pd.Timestamp(value)
+
+
+class SymbolIndex:
+    """Contracts of every segment with their first and last trade dates.
+
+    Parameters:
+        root (str): Directory the index is kept in. None keeps it in memory only.
+        refresh_days (int): Trade dates within this many days of the last indexed one are scanned
+            again on refresh.
+        max_age (timedelta): ``ensure`` refreshes a segment when its last refresh is older than this.
+
+    Attributes:
+        refreshed_at (dict): Segment -> time of its last refresh.
+    """
+
+    def __init__(self, root=None, refresh_days=3, max_age=timedelta(hours=6)):
+        self.root = None
+        if root is not None:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as e:
+                raise ImportError("SymbolIndex with a root directory requires pyarrow. Install it with: pip install pyarrow") from e
+            self.root = os.path.abspath(os.path.expanduser(root))
+        self.refresh_days = refresh_days
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._frames = {}
+        self.watermarks = {}
+        self.refreshed_at = {}
+        if self.root is not None:
+            self._load()
+
+    def _empty(self, segment):
+        columns = _segment(segment)["keys"] + DATES
+        return pd.DataFrame({column: pd.Series(dtype="datetime64[ns]" if column in DATES or column == "XpryDt" else object) for column in columns})
+
+    def _load(self):
+        path = os.path.join(self.root, "_state.json")
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            state = json.load(f)
+        self.watermarks = state["watermarks"]
+        refreshed_at = state["refreshed_at"]
+        if isinstance(refreshed_at, str):
+            # State written before refreshes were tracked per segment
+            refreshed_at = {segment: refreshed_at for segment in INDEX_SEGMENTS}
+        self.refreshed_at = {segment: datetime.fromisoformat(value) for segment, value in refreshed_at.items()}
+        for segment in INDEX_SEGMENTS:
+            file = os.path.join(self.root, f"{segment}.parquet")
+            if os.path.exists(file):
+                self._frames[segment] = pd.read_parquet(file)
+
+    def _save(self):
+        os.makedirs(self.root, exist_ok=True)
+        for segment, frame in self._frames.items():
+            path = os.path.join(self.root, f"{segment}.parquet")
+            frame.to_parquet(path + ".tmp", index=False)
+            os.replace(path + ".tmp", path)
+        path = os.path.join(self.root, "_state.json")
+        with open(path + ".tmp", "w") as f:
+            refreshed_at = {segment: value.isoformat() for segment, value in self.refreshed_at.items()}
+            json.dump({"watermarks": self.watermarks, "refreshed_at": refreshed_at}, f)
+        os.replace(path + ".tmp", path)
+
+    def contracts(self, segment="CM"):
+        """Return the index rows of ``segment`` as a DataFrame."""
+        _segment(segment)
+        with self._lock:
+            return self._frames.get(segment, self._empty(segment)).copy()
+
+    def refresh(self, client=None, full=False, segments=None):
+        """Scan the source tables for trade dates after the indexed ones and merge them in.
+
+        Parameters:
+            client (BhavcopyClient): Client whose connection pool is used. Defaults to the shared default client.
+            full (bool): Rebuild the index from every row instead of refreshing it incrementally.
+            segments (list): Segments to refresh, e.g. ['CM']. Defaults to all of them.
+        """
+        from .Bhavcopy_Reteriver import pool_client, run_query
+
+        segments = list(INDEX_SEGMENTS) if segments is None else segments
+        for segment in segments:
+            _segment(segment)
+        client = pool_client(client, "SymbolIndex.refresh")
+        with self._lock:
+            for segment in segments:
+                spec = INDEX_SEGMENTS[segment]
+                if full:
+                    self._frames.pop(segment, None)
+                    for table in spec["tables"]:
+                        self.watermarks.pop(table, None)
+                keys = spec["keys"]
+                parts = [self._frames.get(segment, self._empty(segment))]
+                for table in spec["tables"]:
+                    since = self.watermarks.get(table)
+                    if since is not None:
+                        since = (pd.Timestamp(since) - timedelta(days=self.refresh_days)).date()
+                    query, params = build_index_query(table, keys, since)
+                    logger.info(f"Indexing {table} from {since or 'the first trade date'}")
+                    with client.connection() as conn:
+                        rows = run_query(conn, query, params, keys + DATES)
+                    if rows.empty:
+                        continue
+                    self.watermarks[table] = pd.Timestamp(rows["LastTradDt"].max()).date().isoformat()
+                    parts.append(rows)
+                self._frames[segment] = self._merge(segment, parts)
+                self.refreshed_at[segment] = datetime.now()
+            if self.root is not None:
+                self._save()
+
+    def _merge(self, segment, parts):
+        keys = _segment(segment)["keys"]
+        frame = pd.concat([part for part in parts if not part.empty] or [self._empty(segment)], ignore_index=True)
+        for column in DATES + (["XpryDt"] if "XpryDt" in keys else []):
+            frame[column] = pd.to_datetime(frame[column]).astype("datetime64[ns]")
+        if "FinInstrmTp" in keys:
+            frame["FinInstrmTp"] = frame["FinInstrmTp"].replace(INSTRUMENT_TYPES)
+        frame = frame.groupby(keys, dropna=False, sort=True).agg(FirstTradDt=("FirstTradDt", "min"), LastTradDt=("LastTradDt", "max"))
+        return frame.reset_index()
+
+    def ensure(self, client=None, segments=None):
+        """Refresh the ``segments`` (default all) that were never indexed or were refreshed longer than ``max_age`` ago."""
+        now = datetime.now()
+        stale = [
+            segment for segment in (list(INDEX_SEGMENTS) if segments is None else segments)
+            if segment not in self.refreshed_at or now - self.refreshed_at[segment] > self.max_age
+        ]
+        if stale:
+            self.refresh(client, segments=stale)
+
+    def _traded(self, frame, start_date, end_date):
+        """Rows of ``frame`` whose first and last trade dates overlap [start_date, end_date]."""
+        mask = pd.Series(True, index=frame.index)
+        if start_date is not None:
+            mask &= frame["LastTradDt"] >= _timestamp(start_date)
+        if end_date is not None:
+            mask &= frame["FirstTradDt"] <= _timestamp(end_date)
+        return frame[mask]
+
+    def symbols(self, segment="CM", series=None, start_date=None, end_date=None, instruments=None):
+        """Sorted symbols of ``segment`` traded between ``start_date`` and ``end_date``.
+
+        ``series`` (CM) and ``instruments`` (FO, either format) restrict the contracts considered.
+        Trading is judged from each contract's first and last trade date.
+        """
+        frame = self._traded(self.contracts(segment), start_date, end_date)
+        if series is not None:
+            frame = frame[frame["SctySrs"].isin(series)]
+        if instruments is not None:
+            frame = frame[frame["FinInstrmTp"].isin([INSTRUMENT_TYPES.get(i, i) for i in instruments])]
+        return sorted(frame[_segment(segment)["keys"][0]].dropna().unique())
+
+    def expiries(self, symbol, start_date=None, end_date=None, instruments=None):
+        """Sorted expiry dates of the ``symbol`` F&O contracts traded between ``start_date`` and ``end_date``."""
+        frame = self._traded(self.contracts("FO"), start_date, end_date)
+        frame = frame[frame["TckrSymb"] == symbol.upper()]
+        if instruments is not None:
+            frame = frame[frame["FinInstrmTp"].isin([INSTRUMENT_TYPES.get(i, i) for i in instruments])]
+        return [value.date() for value in sorted(frame["XpryDt"].dropna().unique())]
+
+    def isin(self, symbol, series=None):
+        """ISIN of a CM symbol (the most recently traded one), or None when it is unknown."""
+        frame = self.contracts("CM")
+        frame = frame[(frame["TckrSymb"] == symbol.upper()) & frame["ISIN"].notna() & (frame["ISIN"] != "")]
+        if series is not None:
+            frame = frame[frame["SctySrs"].isin(series)]
+        if frame.empty:
+            return None
+        return frame.sort_values("LastTradDt")["ISIN"].iloc[-1]
+
+    def suggest(self, segment, symbol, n=3):
+        """Known symbols of ``segment`` closest to ``symbol``."""
+        return difflib.get_close_matches(symbol, self.symbols(segment), n=n)
+
+    def check(self, segment, symbols, start_date=None, end_date=None, series=None, client=None):
+        """Validate ``symbols`` for a getter call and drop those known to have no rows in the range.
+
+        ``segment`` is refreshed first when it was never indexed or is older than ``max_age``;
+        the other segments are left alone. A symbol is only dropped
+        when the range ends on or before the last indexed trade date, as later days may hold rows
+        the index has not seen yet.
+
+        Returns:
+            list: ``symbols``, in order, without the ones that would return nothing.
+
+        Raises:
+            ValueError: For symbols the index has never seen, with the closest known ones.
+        """
+        self.ensure(client, [segment])
+        frame = self.contracts(segment)
+        symbol_col = _segment(segment)["keys"][0]
+        known = set(frame[symbol_col].dropna())
+        unknown = [symbol for symbol in dict.fromkeys(symbols) if symbol not in known]
+        if unknown:
+            hints = []
+            for symbol in unknown:
+                matches = self.suggest(segment, symbol)
+                hints.append(f"{symbol!r} (did you mean {', '.join(matches)}?)" if matches else repr(symbol))
+            raise ValueError(f"Unknown {segment} symbols: {'; '.join(hints)}")
+
+        last_indexed = frame["LastTradDt"].max()
+        if end_date is None or pd.isna(last_indexed) or _timestamp(end_date) > last_indexed:
+            # Rows after the last indexed date may exist for any symbol listed by then
+            active = self._traded(frame, None, end_date)
+        else:
+            active = self._traded(frame, start_date, end_date)
+        if series is not None and "SctySrs" in active.columns:
+            active = active[active["SctySrs"].isin(series)]
+        active = set(active[symbol_col])
+        skipped = [symbol for symbol in symbols if symbol not in active]
+        if skipped:
+            logger.info(f"Skipping {segment} symbols without rows in the requested range: {skipped}")
+        return [symbol for symbol in symbols if symbol in active]
@@ -0,0 +1,254 @@
+"""Incremental "since last sync" deltas of bhavcopy data for downstream stores.
+
+``DeltaSync`` keeps, in a JSON file, a watermark for every segment and symbol (per series for CM):
+the last trade date already handed downstream. ``sync`` fetches each symbol from a little before its
+watermark with the batched getters, whose ``date >= %s AND date <= %s`` range predicates use the
+(symbol, date) indexes, and returns only:
+
+    new rows        trade dates after the watermark
+    corrections     every row of an already synced day within ``lookback_days`` of the watermark
+                    whose checksum changed (late or corrected files), listed in
+                    ``attrs["corrections"]``; a day that disappeared is listed without rows
+
+The checksum of a day is the number of its rows and the wrapping sum of the pandas hashes of each
+row, so it does not depend on row order. Checksums are kept for the days within ``lookback_days``
+of the watermark; they cover the columns fetched, so keep ``columns`` the same between syncs.
+
+A key whose fetch failed (listed in ``attrs["errors"]``) is left as it was, to be synced again next time.
+By default ``sync`` commits the new watermarks before returning the delta (after writing the
+Parquet part file with ``parquet_dir``), so a delta the caller has not stored yet is lost if the
+process dies. For at-least-once delivery pass ``commit=False`` and call ``commit()`` once the
+delta is stored.
+
+Layout of ``parquet_dir``::
+
+    <parquet_dir>/<segment>/delta-<YYYYMMDDTHHMMSSffffff>.parquet    one file per sync
+
+Readers keep, for every symbol and trade date, the rows of the latest file holding that day.
+
+Examples:
+    state = DeltaSync("~/.rmoney_bhavcopy/sync.json", lookback_days=7)
+    delta = state.sync("CM", ['TCS', 'INFY'], series=['EQ'], parquet_dir="/data/feature_store/bhavcopy")
+    delta.attrs["corrections"]    # {"TCS|EQ": ["2024-07-30"]}
+"""
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .Bhavcopy_Reteriver import get_CM_bhavcopy, get_FO_bhavcopy, get_indices_bhavcopy, with_columns
+from .cache import SEGMENTS, to_date
+
+logger = logging.getLogger(__name__)
+
+
+def key_name(key):
+    """String form of a watermark key tuple, as stored in the state file."""
+    return "|".join(key)
+
+
+def day_checksums(frame, date_col, key_cols):
+    """Return a DataFrame of ``key_cols``, "day" and "checksum" (row count and hash sum) for ``frame``."""
+    days = pd.to_datetime(frame[date_col]).dt.normalize()
+    hashes = np.zeros(len(frame), dtype="uint64")
+    with np.errstate(over="ignore"):
+        for name in frame.columns:
+            # Nulls hash the same whatever dtype a column with missing values was read as
+            column = frame[name]
+            values = pd.util.hash_pandas_object(column, index=False).to_numpy()
+            hashes = hashes * np.uint64(1000003) + np.where(column.isna().to_numpy(), np.uint64(0), values)
+    groups = frame[key_cols].astype(object).assign(day=days.to_numpy())
+    codes, uniques = pd.factorize(pd.MultiIndex.from_frame(groups))
+    sums = np.zeros(len(uniques), dtype="uint64")
+    np.add.at(sums, codes, hashes)
+    counts = np.bincount(codes, minlength=len(uniques))
+    checksums = [f"{count}:{total:016x}" for count, total in zip(counts, sums)]
+    return uniques.to_frame(index=False, name=[*key_cols, "day"]).assign(checksum=checksums)
+
+
+class DeltaSync:
+    """Persisted per-segment, per-symbol watermarks and recent-day checksums.
+
+    Parameters:
+        path (str): JSON file holding the state; created on the first commit.
+        lookback_days (int): Calendar days before the watermark that are fetched again on every
+            sync and compared with their stored checksums to find late corrections.
+    """
+
+    def __init__(self, path, lookback_days=7):
+        if lookback_days < 0:
+            raise ValueError("lookback_days cannot be negative.")
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.lookback_days = lookback_days
+        self._lock = threading.RLock()
+        self._pending = {}
+        self.state = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.state = json.load(f)
+
+    def watermark(self, segment, key):
+        """Return the last synced trade date of ``key`` (a tuple of the segment's key values), or None."""
+        entry = self.state.get(segment, {}).get(key_name(key))
+        return date.fromisoformat(entry["watermark"]) if entry else None
+
+    def commit(self):
+        """Store the watermarks and checksums of the syncs made with ``commit=False``."""
+        with self._lock:
+            for segment, entries in self._pending.items():
+                self.state.setdefault(segment, {}).update(entries)
+            self._pending = {}
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.state, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+
+    def _keys(self, segment, symbols, series):
+        if segment == "CM":
+            if not series or not isinstance(series, list):
+                raise ValueError("Series must be a non-empty list of strings.")
+            return [(symbol.upper(), s) for symbol in dict.fromkeys(symbols) for s in series]
+        if segment == "FO":
+            return [(symbol.upper(),) for symbol in dict.fromkeys(symbols)]
+        return [(symbol,) for symbol in dict.fromkeys(symbols)]
+
+    def _fetch(self, segment, keys, start, end, columns, client):
+        spec = SEGMENTS[segment]
+        columns = with_columns(columns, spec["date"], *spec["keys"])
+        start = datetime.combine(start, datetime.min.time())
+        symbols = list(dict.fromkeys(key[0] for key in keys))
+        if segment == "CM":
+            series = sorted({key[1] for key in keys})
+            return get_CM_bhavcopy(start, end, symbols, series, batched=True, client=client, columns=columns)
+        if segment == "FO":
+            return get_FO_bhavcopy(start, end, symbols, batched=True, client=client, columns=columns)
+        return get_indices_bhavcopy(start, end, symbols, batched=True, client=client, columns=columns)
+
+    def sync(self, segment, symbols, series=None, end_date=None, start_date=datetime(2016,1,1), columns=None,
+             client=None, parquet_dir=None, commit=True):
+        """Return the rows of ``symbols`` that are new or corrected since the last sync.
+
+        Parameters:
+            segment (str): "CM", "FO" or "Indices".
+            symbols (list): Symbols (index names for "Indices").
+            series (list): CM series; each (symbol, series) has its own watermark.
+            end_date (datetime): Last trade date to sync. Defaults to now.
+            start_date (datetime): Where symbols without a watermark start.
+            columns (list): Columns to fetch and return (the date and key columns are added).
+                Defaults to all columns.
+            client (BhavcopyClient): Client whose connection pool is used. Defaults to the shared default client.
+            parquet_dir (str): Also append the delta as a Parquet file under ``<parquet_dir>/<segment>``.
+            commit (bool): Store the new watermarks before returning. Pass False and call ``commit()``
+                after storing the delta for at-least-once delivery.
+
+        Returns:
+            DataFrame: The new and corrected rows in getter order, with ``attrs["corrections"]``
+            (key -> corrected trade dates as ISO strings), ``attrs["watermarks"]`` (key -> new
+            watermark) and ``attrs["errors"]`` (failed symbols). Keys whose fetch failed return no
+            rows or corrections and keep their stored watermark and checksums.
+
+        Examples:
+            delta = DeltaSync("sync.json").sync("FO", ['NIFTY', 'BANKNIFTY'], columns=['TradDt', 'TckrSymb', 'XpryDt', 'StrkPric', 'OptnTp', 'ClsPric'])
+        """
+        if segment not in SEGMENTS:
+            raise ValueError(f"Unknown segment {segment!r}. Expected one of {list(SEGMENTS)}.")
+        end_date = end_date or datetime.now()
+        spec = SEGMENTS[segment]
+        date_col, key_cols = spec["date"], spec["keys"]
+        keys = self._keys(segment, symbols, series)
+
+        # Keys fetched from the same day share one batched query
+        watermarks = {key: self.watermark(segment, key) for key in keys}
+        groups = {}
+        for key, mark in watermarks.items():
+            start = mark - timedelta(days=self.lookback_days) if mark else to_date(start_date)
+            if start <= end_date.date():
+                groups.setdefault(start, []).append(key)
+        frames, parts, errors, failed = [], [], {}, set()
+        for start, group in groups.items():
+            logger.info(f"Syncing {len(group)} {segment} keys from {start}")
+            frame = self._fetch(segment, group, start, end_date, columns, client)
+            group_errors = frame.attrs.get("errors") or {}
+            if date_col not in frame.columns and not group_errors:
+                group_errors = {key[0]: "no result returned" for key in group}
+            errors.update(group_errors)
+            # A failed fetch is not "no rows": its keys keep their watermark and checksums
+            failed.update(key for key in group if key[0] in group_errors or "*" in group_errors)
+            if len(frame) and date_col in frame.columns:
+                frames.append(frame)
+                # Hashed before concatenating, which can change the column dtypes
+                parts.append(day_checksums(frame, date_col, key_cols))
+        fetched = pd.concat(frames, ignore_index=True) if len(frames) > 1 else (frames[0] if frames else pd.DataFrame())
+        if fetched.empty:
+            fetched = pd.DataFrame(columns=with_columns(columns, date_col, *key_cols) or [date_col, *key_cols])
+
+        sums = pd.concat(parts, ignore_index=True) if parts else None
+        by_key = {tuple(key): rows for key, rows in sums.groupby(key_cols, sort=False)} if sums is not None else {}
+        emit, corrections, pending = [], {}, {}
+        last_day = end_date.date().isoformat()
+        for key in keys:
+            if key in failed:
+                continue
+            mark = watermarks[key]
+            rows = by_key.get(key)
+            fresh = {} if rows is None else dict(zip(rows["day"].dt.strftime("%Y-%m-%d"), rows["checksum"]))
+            stored = self.state.get(segment, {}).get(key_name(key), {}).get("checksums", {})
+            # Days after end_date were not fetched again and keep their checksums
+            later = {day: checksum for day, checksum in stored.items() if day > last_day}
+            changed = sorted(day for day, checksum in stored.items() if day <= last_day and fresh.get(day) != checksum)
+            if changed:
+                corrections[key_name(key)] = changed
+            emit += [(*key, pd.Timestamp(day)) for day in changed if day in fresh]
+            emit += [(*key, pd.Timestamp(day)) for day in fresh if mark is None or date.fromisoformat(day) > mark]
+            days = list(fresh) + ([mark.isoformat()] if mark else [])
+            if not days:
+                continue
+            latest = max(days)
+            window = (date.fromisoformat(latest) - timedelta(days=self.lookback_days)).isoformat()
+            checksums = {day: checksum for day, checksum in {**fresh, **later}.items() if day >= window}
+            pending[key_name(key)] = {"watermark": latest, "checksums": checksums}
+
+        wanted = pd.MultiIndex.from_tuples(emit, names=[*key_cols, "day"]) if emit else None
+        if wanted is not None and len(fetched):
+            labels = fetched[key_cols].astype(object).assign(day=pd.to_datetime(fetched[date_col]).dt.normalize().to_numpy())
+            delta = fetched[pd.MultiIndex.from_frame(labels).isin(wanted)].reset_index(drop=True)
+        else:
+            delta = fetched.iloc[0:0]
+        if columns is not None:
+            delta = delta[columns]
+        delta.attrs = {
+            "errors": errors, "corrections": corrections,
+            "watermarks": {name: entry["watermark"] for name, entry in pending.items()},
+        }
+        logger.info(f"{segment} delta: {len(delta)} rows, {len(corrections)} keys with corrections")
+
+        if parquet_dir is not None and len(delta):
+            write_delta(delta, parquet_dir, segment)
+        with self._lock:
+            self._pending.setdefault(segment, {}).update(pending)
+        if commit:
+            self.commit()
+        return delta
+
+
+def write_delta(delta, directory, segment):
+    """Append ``delta`` to ``<directory>/<segment>`` as a new Parquet file; return its path."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Writing deltas to Parquet requires pyarrow. Install it with: pip install pyarrow") from e
+    folder = os.path.join(os.path.abspath(os.path.expanduser(directory)), segment)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"delta-{datetime.now():%Y%m%dT%H%M%S%f}.parquet")
+    frame = delta.copy()
+    frame.attrs = {}
+    tmp = path + ".tmp"
+    frame.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    logger.info(f"Wrote {len(delta)} rows to {path}")
+    return path
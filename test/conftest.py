@@ -0,0 +1,95 @@
+import csv
+import io
+import re
+import pytest
+
+from Rmoney_bhavcopy import Bhavcopy_Reteriver, client
+
+
+class FakeCursor:
+    """Cursor stub that returns the canned rows registered for the queried table.
+
+    Rows registered as tuples are returned as they are. Rows registered as dicts (column -> value)
+    are laid out by the SELECT list, so ``build_union_query``'s renames and typed NULLs apply, and
+    every table of a UNION ALL contributes its rows.
+    """
+
+    def __init__(self, connection, name=None):
+        self.connection = connection
+        self.name = name
+        self.itersize = 2000
+        self._rows = []
+
+    def execute(self, query, params=None):
+        self.connection.executed.append((query, params))
+        if params and self.connection.fail_symbol in params:
+            raise RuntimeError(f"query failed for {self.connection.fail_symbol}")
+        self._rows = [row for part in query.split(" UNION ALL ") for row in self._select(part)]
+
+    def _select(self, query):
+        table = re.search(r"FROM\s+(\w+)", query)
+        rows = list(self.connection.rows.get(table.group(1), [])) if table else []
+        if not rows or not isinstance(rows[0], dict):
+            return rows
+        select = re.match(r"SELECT (.*?) FROM ", query).group(1)
+        # "SYMBOL::text AS TckrSymb" reads SYMBOL; "NULL::date AS BizDt" is always None
+        sources = [re.split(r"::| AS ", expression)[0].strip('"') for expression in select.split(", ")]
+        return [tuple(None if source == "NULL" else row.get(source) for source in sources) for row in rows]
+
+    def mogrify(self, query, params=None):
+        return query.encode()
+
+    def copy_expert(self, sql, file):
+        if "FROM STDIN" in sql:
+            self.connection.executed.append((sql, None))
+            self.connection.copied.append((sql, file.read()))
+            return
+        self.execute(sql)
+        text = io.StringIO()
+        csv.writer(text).writerows(self.fetchall())
+        file.write(text.getvalue().encode())
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Connection stub recording every executed query."""
+
+    def __init__(self, rows=None):
+        self.rows = rows or {}
+        self.executed = []
+        self.closed = 0
+        self.fail_symbol = None
+        self.copied = []
+        self.commits = 0
+
+    def cursor(self, name=None):
+        return FakeCursor(self, name)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Route ``establish_connection`` to an in-memory FakeConnection."""
+    connection = FakeConnection()
+    monkeypatch.setattr(Bhavcopy_Reteriver, "establish_connection", lambda: connection)
+    client.set_default_client(None)
+    yield connection
+    client.set_default_client(None)
@@ -0,0 +1,57 @@
+from Rmoney_bhavcopy.aio import aget_FO_bhavcopy, aget_indices_bhavcopy
+from Rmoney_bhavcopy.queries import to_numbered_params
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+import asyncio
+import pytest
+
+
+class FakeAsyncPool:
+    """asyncpg pool stub returning canned rows per table."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    async def fetch(self, query, *params):
+        self.queries.append((query, params))
+        await asyncio.sleep(0)
+        table = query.split(" FROM ")[1].split()[0]
+        if "FAIL" in params:
+            raise RuntimeError("query failed")
+        return self.rows.get(table, [])
+
+
+def test_to_numbered_params():
+    assert to_numbered_params("a >= %s AND b = ANY(%s) AND c LIKE 'x%%'") == "a >= $1 AND b = ANY($2) AND c LIKE 'x%'"
+
+
+def test_aget_FO_matches_sync_shape_and_collects_errors():
+    row = [None] * 34
+    row[0], row[7] = date(2024,1,2), "NIFTY"
+    pool = FakeAsyncPool({"FO_Bhavcopies_UDiFF": [tuple(row)]})
+    data = asyncio.run(aget_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['nifty', 'fail'], pool=pool))
+    assert data.shape == (1, 34)
+    assert list(data.attrs["errors"]) == ["FAIL"]
+    assert all("$1" in query for query, _ in pool.queries)
+
+
+def test_aget_indices_validates_dates():
+    with pytest.raises(ValueError):
+        asyncio.run(aget_indices_bhavcopy(datetime(2024,2,1), datetime(2024,1,1), ["Nifty 50"], pool=FakeAsyncPool({})))
+
+
+def test_aget_FO_forwards_columns_filters_and_backend():
+    # Rows in the projected order, followed by the row keys fetched for sorting
+    pool = FakeAsyncPool({"FO_Bhavcopies_UDiFF": [(date(2024,1,2), "NIFTY", 150.5, "IDO", date(2024,1,25), 21000.0, "CE")]})
+    data = asyncio.run(aget_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['nifty'], pool=pool,
+                                        columns=["TradDt", "TckrSymb", "ClsPric"], option_types=["CE"], backend="arrow"))
+    assert data.column_names == ["TradDt", "TckrSymb", "ClsPric"]
+    assert data["ClsPric"].to_pylist() == [150.5]
+    query, params = pool.queries[0]
+    assert query.startswith("SELECT TradDt::date AS TradDt, TckrSymb::text AS TckrSymb, ClsPric::numeric AS ClsPric, FinInstrmTp::text") and "OptnTp = ANY($4)" in query
+    assert params[3] == ["CE"]
@@ -0,0 +1,24 @@
+from Rmoney_bhavcopy.assembly import FrameCollector, concat_frames
+import pandas as pd
+
+
+def test_collector_concatenates_once_with_fresh_index():
+    collector = FrameCollector()
+    collector.append(pd.DataFrame({"a": [1, 2]}, index=[5, 6]))
+    collector.append(pd.DataFrame({"a": [3]}))
+    result = collector.result()
+    assert result["a"].tolist() == [1, 2, 3]
+    assert result.index.tolist() == [0, 1, 2]
+
+
+def test_collector_keeps_columns_when_everything_is_empty():
+    collector = FrameCollector()
+    collector.append(pd.DataFrame(columns=["a", "b"]))
+    collector.append(pd.DataFrame(columns=["a", "b"]))
+    result = collector.result()
+    assert result.empty
+    assert list(result.columns) == ["a", "b"]
+
+
+def test_concat_frames_without_input():
+    assert concat_frames([]).empty
@@ -0,0 +1,50 @@
+from Rmoney_bhavcopy.Bhavcopy_Reteriver import get_FO_bhavcopy, iter_FO_bhavcopy
+from Rmoney_bhavcopy.queries import UDIFF_COLUMNS
+from datetime import date, datetime
+from decimal import Decimal
+import json
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+
+def fo_row(symbol, trade_date, close):
+    row = [None] * 34
+    row[0], row[7], row[17], row[22] = trade_date, symbol, close, Decimal("1200")
+    return tuple(row)
+
+
+@pytest.mark.parametrize("transport", ["cursor", "copy"])
+def test_arrow_backend_builds_typed_sorted_table(fake_db, transport):
+    fake_db.rows["FO_Bhavcopies_UDiFF"] = [fo_row("NIFTY", date(2024,1,3), Decimal("21600.5")), fo_row("NIFTY", date(2024,1,2), None)]
+    table = get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['nifty'], transport=transport, backend="arrow")
+    assert isinstance(table, pa.Table)
+    assert table.column_names == UDIFF_COLUMNS
+    assert table.schema.field("ClsPric").type == pa.float64()
+    assert table.schema.field("OpnIntrst").type == pa.int64()
+    assert pa.types.is_timestamp(table.schema.field("TradDt").type)
+    assert pa.types.is_dictionary(table.schema.field("TckrSymb").type)
+    assert table.column("ClsPric").to_pylist() == [None, 21600.5]
+
+
+def test_arrow_backend_projection_and_errors(fake_db):
+    # ClsPric, then the FO row keys fetched for sorting
+    fake_db.rows["FO_Bhavcopies_UDiFF"] = [(Decimal("21500"), date(2024,1,2), "NIFTY", None, None, None, None)]
+    fake_db.fail_symbol = "BANKNIFTY"
+    table = get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['NIFTY', 'BANKNIFTY'], max_workers=2, columns=["ClsPric"], backend="arrow")
+    assert table.column_names == ["ClsPric"] and table.column("ClsPric").to_pylist() == [21500.0]
+    assert list(json.loads(table.schema.metadata[b"errors"])) == ["BANKNIFTY"]
+
+
+def test_polars_backend_and_stream(fake_db):
+    pl = pytest.importorskip("polars")
+    fake_db.rows["FO_Bhavcopies_UDiFF"] = [fo_row("NIFTY", date(2024,1,2), Decimal("21500"))] * 3
+    data = get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['NIFTY'], backend="polars")
+    assert isinstance(data, pl.DataFrame) and data["ClsPric"].to_list() == [21500.0] * 3
+    chunks = list(iter_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['NIFTY'], chunk_size=2, backend="polars"))
+    assert [chunk.height for chunk in chunks] == [2, 1]
+
+
+def test_invalid_backend_raises(fake_db):
+    with pytest.raises(ValueError):
+        get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['NIFTY'], backend="spark")
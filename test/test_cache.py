@@ -0,0 +1,46 @@
+from datetime import date, timedelta
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from Rmoney_bhavcopy.cache import BhavcopyCache, subtract_ranges, merge_ranges
+
+
+def make_loader(calls):
+    def loader(keys, lo, hi):
+        calls.append((tuple(keys), lo, hi))
+        days = pd.bdate_range(lo, hi).date
+        rows = [(d, symbol, 1.0) for symbol, in keys for d in days]
+        return pd.DataFrame(rows, columns=["TradDt", "TckrSymb", "ClsPric"])
+    return loader
+
+
+def test_subtract_and_merge_ranges():
+    d = date(2024, 1, 1)
+    covered = [(d + timedelta(5), d + timedelta(9))]
+    assert subtract_ranges(d, d + timedelta(14), covered) == [(d, d + timedelta(4)), (d + timedelta(10), d + timedelta(14))]
+    assert merge_ranges([(d, d + timedelta(1)), (d + timedelta(2), d + timedelta(3))]) == [(d, d + timedelta(3))]
+
+
+def test_cache_fetches_only_missing_dates(tmp_path):
+    cache = BhavcopyCache(tmp_path)
+    calls = []
+    first = cache.fetch("FO", [("NIFTY",), ("BANKNIFTY",)], date(2024, 1, 1), date(2024, 2, 29), make_loader(calls))
+    assert len(calls) == 1
+    again = cache.fetch("FO", [("NIFTY",), ("BANKNIFTY",)], date(2024, 1, 15), date(2024, 2, 15), make_loader(calls))
+    assert len(calls) == 1
+    assert again["TradDt"].min() >= date(2024, 1, 15)
+    extended = cache.fetch("FO", [("NIFTY",)], date(2024, 1, 1), date(2024, 3, 31), make_loader(calls))
+    assert calls[-1][1:] == (date(2024, 3, 1), date(2024, 3, 31))
+    assert len(extended) == len(pd.bdate_range("2024-01-01", "2024-03-31"))
+    assert len(first) == 2 * len(pd.bdate_range("2024-01-01", "2024-02-29"))
+
+
+def test_recent_dates_are_refetched(tmp_path):
+    cache = BhavcopyCache(tmp_path, refresh_days=3)
+    calls = []
+    today = date.today()
+    cache.fetch("FO", [("NIFTY",)], today - timedelta(30), today, make_loader(calls))
+    cache.fetch("FO", [("NIFTY",)], today - timedelta(30), today, make_loader(calls))
+    assert calls[-1][1:] == (today - timedelta(2), today)
@@ -0,0 +1,44 @@
+from Rmoney_bhavcopy.client import BhavcopyClient, ConnectionPool, PoolError, get_default_client
+from datetime import datetime
+import threading
+import pytest
+
+from conftest import FakeConnection
+
+
+def test_client_reuses_pooled_connection():
+    opened = []
+
+    def factory():
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    with BhavcopyClient(connection_factory=factory) as client:
+        for _ in range(3):
+            client.get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['NIFTY'])
+        assert len(opened) == 1
+        assert len(opened[0].executed) == 3
+    assert opened[0].closed
+
+
+def test_pool_blocks_until_connection_returned():
+    pool = ConnectionPool(FakeConnection, maxconn=1)
+    conn = pool.getconn()
+    with pytest.raises(PoolError):
+        pool.getconn(timeout=0.01)
+    threading.Timer(0.05, pool.putconn, args=(conn,)).start()
+    assert pool.getconn(timeout=2) is conn
+
+
+def test_pool_discards_closed_connections():
+    pool = ConnectionPool(FakeConnection, maxconn=1)
+    conn = pool.getconn()
+    conn.close()
+    pool.putconn(conn)
+    assert pool.getconn() is not conn
+
+
+def test_module_getters_use_default_client(fake_db):
+    get_default_client().get_indices_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ["Nifty 50"])
+    assert len(fake_db.executed) == 1
+    assert not fake_db.closed
@@ -0,0 +1,59 @@
+from Rmoney_bhavcopy.continuous import ContinuousFutures, continuous_futures
+import numpy as np
+import pandas as pd
+import pytest
+
+EXPIRIES = ["2024-01-25", "2024-02-29", "2024-03-28"]
+
+
+def fo_frame(days, symbol="NIFTY", interest=None):
+    """Futures of the three EXPIRIES, each month quoted 10 above the one before."""
+    rows = []
+    for number, day in enumerate(pd.bdate_range("2024-01-22", periods=days)):
+        for month, expiry in enumerate(EXPIRIES):
+            if pd.Timestamp(expiry) >= day:
+                oi = interest(day, month) if interest else 1000 - month
+                rows.append((day, symbol, "IDF", pd.Timestamp(expiry), 100.0 + 10 * month + number, oi))
+    rows.append((pd.Timestamp("2024-01-22"), symbol, "IDO", pd.Timestamp(EXPIRIES[0]), 5.0, 10**6))
+    return pd.DataFrame(rows, columns=["TradDt", "TckrSymb", "FinInstrmTp", "XpryDt", "ClsPric", "OpnIntrst"])
+
+
+def test_expiry_roll_with_ratio_and_difference():
+    data = fo_frame(8)
+    series = continuous_futures(data.sample(frac=1, random_state=1))
+    assert series["XpryDt"].dt.strftime("%Y-%m-%d").tolist() == [EXPIRIES[0]] * 4 + [EXPIRIES[1]] * 4
+    assert series["Roll"].tolist() == [False] * 4 + [True] + [False] * 3
+    # Rolled on 26 Jan at 113 / 103, the prices of both months on 25 Jan
+    np.testing.assert_allclose(series["AdjClsPric"][:4], np.array([100.0, 101.0, 102.0, 103.0]) * 113 / 103)
+    np.testing.assert_allclose(series["AdjClsPric"][4:], series["ClsPric"][4:])
+
+    series = continuous_futures(data, roll_days=2, adjustment="difference")
+    assert series["Roll"].tolist() == [False, False, True] + [False] * 5
+    np.testing.assert_allclose(series["AdjClsPric"], [110.0, 111.0] + series["ClsPric"][2:].tolist())
+
+
+def test_oi_roll_never_rolls_back():
+    # The next month leads in open interest on 23 Jan only
+    interest = lambda day, month: 2000 if month == 1 and day == pd.Timestamp("2024-01-23") else 1000 - 100 * month
+    series = continuous_futures(fo_frame(6, interest=interest), roll="oi")
+    assert series["XpryDt"].dt.strftime("%Y-%m-%d").tolist() == [EXPIRIES[0], EXPIRIES[1], EXPIRIES[1], EXPIRIES[1], EXPIRIES[1], EXPIRIES[1]]
+    assert series["NxtXpryDt"].dt.strftime("%Y-%m-%d").tolist()[:2] == [EXPIRIES[1], EXPIRIES[2]]
+
+
+def test_update_appends_days_to_history(tmp_path):
+    data = pd.concat([fo_frame(30), fo_frame(30, "BANKNIFTY")], ignore_index=True)
+    full = continuous_futures(data, roll_days=3)
+    futures = ContinuousFutures(roll_days=3)
+    futures.update(data[data["TradDt"] <= "2024-02-05"])
+    futures.save(tmp_path / "futures.parquet")
+    futures = ContinuousFutures.load(tmp_path / "futures.parquet")
+    series = futures.update(data[data["TradDt"] >= "2024-02-01"])  # overlapping days are skipped
+    assert futures.last_dates().to_dict() == {"BANKNIFTY": pd.Timestamp("2024-03-01"), "NIFTY": pd.Timestamp("2024-03-01")}
+    pd.testing.assert_frame_equal(series, full)
+
+
+def test_invalid_arguments_raise():
+    with pytest.raises(ValueError):
+        ContinuousFutures(roll="volume")
+    with pytest.raises(ValueError):
+        continuous_futures(fo_frame(2).drop(columns="OpnIntrst"))
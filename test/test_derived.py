@@ -0,0 +1,57 @@
+from Rmoney_bhavcopy.derived import DerivedSeries, derive
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def cm_frame(closes, symbol="TCS", start="2024-01-01"):
+    dates = pd.bdate_range(start, periods=len(closes))
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        "TradDt": dates,
+        "TckrSymb": symbol,
+        "SctySrs": "EQ",
+        "OpnPric": closes,
+        "ClsPric": closes,
+        "PrvsClsgPric": np.r_[np.nan, closes[:-1]],
+        "TtlTradgVol": np.arange(1, len(closes) + 1) * 100.0,
+        "TtlTrfVal": np.arange(1, len(closes) + 1) * 100.0 * closes,
+    })
+
+
+def test_derive_matches_pandas_per_symbol():
+    rng = np.random.default_rng(1)
+    data = pd.concat([cm_frame(100 * np.cumprod(1 + rng.normal(0, 0.02, 30)), symbol) for symbol in ["TCS", "INFY"]])
+    result = derive(data.sample(frac=1, random_state=1), window=5)
+    assert result["TckrSymb"].tolist() == ["INFY"] * 30 + ["TCS"] * 30
+    for symbol, rows in result.groupby("TckrSymb"):
+        log_rtrn = np.log(rows["ClsPric"] / rows["ClsPric"].shift())
+        np.testing.assert_allclose(rows["Vol5"], log_rtrn.rolling(5).std() * np.sqrt(252), rtol=1e-6)
+        np.testing.assert_allclose(rows["Adv5"], rows["TtlTradgVol"].rolling(5).mean())
+        np.testing.assert_allclose(rows["AdjClsPric"], rows["ClsPric"])
+    np.testing.assert_allclose(result["Vwap"], result["ClsPric"])
+
+
+def test_adjusted_close_ignores_corporate_action_jump():
+    data = cm_frame([100.0, 102.0, 51.0, 52.0])
+    data.loc[2, "PrvsClsgPric"] = 51.0  # 1:2 split applied by the exchange to the previous close
+    result = derive(data, window=2)
+    np.testing.assert_allclose(result["Rtrn"], [np.nan, 0.02, 0.0, 1 / 51])
+    np.testing.assert_allclose(result["AdjClsPric"], [100.0, 102.0, 102.0, 104.0])
+
+
+def test_update_appends_days_to_state(tmp_path):
+    data = cm_frame(100 + np.sin(np.arange(40)) * 5)
+    full = derive(data, window=10)
+    series = DerivedSeries(window=10)
+    first = series.update(data.iloc[:25])
+    series.save(tmp_path / "state.parquet")
+    series = DerivedSeries.load(tmp_path / "state.parquet")
+    second = series.update(data.iloc[20:])  # overlapping days are skipped
+    assert len(first) + len(second) == 40 and len(series.state) == 10
+    pd.testing.assert_frame_equal(pd.concat([first, second], ignore_index=True), full)
+
+
+def test_missing_columns_raise():
+    with pytest.raises(ValueError):
+        derive(cm_frame([1.0, 2.0]).drop(columns="TtlTrfVal"))
@@ -0,0 +1,63 @@
+from Rmoney_bhavcopy.ingest import detect_table, ingest
+from Rmoney_bhavcopy.queries import UDIFF_COLUMNS
+from datetime import date
+import pytest
+import zipfile
+
+LEGACY_CM = """SYMBOL,SERIES,OPEN,HIGH,LOW,CLOSE,LAST,PREVCLOSE,TOTTRDQTY,TOTTRDVAL,TIMESTAMP,TOTALTRADES,ISIN,
+TCS,EQ,3900.1,3950,3890,3940.5,3941,3899.9,1234567,4861234567.25,01-JUL-2024,54321,INE467B01029,
+INFY,EQ,1700,1720,1690,1710.35,1710,1698.2,2345678,4012345678.5,01-JUL-2024,65432,INE009A01021,
+"""
+UDIFF_FO = ",".join(UDIFF_COLUMNS) + """
+2024-07-08,2024-07-08,FO,NSE,IDF,35001,,BANKNIFTY,,2024-07-31,2024-07-31,,,BANKNIFTY24JULFUT,52700,52900,52600,52850,52850,52650.5,52700.1,52850,2345678,12000,123456,98765432100,45678,F1,15,,,,,
+2024-07-08,2024-07-08,FO,NSE,IDO,35002,,BANKNIFTY,,2024-07-10,2024-07-10,52500,CE,BANKNIFTY2471052500CE,450,520,400,480.25,480.25,470,52700.1,480.25,345678,2345,98765.0,45678900,12345,F1,15,,,,,
+"""
+INDICES = """Index Name,Index Date,Open Index Value,High Index Value,Low Index Value,Closing Index Value,Points Change,Change(%),Volume,Turnover (Rs. Cr.),P/E,P/B,Div Yield
+Nifty 50,01-07-2024,24010.60,24164.00,23992.70,24141.95,131.35,0.55,226344286,23786.73,23.09,4.01,1.21
+Nifty Dividend Opportunities 50,01-07-2024,6400.1,6450.2,6390.0,6440.3,40.2,0.63,-,-,-,-,-
+"""
+
+
+def write_samples(directory):
+    (directory / "cm01JUL2024bhav.csv").write_text(LEGACY_CM)
+    (directory / "ind_close_all_01072024.csv").write_text(INDICES)
+    with zipfile.ZipFile(directory / "BhavCopy_NSE_FO_0_0_0_20240708_F_0000.csv.zip", "w") as archive:
+        archive.writestr("BhavCopy_NSE_FO_0_0_0_20240708_F_0000.csv", UDIFF_FO)
+
+
+def test_detect_table():
+    assert detect_table(UDIFF_COLUMNS, {"Sgmt": "CM"}) == "bhavcopies_udiff"
+    assert detect_table(UDIFF_COLUMNS, {"Sgmt": "FO"}) == "FO_Bhavcopies_UDiFF"
+    with pytest.raises(ValueError, match="Unrecognised bhavcopy header"):
+        detect_table(["SYMBOL", "CLOSE"])
+
+
+def test_files_are_cleaned_and_copied_replacing_their_trade_dates(fake_db, tmp_path):
+    write_samples(tmp_path)
+    report = ingest(tmp_path, max_workers=2)
+    assert report.attrs["errors"] == {}
+    assert report["table"].tolist() == ["FO_Bhavcopies_UDiFF", "bhavcopies_cm", "Indices_bhavCopies"]
+    assert report["rows"].tolist() == [2, 2, 2]
+    assert report["first_date"].tolist() == [date(2024,7,8), date(2024,7,1), date(2024,7,1)]
+    assert fake_db.commits == 3
+
+    copied = {sql.split()[1]: data for sql, data in fake_db.copied}
+    assert copied["bhavcopies_cm"].splitlines()[0] == "TCS,EQ,3900.1,3950,3890,3940.5,3941,3899.9,1234567,4861234567.25,2024-07-01,54321,INE467B01029"
+    # Legacy "-" values are NULL, counts written as "98765.0" are integers
+    assert copied["Indices_bhavCopies"].splitlines()[1] == "Nifty Dividend Opportunities 50,2024-07-01,6400.1,6450.2,6390.0,6440.3,40.2,0.63,,,,,"
+    assert ",98765," in copied["FO_Bhavcopies_UDiFF"].splitlines()[1]
+    assert '"Change(%)"' in next(sql for sql, _ in fake_db.copied if "Indices" in sql)
+
+    deletes = [(query, params) for query, params in fake_db.executed if query.startswith("DELETE")]
+    assert ("DELETE FROM bhavcopies_cm WHERE timestamp = ANY(%s::date[])", (["2024-07-01"],)) in deletes
+    assert len(deletes) == 3
+
+
+def test_dates_are_replaced_once_per_file_and_failures_reported(fake_db, tmp_path):
+    write_samples(tmp_path)
+    (tmp_path / "notes.csv").write_text("a,b\n1,2\n")
+    report = ingest(tmp_path, max_workers=1, chunk_size=1)
+    assert list(report.attrs["errors"]) == [str(tmp_path / "notes.csv")]
+    assert len(report) == 3 and fake_db.commits == 3
+    assert len([query for query, _ in fake_db.executed if query.startswith("DELETE")]) == 3
+    assert len(fake_db.copied) == 6
@@ -0,0 +1,76 @@
+from Rmoney_bhavcopy.options import (
+    black_scholes, greeks, implied_volatility, max_pain, norm_cdf, option_chain, put_call_ratio,
+)
+import math
+import numpy as np
+import pandas as pd
+
+
+def test_norm_cdf_matches_erfc():
+    x = np.linspace(-12, 12, 241)
+    expected = [0.5 * math.erfc(-value / math.sqrt(2)) for value in x]
+    np.testing.assert_allclose(norm_cdf(x), expected, rtol=1e-7, atol=1e-15)
+
+
+def test_implied_volatility_recovers_volatility():
+    rng = np.random.default_rng(0)
+    strike = 20000 * np.exp(rng.normal(0, 0.08, 2000))
+    t = rng.uniform(2 / 365, 0.5, 2000)
+    sigma = rng.uniform(0.08, 0.8, 2000)
+    is_call = rng.random(2000) < 0.5
+    price = black_scholes(20000.0, strike, t, 0.07, sigma, is_call)
+    solved = implied_volatility(price, 20000.0, strike, t, 0.07, is_call, tol=1e-9)
+    usable = greeks(20000.0, strike, t, 0.07, sigma, is_call)["Vega"] > 0.01
+    np.testing.assert_allclose(solved[usable], sigma[usable], atol=1e-6)
+
+    # Below intrinsic value, above the spot and expired contracts have no implied volatility
+    bad = implied_volatility([50.0, 20001.0, 100.0], 20000.0, [19900.0, 20000.0, 20000.0], [0.1, 0.1, 0.0], is_call=True)
+    assert np.isnan(bad).all()
+
+
+def test_greeks_match_finite_differences():
+    spot, strike, t, rate, sigma = 100.0, np.array([90.0, 100.0, 110.0]), 0.25, 0.05, 0.3
+    for is_call in (True, False):
+        result = greeks(spot, strike, t, rate, sigma, is_call)
+        h = 1e-4
+        price = lambda s=spot, tt=t, v=sigma: black_scholes(s, strike, tt, rate, v, is_call)
+        np.testing.assert_allclose(result["Delta"], (price(s=spot + h) - price(s=spot - h)) / (2 * h), rtol=1e-6)
+        np.testing.assert_allclose(result["Vega"], (price(v=sigma + h) - price(v=sigma - h)) / (2 * h) / 100, rtol=1e-6)
+        np.testing.assert_allclose(result["Theta"], (price(tt=t - h) - price(tt=t + h)) / (2 * h) / 365, rtol=1e-6)
+
+
+def chain_frame():
+    rows = []
+    for strike, call_oi, put_oi in [(100.0, 10, 50), (110.0, 30, 20), (120.0, 40, 5)]:
+        for side, oi in (("CE", call_oi), ("PE", put_oi)):
+            price = black_scholes(110.0, strike, 30 / 365, 0.0, 0.2, side == "CE")
+            rows.append(["2024-01-02", "NIFTY", "IDO", "2024-02-01", strike, side, float(price), oi, 110.0])
+    rows.append(["2024-01-02", "NIFTY", "IDF", "2024-02-01", None, None, 111.0, 500, 110.0])
+    columns = ["TradDt", "TckrSymb", "FinInstrmTp", "XpryDt", "StrkPric", "OptnTp", "SttlmPric", "OpnIntrst", "UndrlygPric"]
+    data = pd.DataFrame(rows, columns=columns)
+    data["TradDt"] = pd.to_datetime(data["TradDt"])
+    data["XpryDt"] = pd.to_datetime(data["XpryDt"])
+    return data
+
+
+def test_option_chain_pcr_and_max_pain():
+    chain = option_chain(chain_frame())
+    assert len(chain) == 6 and chain["FinInstrmTp"].eq("IDO").all()
+    np.testing.assert_allclose(chain["IV"], 0.2, atol=1e-5)
+    np.testing.assert_allclose(chain["TmToXpry"], 30 / 365)
+
+    pcr = put_call_ratio(chain)
+    assert pcr[["CE", "PE"]].iloc[0].tolist() == [80.0, 75.0]
+    assert pcr["PCR"].iloc[0] == 75.0 / 80.0
+
+    # Payoffs: 100 -> 30*10 + 5*20 = 400, 110 -> 10*10 + 5*10 = 150, 120 -> 10*20 + 30*10 = 500
+    pain = max_pain(chain)
+    assert pain[["MaxPain", "Payout"]].iloc[0].tolist() == [110.0, 150.0]
+
+
+def test_legacy_rows_use_nearest_future_as_spot():
+    data = chain_frame().assign(UndrlygPric=np.nan)
+    future = data.iloc[[-1]].assign(XpryDt=pd.Timestamp("2024-03-01"), SttlmPric=112.0, ClsPric=112.0)
+    data = pd.concat([data, future], ignore_index=True).assign(ClsPric=lambda d: d["SttlmPric"])
+    chain = option_chain(data)
+    assert chain["Spot"].eq(111.0).all()
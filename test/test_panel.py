@@ -0,0 +1,83 @@
+from Rmoney_bhavcopy.panel import Panel, PanelError, to_panel, strike_panel
+from Rmoney_bhavcopy.Bhavcopy_Reteriver import get_CM_bhavcopy
+from datetime import date, datetime
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_to_panel_aligns_dates_and_requested_symbols():
+    data = pd.DataFrame({
+        "TradDt": pd.to_datetime(["2024-01-03", "2024-01-02", "2024-01-02", "2024-01-03"]),
+        "TckrSymb": ["TCS", "TCS", "INFY", "WIPRO"],
+        "ClsPric": [3.0, 2.0, 1.0, 9.0],
+    })
+    data.attrs["errors"] = {"HDFC": "failed"}
+    panel = to_panel(data, ["ClsPric"], symbols=["INFY", "TCS", "HDFC"])
+    assert list(panel.dates) == list(pd.to_datetime(["2024-01-02", "2024-01-03"]))
+    assert list(panel.symbols) == ["INFY", "TCS", "HDFC"]
+    np.testing.assert_array_equal(panel["ClsPric"], [[1.0, 2.0, np.nan], [np.nan, 3.0, np.nan]])
+    assert panel.frame("ClsPric").loc["2024-01-03", "TCS"] == 3.0
+    assert panel.errors == {"HDFC": "failed"}
+
+
+def test_strike_panel_pivots_one_date_by_expiry_and_option_type():
+    data = pd.DataFrame({
+        "TradDt": pd.to_datetime(["2024-01-02"] * 4 + ["2024-01-03"]),
+        "TckrSymb": ["NIFTY"] * 5,
+        "XpryDt": pd.to_datetime(["2024-01-25", "2024-01-25", "2024-02-29", "2024-01-25", "2024-01-25"]),
+        "OptnTp": ["CE", "PE", "CE", None, "CE"],
+        "StrkPric": [21000.0, 21000.0, 21500.0, np.nan, 21000.0],
+        "ClsPric": [120.0, 80.0, 300.0, 21400.0, 999.0],
+    })
+    chain = strike_panel(data, datetime(2024, 1, 2))
+    assert list(chain.index) == [21000.0, 21500.0]
+    assert list(chain.columns) == [
+        (pd.Timestamp("2024-01-25"), "CE"), (pd.Timestamp("2024-01-25"), "PE"), (pd.Timestamp("2024-02-29"), "CE"),
+    ]
+    np.testing.assert_array_equal(chain.to_numpy(), [[120.0, 80.0, np.nan], [np.nan, np.nan, 300.0]])
+    with pytest.raises(ValueError):
+        strike_panel(pd.concat([data, data.assign(TckrSymb="BANKNIFTY")]), datetime(2024, 1, 2))
+
+
+def test_CM_output_panel_fetches_only_panel_columns(fake_db):
+    # OpnPric, HghPric, LwPric, ClsPric, TtlTradgVol, TradDt, TckrSymb, SctySrs
+    fake_db.rows["bhavcopies_udiff"] = [
+        (None, None, None, Decimal("3500.5"), Decimal("1000"), date(2024,1,2), "TCS", "EQ"),
+    ]
+    # Batched: the fake returns its rows for every query, and one query keeps one row per cell
+    panel = get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['tcs', 'infy'], ['EQ'], batched=True, output="panel")
+    query = fake_db.executed[0][0]
+    assert "ClsPric" in query and "FinInstrmNm" not in query
+    assert list(panel.symbols) == ["TCS", "INFY"]
+    np.testing.assert_array_equal(panel["ClsPric"], [[3500.5, np.nan]])
+    with pytest.raises(ValueError):
+        get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['TCS'], ['EQ'], output="wide")
+
+
+def test_CM_output_panel_on_error_returns_empty_panel(fake_db):
+    # The series check fails inside the getter's error handler, which still honours output=
+    panel = get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['TCS', 'INFY'], None, output="panel")
+    assert isinstance(panel, Panel)
+    assert panel.shape == (0, 2) and panel.fields == ["OpnPric", "HghPric", "LwPric", "ClsPric", "TtlTradgVol"]
+
+
+def test_duplicate_cells_raise(fake_db):
+    data = pd.DataFrame({
+        "TradDt": pd.to_datetime(["2024-01-02", "2024-01-02", "2024-01-03"]),
+        "TckrSymb": ["TCS", "TCS", "TCS"],
+        "ClsPric": [1.0, 2.0, 3.0],
+    })
+    with pytest.raises(PanelError, match="TCS on 2024-01-02"):
+        to_panel(data, ["ClsPric"])
+    # Rows of symbols left out of the panel do not count
+    assert to_panel(data, ["ClsPric"], symbols=["INFY"]).shape == (2, 1)
+
+    # Two series of one stock on a day reach the caller instead of an empty panel
+    fake_db.rows["bhavcopies_udiff"] = [
+        (None, None, None, Decimal("10"), Decimal("1"), date(2024,1,2), "TCS", "EQ"),
+        (None, None, None, Decimal("11"), Decimal("1"), date(2024,1,2), "TCS", "BE"),
+    ]
+    with pytest.raises(PanelError):
+        get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['TCS'], ['EQ', 'BE'], output="panel")
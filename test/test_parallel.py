@@ -0,0 +1,31 @@
+from Rmoney_bhavcopy.Bhavcopy_Reteriver import get_CM_bhavcopy, get_FO_bhavcopy, get_indices_bhavcopy
+from datetime import date, datetime
+
+
+def udiff_row(symbol, series=None):
+    row = [None] * 34
+    row[0], row[7], row[8] = date(2024,1,2), symbol, series
+    return tuple(row)
+
+
+def test_parallel_FO_keeps_symbol_order_and_collects_errors(fake_db):
+    fake_db.rows["FO_Bhavcopies_UDiFF"] = [udiff_row("NIFTY")]
+    fake_db.fail_symbol = "BANKNIFTY"
+    data = get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['nifty', 'banknifty', 'finnifty'], max_workers=3)
+    assert len(data) == 2
+    assert list(data.attrs["errors"]) == ["BANKNIFTY"]
+    assert len(fake_db.executed) == 3
+
+
+def test_parallel_CM_batches_series_per_symbol(fake_db):
+    fake_db.rows["bhavcopies_udiff"] = [udiff_row("TCS", "EQ")]
+    data = get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['tcs', 'infy'], ['EQ', 'BE'], max_workers=2)
+    assert data.shape == (2, 34)
+    assert data.attrs["errors"] == {}
+    assert all(params[3] == ['EQ', 'BE'] for _, params in fake_db.executed)
+
+
+def test_parallel_indices(fake_db):
+    data = get_indices_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ["Nifty 50", "Nifty 100"], max_workers=2)
+    assert data.empty
+    assert len(fake_db.executed) == 2
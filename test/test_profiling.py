@@ -0,0 +1,48 @@
+from Rmoney_bhavcopy.Bhavcopy_Reteriver import get_FO_bhavcopy
+from Rmoney_bhavcopy.profiling import add_hook, profile, remove_hook, stage
+from datetime import date, datetime
+
+
+def fo_row(symbol, trade_date):
+    row = [None] * 34
+    row[0], row[7] = trade_date, symbol
+    return tuple(row)
+
+
+def test_profile_records_stages_per_symbol(fake_db):
+    fake_db.rows["FO_Bhavcopies_UDiFF"] = [fo_row("NIFTY", date(2024,1,2)), fo_row("NIFTY", date(2024,1,3))]
+    with profile() as report:
+        get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['NIFTY', 'BANKNIFTY'])
+    records = report.frame()
+    # establish_connection is replaced by the fixture, so there is no "connect" stage
+    assert records["stage"].tolist() == [
+        "acquire",
+        "execute", "fetch", "build", "sort",
+        "execute", "fetch", "build", "sort",
+        "assemble", "normalize", "convert",
+    ]
+    fetched = records[records["stage"] == "fetch"]
+    assert fetched["symbol"].tolist() == ["NIFTY", "BANKNIFTY"] and fetched["rows"].tolist() == [2, 2]
+    assert records.loc[records["stage"] == "build", "bytes"].gt(0).all()
+    summary = report.summary()
+    assert summary.loc["assemble", "rows"] == 4 and summary.loc["execute", "calls"] == 2
+    assert report.seconds >= records["seconds"].sum() * 0.5
+
+
+def test_parallel_stages_reach_the_profile_and_hooks(fake_db):
+    fake_db.rows["FO_Bhavcopies_UDiFF"] = [fo_row("NIFTY", date(2024,1,2))]
+    seen = []
+    with profile(hooks=[seen.append]) as report:
+        get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['NIFTY', 'BANKNIFTY'], max_workers=2, transport="copy")
+    copies = report.frame().query("stage == 'copy'")
+    assert sorted(copies["symbol"]) == ["BANKNIFTY", "NIFTY"] and copies["bytes"].gt(0).all()
+    assert len(seen) == len(report.records)
+
+    # Outside a profile only global hooks see stages, and nothing is timed without one
+    assert stage("execute") is stage("fetch")
+    add_hook(seen.append)
+    try:
+        get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['NIFTY'])
+    finally:
+        remove_hook(seen.append)
+    assert [record.stage for record in seen[len(report.records):]][-3:] == ["assemble", "normalize", "convert"]
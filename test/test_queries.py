@@ -0,0 +1,149 @@
+from Rmoney_bhavcopy.queries import build_query, build_union_query, fo_filters, quote_ident, UDIFF_COLUMNS
+from Rmoney_bhavcopy.Bhavcopy_Reteriver import get_CM_bhavcopy, get_FO_bhavcopy, get_indices_bhavcopy
+from datetime import date, datetime
+import pytest
+
+
+def test_build_query_single_symbol():
+    query, params, columns = build_query("bhavcopies_udiff", "CM", date(2024,1,1), date(2024,1,31), "TCS", "EQ")
+    assert "TckrSymb = %s" in query
+    assert "SctySrs = %s" in query
+    assert params == (date(2024,1,1), date(2024,1,31), "TCS", "EQ")
+    assert len(columns) == 34
+
+
+def test_build_query_batched():
+    query, params, columns = build_query("bhavcopies_cm", "CM", date(2024,1,1), date(2024,1,31), ["TCS", "INFY"], ["EQ", "BE"])
+    assert "symbol = ANY(%s)" in query
+    assert "series = ANY(%s)" in query
+    assert params[2:] == (["TCS", "INFY"], ["EQ", "BE"])
+
+
+def test_build_query_quotes_indices_columns():
+    query, _, _ = build_query("Indices_bhavCopies", "Indices", date(2024,1,1), date(2024,1,31), ["Nifty 50"])
+    assert '"Index Name" = ANY(%s)' in query
+    assert quote_ident("TradDt") == "TradDt"
+
+
+def test_build_union_query_maps_legacy_columns():
+    query, params, columns = build_union_query("CM", date(2024,1,1), date(2024,1,31), "TCS", ["EQ"])
+    udiff_select, legacy_select = query.split(" UNION ALL ")
+    assert columns == UDIFF_COLUMNS
+    assert "FROM bhavcopies_udiff" in udiff_select
+    assert "TckrSymb::text AS TckrSymb" in udiff_select and "OpnIntrst::bigint AS OpnIntrst" in udiff_select
+    assert "SYMBOL::text AS TckrSymb" in legacy_select
+    assert "TIMESTAMP::date AS TradDt" in legacy_select
+    assert "NULL::bigint AS OpnIntrst" in legacy_select
+    assert params == (date(2024,1,1), date(2024,1,31), "TCS", ["EQ"]) * 2
+    with pytest.raises(ValueError):
+        build_union_query("Indices", date(2024,1,1), date(2024,1,31), "Nifty 50")
+
+
+def test_build_query_rejects_other_segment():
+    with pytest.raises(ValueError):
+        build_query("FO_Bhavcopies_UDiFF", "CM", date(2024,1,1), date(2024,1,31), "TCS")
+
+
+def test_CM_batched_issues_one_union_query(fake_db):
+    udiff_row = [None] * 34
+    udiff_row[0], udiff_row[7], udiff_row[8] = date(2024,1,2), "TCS", "EQ"
+    fake_db.rows["bhavcopies_udiff"] = [tuple(udiff_row)]
+    data = get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['infy', 'tcs'], ['EQ', 'BE'], batched=True)
+    assert len(fake_db.executed) == 1
+    assert data.shape == (1, 34)
+    assert fake_db.executed[0][1][2] == ['INFY', 'TCS']
+
+
+def test_CM_union_returns_both_tables_in_udiff_order(fake_db):
+    fake_db.rows["bhavcopies_udiff"] = [{"TradDt": date(2024,7,9), "TckrSymb": "TCS", "SctySrs": "EQ", "ClsPric": 4010.0, "FinInstrmId": 11536}]
+    fake_db.rows["bhavcopies_cm"] = [
+        {"TIMESTAMP": date(2024,7,8), "SYMBOL": "TCS", "SERIES": "EQ", "CLOSE": 4000.0, "TOTTRDQTY": 1200, "ISIN": "INE467B01029"},
+        # The same day in both tables is kept twice: UNION ALL does not de-duplicate
+        {"TIMESTAMP": date(2024,7,9), "SYMBOL": "TCS", "SERIES": "EQ", "CLOSE": 4010.0, "TOTTRDQTY": 900, "ISIN": "INE467B01029"},
+    ]
+    data = get_CM_bhavcopy(datetime(2024,7,1), datetime(2024,7,31), ['TCS'], ['EQ'], normalize=False)
+    assert len(fake_db.executed) == 1
+    assert list(data.columns) == UDIFF_COLUMNS
+    assert data["TradDt"].tolist() == [date(2024,7,8), date(2024,7,9), date(2024,7,9)]
+    assert data["ClsPric"].tolist() == [4000.0, 4010.0, 4010.0]
+    # Legacy columns land under their UDiFF names and UDiFF-only columns are NULL for legacy rows;
+    # within a day the UDiFF row comes first
+    assert data["TtlTradgVol"].tolist()[::2] == [1200, 900] and data["ISIN"].tolist()[0] == "INE467B01029"
+    assert data["FinInstrmId"].isna().tolist() == [True, False, True]
+
+
+def test_FO_and_indices_batched(fake_db):
+    get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['banknifty', 'nifty'], batched=True)
+    get_indices_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ["Nifty 50", "Nifty 100"], batched=True)
+    assert len(fake_db.executed) == 2
+
+
+def test_copy_transport_parses_typed_columns(fake_db):
+    from Rmoney_bhavcopy.Bhavcopy_Reteriver import fetch_data_FO
+    fake_db.rows["FO_bhavCopies_CM"] = [("OPTIDX", "NIFTY", "2024-01-25", 21000, "CE", 1, 2, 0.5, 1.5, 1.5, 10, 1.0, 100, None, "2024-01-02")]
+    data = fetch_data_FO(fake_db, date(2024,1,1), date(2024,1,31), "NIFTY", "FO_bhavCopies_CM", transport="copy")
+    assert "COPY (SELECT" in fake_db.executed[0][0]
+    assert data["STRIKE_PR"].dtype == "float64"
+    assert str(data["TIMESTAMP"].dtype).startswith("datetime64")
+    assert data["CHG_IN_OI"].isna().all()
+    assert fetch_data_FO(fake_db, date(2024,1,1), date(2024,1,31), "TCS", "FO_Bhavcopies_UDiFF", transport="copy").empty
+    with pytest.raises(ValueError):
+        fetch_data_FO(fake_db, date(2024,1,1), date(2024,1,31), "NIFTY", "FO_bhavCopies_CM", transport="binary")
+
+
+def test_build_union_query_projects_columns():
+    query, _, columns = build_union_query("FO", date(2024,1,1), date(2024,1,31), "NIFTY", columns=["TradDt", "ClsPric", "UndrlygPric"])
+    udiff_select, legacy_select = query.split(" UNION ALL ")
+    assert columns == ["TradDt", "ClsPric", "UndrlygPric"]
+    assert udiff_select.startswith("SELECT TradDt::date AS TradDt, ClsPric::numeric AS ClsPric, UndrlygPric::numeric AS UndrlygPric FROM")
+    assert legacy_select.startswith("SELECT TIMESTAMP::date AS TradDt, CLOSE::numeric AS ClsPric, NULL::numeric AS UndrlygPric FROM")
+    with pytest.raises(ValueError):
+        build_union_query("FO", date(2024,1,1), date(2024,1,31), "NIFTY", columns=["CLOSE"])
+
+
+def test_build_query_escapes_percent_in_projection():
+    query, _, columns = build_query("Indices_bhavCopies", "Indices", date(2024,1,1), date(2024,1,31), "Nifty 50", columns=["Index Date", "Change(%)"])
+    assert query.startswith('SELECT "Index Date", "Change(%%)" FROM')
+    assert columns == ["Index Date", "Change(%)"]
+    query, _, _ = build_query("Indices_bhavCopies", "Indices", date(2024,1,1), date(2024,1,31), "Nifty 50", columns=["Volume"])
+    assert query.startswith('SELECT "Volume" FROM')
+
+
+def test_FO_columns_returns_only_requested_columns(fake_db):
+    # TradDt, ClsPric, then the row keys fetched for ordering: TckrSymb, FinInstrmTp, XpryDt, StrkPric, OptnTp
+    fake_db.rows["FO_Bhavcopies_UDiFF"] = [
+        (date(2024,1,3), 2.0, "NIFTY", "IDO", date(2024,1,25), 21000, "CE"),
+        (date(2024,1,2), 1.0, "NIFTY", "IDO", date(2024,1,25), 21000, "CE"),
+    ]
+    data = get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['nifty'], batched=True, columns=["TradDt", "ClsPric"])
+    assert list(data.columns) == ["TradDt", "ClsPric"]
+    assert data["ClsPric"].tolist() == [1.0, 2.0]
+    assert "SELECT TradDt::date AS TradDt, ClsPric::numeric AS ClsPric, TckrSymb::text AS TckrSymb" in fake_db.executed[0][0]
+    with pytest.raises(ValueError):
+        get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['nifty'], columns=["Nope"])
+
+
+def test_fo_filters_are_translated_per_table():
+    filters = fo_filters(instruments=["OPTIDX"], option_types=["CE"], strike_range=(21000, None))
+    query, params, _ = build_union_query("FO", date(2024,1,1), date(2024,1,31), "NIFTY", filters=filters)
+    udiff_select, legacy_select = query.split(" UNION ALL ")
+    assert "FinInstrmTp = ANY(%s) AND OptnTp = ANY(%s)" in udiff_select
+    assert "INSTRUMENT = ANY(%s) AND OPTION_TYP = ANY(%s)" in legacy_select
+    assert "STRIKE_PR >= %s" in legacy_select
+    assert params == (date(2024,1,1), date(2024,1,31), "NIFTY", ["IDO"], ["CE"], 21000,
+                      date(2024,1,1), date(2024,1,31), "NIFTY", ["OPTIDX"], ["CE"], 21000)
+    assert fo_filters() is None
+    with pytest.raises(ValueError):
+        fo_filters(instruments=["SWAP"])
+    with pytest.raises(ValueError):
+        fo_filters(nearest_expiries=0)
+
+
+def test_nearest_expiries_and_atm_use_window_ranks():
+    filters = fo_filters(option_types=["PE"], nearest_expiries=2, atm_strikes=3)
+    query, params, _ = build_query("FO_bhavCopies_CM", "FO", date(2024,1,1), date(2024,1,31), "NIFTY", columns=["CLOSE"], filters=filters)
+    assert "DENSE_RANK() OVER (PARTITION BY TIMESTAMP, SYMBOL ORDER BY EXPIRY_DT) AS expiry_rank" in query
+    assert "AS atm_underlying FROM FO_bhavCopies_CM" in query
+    assert query.endswith("WHERE atm_underlying IS NOT NULL AND ABS(strike_rank - atm_rank) <= %s")
+    assert query.count("%s") == len(params)
+    assert params[-3:] == (["PE"], 2, 3)
@@ -0,0 +1,91 @@
+from Rmoney_bhavcopy import Bhavcopy_Reteriver, client
+from Rmoney_bhavcopy.Bhavcopy_Reteriver import get_CM_bhavcopy, get_FO_bhavcopy
+from Rmoney_bhavcopy.result_cache import ResultCache
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import pandas as pd
+
+
+def cm_row(symbol, trade_date, close):
+    row = [None] * 34
+    row[0], row[7], row[8], row[17] = trade_date, symbol, "EQ", Decimal(close)
+    return tuple(row)
+
+
+ROWS = [cm_row(symbol, date(2024,1,day), 100 + day) for day in (2, 3, 4, 5) for symbol in ("TCS", "INFY")]
+
+
+def test_narrower_ranges_and_columns_come_from_memory(fake_db):
+    fake_db.rows["bhavcopies_udiff"] = ROWS
+    results = ResultCache()
+    full = get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['TCS', 'INFY'], ['EQ'], batched=True, result_cache=results)
+    queries = len(fake_db.executed)
+
+    week = get_CM_bhavcopy(datetime(2024,1,3), datetime(2024,1,4), ['infy', 'tcs'], ['EQ'], batched=True, result_cache=results, columns=['ClsPric', 'TckrSymb'])
+    assert len(fake_db.executed) == queries
+    assert list(week.columns) == ['ClsPric', 'TckrSymb']
+    assert week["TckrSymb"].tolist() == ["INFY", "INFY", "TCS", "TCS"]
+    assert week["ClsPric"].tolist() == [103.0, 104.0, 103.0, 104.0]
+    assert results.stats()["hits"] == 1 and results.stats()["misses"] == 1
+
+    # Changing the result in place does not change the cache
+    full.loc[0, "ClsPric"] = 0.0
+    full.iloc[1:, full.columns.get_loc("ClsPric")] = 0.0
+    again = get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['TCS', 'INFY'], ['EQ'], batched=True, result_cache=results)
+    assert again["ClsPric"].min() == 102.0 and len(fake_db.executed) == queries
+
+    # A wider range or another series is a miss
+    get_CM_bhavcopy(datetime(2023,12,1), datetime(2024,1,31), ['TCS', 'INFY'], ['EQ'], batched=True, result_cache=results)
+    get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['TCS', 'INFY'], ['BE'], batched=True, result_cache=results)
+    assert len(fake_db.executed) == queries + 2
+    assert results.stats()["entries"] == 2  # the wider range replaced the January entry
+
+
+def test_ttl_applies_to_ranges_reaching_today_and_lru_eviction(fake_db):
+    fake_db.rows["bhavcopies_udiff"] = ROWS
+    results = ResultCache(ttl=timedelta(0))
+    for _ in range(2):
+        get_CM_bhavcopy(datetime(2024,1,1), datetime.now(), ['TCS'], ['EQ'], result_cache=results)
+        get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['TCS'], ['EQ'], result_cache=results)
+    assert results.stats()["misses"] == 3 and results.stats()["hits"] == 1
+
+    size = results.stats()["bytes"] // results.stats()["entries"]
+    results = ResultCache(max_bytes=int(size * 1.5))
+    get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['TCS'], ['EQ'], result_cache=results)
+    get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['INFY'], ['EQ'], result_cache=results)
+    stats = results.stats()
+    assert stats["evictions"] == 1 and stats["entries"] == 1 and stats["bytes"] <= results.max_bytes
+    assert isinstance(get_CM_bhavcopy(datetime(2024,1,2), datetime(2024,1,2), ['INFY'], ['EQ'], result_cache=results), pd.DataFrame)
+    assert results.stats()["hits"] == 1
+
+
+def test_partial_and_failed_results_are_not_cached(fake_db, monkeypatch):
+    fo_row = [None] * 34
+    fo_row[0], fo_row[7] = date(2024,1,2), "NIFTY"
+    fake_db.rows["FO_Bhavcopies_UDiFF"] = [tuple(fo_row)]
+    fake_db.rows["bhavcopies_udiff"] = ROWS
+    results = ResultCache()
+
+    # One of two symbols fails: the rest is returned with the failure recorded, and not cached
+    fake_db.fail_symbol = "BANKNIFTY"
+    partial = get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['NIFTY', 'BANKNIFTY'], result_cache=results)
+    assert partial["TckrSymb"].tolist() == ["NIFTY"]
+    assert list(partial.attrs["errors"]) == ["BANKNIFTY"]
+    partial = get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['TCS', 'BANKNIFTY'], ['EQ'], result_cache=results)
+    assert list(partial.attrs["errors"]) == ["BANKNIFTY"] and results.stats()["entries"] == 0
+
+    # The next call queries the database again
+    fake_db.fail_symbol = None
+    queries = len(fake_db.executed)
+    get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['NIFTY', 'BANKNIFTY'], result_cache=results)
+    assert len(fake_db.executed) == queries + 2
+    assert results.stats()["misses"] == 3 and results.stats()["entries"] == 1
+
+    # A call that failed as a whole reports every symbol
+    def refuse():
+        raise RuntimeError("connection refused")
+    monkeypatch.setattr(Bhavcopy_Reteriver, "establish_connection", refuse)
+    client.set_default_client(None)
+    failed = get_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['TCS', 'INFY'], ['EQ'], result_cache=results)
+    assert failed.empty and failed.attrs["errors"] == {"TCS": "connection refused", "INFY": "connection refused"}
+    assert results.stats()["entries"] == 1
@@ -0,0 +1,35 @@
+from Rmoney_bhavcopy.schema import normalize
+from Rmoney_bhavcopy.Bhavcopy_Reteriver import get_FO_bhavcopy
+from datetime import date, datetime
+from decimal import Decimal
+import pandas as pd
+
+
+def test_normalize_converts_psycopg2_values():
+    raw = pd.DataFrame({
+        "TradDt": [date(2024,1,2), date(2024,1,3)],
+        "TckrSymb": ["NIFTY", "NIFTY"],
+        "ClsPric": [Decimal("21500.55"), None],
+        "OpnIntrst": [Decimal("1200"), None],
+        "FinInstrmNm": ["NIFTY24JANFUT", "NIFTY24JANFUT"],
+        "extra": [1, 2],
+    }, dtype=object)
+    raw.attrs["errors"] = {"BANKNIFTY": "failed"}
+    data = normalize(raw)
+    assert str(data["TradDt"].dtype) == "datetime64[ns]"
+    assert data["TckrSymb"].dtype == "category"
+    assert data["ClsPric"].dtype == "float64" and data["ClsPric"].isna().tolist() == [False, True]
+    assert data["OpnIntrst"].dtype == "Int64" and data["OpnIntrst"].tolist()[0] == 1200
+    assert data["FinInstrmNm"].dtype == raw["FinInstrmNm"].dtype
+    assert data["extra"].dtype == raw["extra"].dtype
+    assert data.attrs == {"errors": {"BANKNIFTY": "failed"}}
+
+
+def test_getters_normalize_by_default(fake_db):
+    row = [None] * 34
+    row[0], row[7], row[17] = date(2024,1,2), "NIFTY", Decimal("21500.55")
+    fake_db.rows["FO_Bhavcopies_UDiFF"] = [tuple(row)]
+    data = get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['nifty'])
+    assert data["ClsPric"].dtype == "float64"
+    raw = get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['nifty'], normalize=False)
+    assert isinstance(raw["ClsPric"].iloc[0], Decimal)
@@ -0,0 +1,84 @@
+from Rmoney_bhavcopy import client, server
+from Rmoney_bhavcopy.Bhavcopy_Reteriver import get_FO_bhavcopy, iter_FO_bhavcopy
+from Rmoney_bhavcopy.ingest import ingest
+from Rmoney_bhavcopy.symbol_index import SymbolIndex
+from Rmoney_bhavcopy.client import BhavcopyClient
+from Rmoney_bhavcopy.server import QueryServer, RemoteClient, ServerError
+from datetime import date, datetime
+import threading
+import time
+import pyarrow as pa
+import pytest
+
+from conftest import FakeConnection
+
+
+def udiff_row(symbol, day):
+    row = [None] * 34
+    row[0], row[7], row[17] = day, symbol, 100.0
+    return tuple(row)
+
+
+@pytest.fixture
+def query_server():
+    connection = FakeConnection({"FO_Bhavcopies_UDiFF": [udiff_row("NIFTY", date(2024,1,2)), udiff_row("NIFTY", date(2024,1,3))]})
+    with QueryServer(port=0, client=BhavcopyClient(connection_factory=lambda: connection)) as running:
+        yield running, connection
+
+
+def test_remote_client_matches_local_call(query_server):
+    running, connection = query_server
+    remote = RemoteClient(running.url)
+    data = remote.get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['nifty'])
+    local = get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['nifty'], client=running.client)
+    columns = ["TradDt", "TckrSymb", "ClsPric"]
+    assert data[columns].equals(local[columns]) and data.attrs["errors"] == {}
+    # The second identical call is answered from the server's result cache
+    remote.get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['NIFTY'])
+    assert remote.stats()["result_cache"]["hits"] == 1
+    assert len(connection.executed) == 2
+
+
+def test_identical_requests_in_flight_are_coalesced(query_server, monkeypatch):
+    running, _ = query_server
+    calls = []
+
+    def slow_getter(**kwargs):
+        calls.append(kwargs)
+        time.sleep(0.2)
+        return pa.table({"TradDt": [date(2024,1,2)], "TckrSymb": ["NIFTY"]})
+
+    monkeypatch.setitem(server.GETTERS, "FO", slow_getter)
+    remote = RemoteClient(running.url)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(remote.fetch("FO", {"symbols": ["NIFTY"]}))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1 and len(results) == 4
+    assert running.stats()["coalesced"] == 3
+
+
+def test_errors_are_raised_on_the_client(query_server):
+    running, _ = query_server
+    with pytest.raises(ValueError):
+        RemoteClient(running.url).fetch("BONDS", {})
+    with pytest.raises(ServerError):
+        RemoteClient("http://127.0.0.1:9", timeout=1).stats()
+
+
+def test_pool_functions_reject_a_default_remote_client(query_server, tmp_path):
+    running, _ = query_server
+    client.set_default_client(RemoteClient(running.url))
+    try:
+        with pytest.raises(TypeError, match="iter_FO_bhavcopy"):
+            next(iter_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['NIFTY']))
+        with pytest.raises(TypeError, match="ingest"):
+            ingest(tmp_path)
+        with pytest.raises(TypeError, match="SymbolIndex.refresh"):
+            SymbolIndex().refresh()
+        # The getters are answered by the server
+        assert len(get_FO_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['NIFTY'])) == 2
+    finally:
+        client.set_default_client(None)
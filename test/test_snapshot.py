@@ -0,0 +1,90 @@
+from Rmoney_bhavcopy import snapshot
+from Rmoney_bhavcopy.snapshot import get_market_snapshot
+from datetime import datetime
+import pandas as pd
+import pytest
+
+D1, D2, D3 = pd.Timestamp(2024,7,1), pd.Timestamp(2024,7,2), pd.Timestamp(2024,7,3)
+
+
+@pytest.fixture
+def segments(monkeypatch):
+    calls = {}
+
+    def cm(start, end, symbols, series, **kwargs):
+        calls["CM"] = kwargs
+        return pd.DataFrame({
+            "TradDt": [D1, D1, D2, D3], "TckrSymb": ["TCS", "TCS", "TCS", "INFY"],
+            "SctySrs": ["BE", "EQ", "EQ", "EQ"], "ClsPric": [1.0, 2.0, 3.0, 4.0],
+        })
+
+    def fo(start, end, symbols, **kwargs):
+        calls["OPT" if "atm_strikes" in kwargs else "FUT"] = kwargs
+        if "atm_strikes" in kwargs:
+            return pd.DataFrame({
+                "TradDt": [D1, D1], "TckrSymb": ["TCS", "TCS"], "XpryDt": [D1, D1], "StrkPric": [100.0, 100.0],
+                "OptnTp": ["CE", "PE"], "ClsPric": [5.0, 6.0],
+            })
+        # The front month expires on D2, so D3 uses the next month
+        return pd.DataFrame({
+            "TradDt": [D1, D2, D3], "TckrSymb": ["TCS", "TCS", "TCS"], "XpryDt": [D2, D2, pd.Timestamp(2024,8,29)],
+            "ClsPric": [10.0, 11.0, 12.0],
+        })
+
+    def indices(start, end, names, **kwargs):
+        calls["Indices"] = kwargs
+        return pd.DataFrame({"Index Date": [D3, D1, D2], "Index Name": ["Nifty 50"] * 3, "Closing Index Value": [300.0, 100.0, 200.0]})
+
+    monkeypatch.setattr(snapshot, "get_CM_bhavcopy", cm)
+    monkeypatch.setattr(snapshot, "get_FO_bhavcopy", fo)
+    monkeypatch.setattr(snapshot, "get_indices_bhavcopy", indices)
+    monkeypatch.setattr(snapshot, "resolve_client", lambda client: client)
+    return calls
+
+
+def test_segments_are_aligned_per_day_and_symbol(segments):
+    result = get_market_snapshot(datetime(2024,7,1), datetime(2024,7,3), ['tcs', 'INFY'], indices=['Nifty 50'],
+                                 series=['EQ', 'BE'], option_fields=['ClsPric'], future_fields=['ClsPric'])
+    assert list(result.columns) == [
+        "TradDt", "TckrSymb", "ClsPric", "FUT_XpryDt", "FUT_ClsPric", "OPT_XpryDt", "ATM_StrkPric",
+        "CE_ClsPric", "PE_ClsPric", "Nifty 50",
+    ]
+    # INFY only trades on D3; the EQ row of TCS wins on D1
+    assert result["TradDt"].tolist() == [D1, D2, D3, D3]
+    assert result["TckrSymb"].tolist() == ["TCS", "TCS", "TCS", "INFY"]
+    assert result["ClsPric"].fillna(0.0).tolist() == [2.0, 3.0, 0.0, 4.0]
+    assert result["FUT_ClsPric"].tolist()[:3] == [10.0, 11.0, 12.0]
+    assert result["FUT_XpryDt"][2] == pd.Timestamp(2024,8,29)
+    assert result["CE_ClsPric"][0] == 5.0 and result["PE_ClsPric"][0] == 6.0 and result["ATM_StrkPric"][0] == 100.0
+    assert result["Nifty 50"].tolist() == [100.0, 200.0, 300.0, 300.0]
+    assert result.attrs["errors"] == {}
+
+    assert segments["FUT"]["nearest_expiries"] == 1 and segments["FUT"]["batched"]
+    assert segments["OPT"]["atm_strikes"] == 0 and segments["OPT"]["nearest_expiries"] == 1
+    assert segments["CM"]["columns"] == ["TradDt", "TckrSymb", "SctySrs", "ClsPric"]
+
+
+def test_parts_can_be_skipped(segments):
+    result = get_market_snapshot(datetime(2024,7,1), datetime(2024,7,3), None, indices=['Nifty 50'])
+    assert list(result.columns) == ["TradDt", "Nifty 50"] and result["Nifty 50"].tolist() == [100.0, 200.0, 300.0]
+    assert list(segments) == ["Indices"]
+    result = get_market_snapshot(datetime(2024,7,1), datetime(2024,7,3), ['TCS'], future_fields=None, option_fields=None)
+    assert list(result.columns) == ["TradDt", "TckrSymb", "ClsPric"] and len(result) == 2
+    with pytest.raises(ValueError):
+        get_market_snapshot(datetime(2024,7,1), datetime(2024,7,3), [])
+
+
+def test_failed_part_is_reported_and_left_empty(segments, monkeypatch):
+    def failing_cm(start, end, symbols, series, **kwargs):
+        # What the getters return when the whole call fails
+        frame = pd.DataFrame()
+        frame.attrs["errors"] = {symbol: "connection refused" for symbol in symbols}
+        return frame
+
+    monkeypatch.setattr(snapshot, "get_CM_bhavcopy", failing_cm)
+    result = get_market_snapshot(datetime(2024,7,1), datetime(2024,7,3), ['TCS'], indices=['Nifty 50'],
+                                 cm_fields=['ClsPric', 'TtlTradgVol'], future_fields=['ClsPric'], option_fields=[])
+    assert result.attrs["errors"] == {"CM:TCS": "connection refused"}
+    assert list(result.columns) == ["TradDt", "TckrSymb", "ClsPric", "TtlTradgVol", "FUT_XpryDt", "FUT_ClsPric", "Nifty 50"]
+    assert result["TradDt"].tolist() == [D1, D2, D3] and result["FUT_ClsPric"].tolist() == [10.0, 11.0, 12.0]
+    assert result[["ClsPric", "TtlTradgVol"]].isna().all().all()
@@ -0,0 +1,27 @@
+from Rmoney_bhavcopy.Bhavcopy_Reteriver import iter_FO_bhavcopy, iter_CM_bhavcopy
+from Rmoney_bhavcopy.queries import UDIFF_COLUMNS
+from datetime import date, datetime
+import pytest
+
+
+def test_iter_FO_yields_bounded_normalized_chunks(fake_db):
+    row = [None] * 34
+    row[0], row[7] = date(2024,1,2), "NIFTY"
+    fake_db.rows["FO_Bhavcopies_UDiFF"] = [tuple(row)] * 5
+    chunks = list(iter_FO_bhavcopy(datetime(2023,1,1), datetime(2024,1,31), ['nifty'], chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert "UNION ALL" in fake_db.executed[0][0]
+    assert all(list(chunk.columns) == UDIFF_COLUMNS for chunk in chunks)
+    assert chunks[-1]["TckrSymb"].tolist() == ["NIFTY"]
+    # Same dtypes as get_FO_bhavcopy
+    assert str(chunks[0]["TradDt"].dtype).startswith("datetime64") and chunks[0]["ClsPric"].dtype == "float64"
+    assert chunks[0]["TckrSymb"].dtype == "category"
+    raw = next(iter_FO_bhavcopy(datetime(2023,1,1), datetime(2024,1,31), ['nifty'], chunk_size=2, normalize=False))
+    assert raw["TradDt"].tolist() == [date(2024,1,2)] * 2
+
+
+def test_iter_CM_validates_arguments(fake_db):
+    with pytest.raises(ValueError):
+        next(iter_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['TCS'], None))
+    with pytest.raises(ValueError):
+        next(iter_CM_bhavcopy(datetime(2024,1,1), datetime(2024,1,31), ['TCS'], ['EQ'], chunk_size=0))
@@ -0,0 +1,93 @@
+from Rmoney_bhavcopy.Bhavcopy_Reteriver import get_CM_bhavcopy, get_FO_bhavcopy
+from Rmoney_bhavcopy.queries import build_index_query
+from Rmoney_bhavcopy.symbol_index import SymbolIndex
+from datetime import date, datetime
+import pytest
+
+INDEX_ROWS = {
+    "bhavcopies_udiff": [
+        ("TCS", "EQ", "INE467B01029", date(2024,7,8), date(2024,8,1)),
+        ("HDFCBANK", "EQ", "INE040A01034", date(2024,7,8), date(2024,8,1)),
+        ("SGBSEP31II", "GB", "IN0020230085", date(2024,7,8), date(2024,7,31)),
+    ],
+    "bhavcopies_cm": [
+        ("TCS", "EQ", "INE467B01029", date(2016,1,1), date(2024,7,5)),
+        ("OLDCO", "EQ", "INE000000001", date(2016,1,1), date(2018,3,29)),
+    ],
+    "FO_Bhavcopies_UDiFF": [("BANKNIFTY", "IDF", date(2024,7,25), date(2024,7,8), date(2024,7,25))],
+    "FO_bhavCopies_CM": [
+        ("BANKNIFTY", "FUTIDX", date(2023,3,29), date(2023,1,2), date(2023,3,29)),
+        ("BANKNIFTY", "OPTIDX", date(2023,4,27), date(2023,3,1), date(2023,4,27)),
+    ],
+    "Indices_bhavCopies": [("Nifty 50", date(2016,1,1), date(2024,8,1))],
+}
+
+
+def test_build_index_query_maps_legacy_columns():
+    query, params = build_index_query("bhavcopies_cm", ["TckrSymb", "SctySrs", "ISIN"], date(2024,7,1))
+    assert query == (
+        "SELECT SYMBOL, SERIES, ISIN, MIN(timestamp), MAX(timestamp) FROM bhavcopies_cm"
+        " WHERE timestamp >= %s GROUP BY SYMBOL, SERIES, ISIN"
+    )
+    assert params == (date(2024,7,1),)
+    query, params = build_index_query("Indices_bhavCopies", ["Index Name"])
+    assert query.startswith('SELECT "Index Name", MIN("Index Date")') and params == ()
+
+
+def test_refresh_builds_lookups_and_merges_incrementally(fake_db, tmp_path):
+    fake_db.rows.update(INDEX_ROWS)
+    index = SymbolIndex(tmp_path / "index", refresh_days=3)
+    index.refresh()
+    assert index.symbols("CM", series=["GB"]) == ["SGBSEP31II"]
+    assert index.symbols("CM", start_date=datetime(2020,1,1)) == ["HDFCBANK", "SGBSEP31II", "TCS"]
+    assert index.expiries("banknifty", datetime(2023,3,1), datetime(2023,3,31)) == [date(2023,3,29), date(2023,4,27)]
+    assert index.expiries("BANKNIFTY", instruments=["FUTIDX"]) == [date(2023,3,29), date(2024,7,25)]
+    assert index.isin("tcs") == "INE467B01029"
+    tcs = index.contracts("CM").query("TckrSymb == 'TCS'")
+    assert tcs[["FirstTradDt", "LastTradDt"]].iloc[0].tolist() == [datetime(2016,1,1), datetime(2024,8,1)]
+
+    # The next refresh only scans from the last indexed date, less refresh_days
+    fake_db.executed.clear()
+    fake_db.rows["bhavcopies_udiff"] = [("TCS", "EQ", "INE467B01029", date(2024,7,29), date(2024,8,2))]
+    SymbolIndex(tmp_path / "index").refresh()
+    udiff_params = [params for query, params in fake_db.executed if "FROM bhavcopies_udiff" in query]
+    assert udiff_params == [(date(2024,7,29),)]
+    reloaded = SymbolIndex(tmp_path / "index")
+    tcs = reloaded.contracts("CM").query("TckrSymb == 'TCS'")
+    assert tcs[["FirstTradDt", "LastTradDt"]].iloc[0].tolist() == [datetime(2016,1,1), datetime(2024,8,2)]
+    assert len(reloaded.contracts("CM")) == 4
+
+
+def test_getters_validate_and_skip_symbols(fake_db):
+    fake_db.rows.update(INDEX_ROWS)
+    index = SymbolIndex()
+    index.refresh()
+    with pytest.raises(ValueError, match="'HDFCBAK' \\(did you mean HDFCBANK\\?\\)"):
+        get_CM_bhavcopy(datetime(2024,7,1), datetime(2024,7,31), ['TCS', 'HDFCBAK'], ['EQ'], index=index)
+
+    # OLDCO stopped trading in 2018, so it is not queried
+    fake_db.executed.clear()
+    get_CM_bhavcopy(datetime(2024,7,1), datetime(2024,7,31), ['oldco', 'TCS'], ['EQ'], index=index)
+    assert [params[2] for query, params in fake_db.executed] == ["TCS"]
+
+    fake_db.executed.clear()
+    result = get_FO_bhavcopy(datetime(2020,1,1), datetime(2020,12,31), ['BANKNIFTY'], index=index)
+    assert result.empty and fake_db.executed == []
+
+    # Ranges past the last indexed date are always queried
+    get_CM_bhavcopy(datetime(2024,8,5), datetime(2024,8,9), ['TCS'], ['EQ'], index=index)
+    assert len(fake_db.executed) == 1
+
+
+def test_getter_builds_only_its_own_segment(fake_db):
+    fake_db.rows.update(INDEX_ROWS)
+    index = SymbolIndex()
+    get_FO_bhavcopy(datetime(2024,7,1), datetime(2024,7,31), ['BANKNIFTY'], index=index)
+    scanned = [query.split(" FROM ")[1].split()[0] for query, params in fake_db.executed if "GROUP BY" in query]
+    assert scanned == ["FO_Bhavcopies_UDiFF", "FO_bhavCopies_CM"]
+    assert list(index.refreshed_at) == ["FO"] and index.contracts("CM").empty
+
+    # Fresh segments are not scanned again
+    fake_db.executed.clear()
+    get_FO_bhavcopy(datetime(2024,7,1), datetime(2024,7,31), ['BANKNIFTY'], index=index)
+    assert not any("GROUP BY" in query for query, params in fake_db.executed)
@@ -0,0 +1,103 @@
+from datetime import datetime
+
+from Rmoney_bhavcopy import sync
+from Rmoney_bhavcopy.sync import DeltaSync
+import pandas as pd
+import pytest
+
+TABLE = pd.DataFrame({
+    "TradDt": pd.bdate_range("2024-07-01", periods=10).repeat(2),
+    "TckrSymb": ["TCS", "INFY"] * 10,
+    "SctySrs": "EQ",
+    "ClsPric": [float(n) for n in range(20)],
+})
+
+
+@pytest.fixture
+def cm_table(monkeypatch):
+    """Serve ``get_CM_bhavcopy`` from a mutable copy of TABLE, recording the requested start dates."""
+    table = TABLE.copy()
+    starts = []
+
+    def fake_cm(start_date, end_date, symbols, series, batched=False, client=None, columns=None):
+        starts.append(start_date.date().isoformat())
+        rows = table[(table["TradDt"] >= start_date) & (table["TradDt"] <= end_date)
+                     & table["TckrSymb"].isin(symbols) & table["SctySrs"].isin(series)]
+        rows = rows.reset_index(drop=True)
+        rows.attrs["errors"] = {}
+        return rows[columns] if columns else rows
+
+    monkeypatch.setattr(sync, "get_CM_bhavcopy", fake_cm)
+    return table, starts
+
+
+def test_sync_returns_only_days_after_watermark(tmp_path, cm_table):
+    table, starts = cm_table
+    path = tmp_path / "state.json"
+    delta = DeltaSync(path, lookback_days=3).sync("CM", ["TCS", "INFY"], ["EQ"], end_date=datetime(2024, 7, 5))
+    assert len(delta) == 10
+    assert delta.attrs["watermarks"] == {"TCS|EQ": "2024-07-05", "INFY|EQ": "2024-07-05"}
+
+    state = DeltaSync(path, lookback_days=3)
+    delta = state.sync("CM", ["TCS", "INFY"], ["EQ"], end_date=datetime(2024, 7, 12))
+    assert starts[-1] == "2024-07-02"  # the watermark minus lookback_days
+    assert delta["TradDt"].min() == pd.Timestamp("2024-07-08") and len(delta) == 10
+    assert delta.attrs["corrections"] == {}
+    assert state.sync("CM", ["TCS", "INFY"], ["EQ"], end_date=datetime(2024, 7, 12)).empty
+
+
+def test_sync_detects_corrections_within_lookback(tmp_path, cm_table):
+    table, starts = cm_table
+    state = DeltaSync(tmp_path / "state.json", lookback_days=3)
+    state.sync("CM", ["TCS", "INFY"], ["EQ"], end_date=datetime(2024, 7, 10))
+    table.loc[(table["TradDt"] == "2024-07-09") & (table["TckrSymb"] == "TCS"), "ClsPric"] = 99.0
+    table.drop(table.index[(table["TradDt"] == "2024-07-10") & (table["TckrSymb"] == "INFY")], inplace=True)
+
+    delta = state.sync("CM", ["TCS", "INFY"], ["EQ"], end_date=datetime(2024, 7, 11))
+    assert delta.attrs["corrections"] == {"TCS|EQ": ["2024-07-09"], "INFY|EQ": ["2024-07-10"]}
+    assert list(zip(delta["TckrSymb"], delta["TradDt"].dt.day, delta["ClsPric"])) == [
+        ("TCS", 9, 99.0), ("TCS", 11, 16.0), ("INFY", 11, 17.0),
+    ]
+
+
+def test_watermarks_move_on_commit_and_parquet_parts(tmp_path, cm_table):
+    path = tmp_path / "state.json"
+    state = DeltaSync(path)
+    delta = state.sync("CM", ["TCS"], ["EQ"], end_date=datetime(2024, 7, 3), parquet_dir=tmp_path / "store", commit=False)
+    assert not path.exists() and DeltaSync(path).watermark("CM", ("TCS", "EQ")) is None
+    state.commit()
+    assert DeltaSync(path).watermark("CM", ("TCS", "EQ")).isoformat() == "2024-07-03"
+    parts = list((tmp_path / "store" / "CM").glob("delta-*.parquet"))
+    assert len(parts) == 1
+    pd.testing.assert_frame_equal(pd.read_parquet(parts[0]), delta, check_dtype=False)
+
+    with pytest.raises(ValueError):
+        state.sync("CM", ["TCS"], None)
+
+
+def test_failed_fetch_keeps_state(tmp_path, cm_table, monkeypatch):
+    table, starts = cm_table
+    path = tmp_path / "state.json"
+    state = DeltaSync(path, lookback_days=3)
+    state.sync("CM", ["TCS", "INFY"], ["EQ"], end_date=datetime(2024, 7, 10))
+    stored = path.read_text()
+
+    # The getters return an empty frame listing the failed symbols when the database is unreachable
+    def failing_cm(start_date, end_date, symbols, series, batched=False, client=None, columns=None):
+        frame = pd.DataFrame()
+        frame.attrs["errors"] = {symbol: "connection refused" for symbol in symbols}
+        return frame
+
+    serve = sync.get_CM_bhavcopy
+    monkeypatch.setattr(sync, "get_CM_bhavcopy", failing_cm)
+    delta = state.sync("CM", ["TCS", "INFY"], ["EQ"], end_date=datetime(2024, 7, 11))
+    assert delta.empty and delta.attrs["corrections"] == {} and delta.attrs["watermarks"] == {}
+    assert delta.attrs["errors"] == {"TCS": "connection refused", "INFY": "connection refused"}
+    assert path.read_text() == stored
+
+    # Once the database is back, only real changes are reported
+    monkeypatch.setattr(sync, "get_CM_bhavcopy", serve)
+    table.loc[(table["TradDt"] == "2024-07-09") & (table["TckrSymb"] == "TCS"), "ClsPric"] = 99.0
+    delta = state.sync("CM", ["TCS", "INFY"], ["EQ"], end_date=datetime(2024, 7, 11))
+    assert delta.attrs["corrections"] == {"TCS|EQ": ["2024-07-09"]}
+    assert delta["TradDt"].dt.day.tolist() == [9, 11, 11]